@@ -13,6 +13,7 @@ from mrsimulator import SpinSystem
 from mrsimulator.methods import BlochDecayCentralTransitionSpectrum
 from mrsimulator.models import CzjzekDistribution
 from mrsimulator.models import ExtCzjzekDistribution
+from mrsimulator.models import LineshapeKernel
 from mrsimulator.spin_system.isotope import Isotope
 from mrsimulator.spin_system.tensors import SymmetricTensor
 
@@ -29,6 +30,13 @@ def test_models(doctest_namespace):
     ext_cz_model = ExtCzjzekDistribution(S0, eps=0.35)
     doctest_namespace["ext_cz_model"] = ext_cz_model
 
+    method = BlochDecayCentralTransitionSpectrum(
+        channels=["27Al"], spectral_dimensions=[{"count": 64}]
+    )
+    pos = [np.linspace(0, 1e7, 4), np.linspace(0, 1, 3)]
+    doctest_namespace["pos"] = pos
+    doctest_namespace["kernel"] = LineshapeKernel(pos, method, isotope="27Al")
+
 
 @pytest.fixture(autouse=True)
 def add_site(doctest_namespace):
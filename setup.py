@@ -125,7 +125,7 @@ if platform.system() == "Darwin":  # OSX-specific tweaks:
     # FFTW framework
     FFTW_INCLUDE = "/usr/local/opt/fftw/include"
     FFTW_LIB = "/usr/local/opt/fftw/lib"
-    libraries += ["fftw3"]
+    libraries += ["fftw3", "fftw3f"]
 
     if not exists(FFTW_INCLUDE):
         print(message("fftw"))
@@ -145,7 +145,7 @@ if platform.system() == "Linux":
     ]
 
     library_dirs += ["/usr/lib64/", "/usr/lib/", "/usr/lib/x86_64-linux-gnu/"]
-    libraries += ["openblas", "fftw3"]
+    libraries += ["openblas", "fftw3", "fftw3f"]
     openblas_info = sysinfo.get_info("openblas")
     fftw3_info = sysinfo.get_info("fftw3")
 
@@ -164,6 +164,14 @@ if platform.system() == "Linux":
     extra_link_args += ["-lm"]
     extra_compile_args += ["-g"]
 
+    # OpenMP for the multi-threaded simulation over spin systems.
+    extra_compile_args += ["-fopenmp"]
+    extra_link_args += ["-fopenmp"]
+
+    # fftw threads for the multi-threaded sideband fft plans.
+    libraries += ["fftw3_omp"]
+    extra_compile_args += ["-DMRS_FFTW_THREADS"]
+
 include_dirs = list(set(include_dirs))
 library_dirs = list(set(library_dirs))
 libraries = list(set(libraries))
@@ -255,7 +263,7 @@ setup(
     install_requires=[
         "numpy>=1.17",
         "csdmpy>=0.3.4",
-        "pydantic>=1.0",
+        "pydantic>=1.7",
         "monty>=2.0.4",
         "typing-extensions>=3.7",
     ],
@@ -68,7 +68,16 @@ else:
     library_dirs += [join(conda_location, "lib")]
     extra_compile_args = ["-O3", "-ffast-math"]
 
-libraries += ["fftw3", "openblas"]
+    # OpenMP for the multi-threaded simulation over spin systems.
+    if platform.system() == "Linux":
+        extra_compile_args += ["-fopenmp"]
+        extra_link_args += ["-fopenmp"]
+
+        # fftw threads for the multi-threaded sideband fft plans.
+        libraries += ["fftw3_omp"]
+        extra_compile_args += ["-DMRS_FFTW_THREADS"]
+
+libraries += ["fftw3", "fftw3f", "openblas"]
 extra_link_args += ["-lm"]
 
 include_dirs = list(set(include_dirs))
@@ -12,6 +12,12 @@ cdef extern from "angular_momentum.h":
     void wigner_d_matrices_from_exp_I_beta(int l, int n, void *exp_I_beta,
                                   double *wigner)
 
+cdef extern from "fftw3.h":
+    int fftw_import_wisdom_from_filename(const char *filename)
+    int fftw_export_wisdom_to_filename(const char *filename)
+    int fftwf_import_wisdom_from_filename(const char *filename)
+    int fftwf_export_wisdom_to_filename(const char *filename)
+
 cdef extern from "schemes.h":
     ctypedef struct MRS_averaging_scheme:
         unsigned int total_orientations
@@ -19,7 +25,7 @@ cdef extern from "schemes.h":
     MRS_averaging_scheme *MRS_create_averaging_scheme(
                             unsigned int integration_density,
                             bool_t allow_fourth_rank,
-                            unsigned int integration_volume)
+                            unsigned int integration_volume) nogil
 
     void MRS_free_averaging_scheme(MRS_averaging_scheme *scheme)
 
@@ -27,7 +33,11 @@ cdef extern from "schemes.h":
         pass
 
     MRS_fftw_scheme *create_fftw_scheme(unsigned int total_orientations,
-                                    unsigned int number_of_sidebands)
+                                    unsigned int number_of_sidebands,
+                                    unsigned int planner_flag, int n_threads,
+                                    bool_t single_precision)
+
+    int MRS_fftw_init_threads()
 
     void MRS_free_fftw_scheme(MRS_fftw_scheme *fftw_scheme)
 cdef extern from "mrsimulator.h":
@@ -75,6 +85,8 @@ cdef extern from "method.h":
         double coordinates_offset       #  Start coordinate of the dimension.
         MRS_event *events               # Holds a list of events.
         unsigned int n_events           # The number of events.
+        double normalize_offset         # Offset from the coordinates offset.
+        double inverse_increment        # Inverse of the increment.
 
     MRS_sequence *MRS_create_sequences(
         MRS_averaging_scheme *scheme,
@@ -87,7 +99,7 @@ cdef extern from "method.h":
         double *rotor_angle_in_rad,
         int *n_events,
         unsigned int n_seq,
-        unsigned int number_of_sidebands)
+        unsigned int number_of_sidebands) nogil
 
     void MRS_free_sequence(MRS_sequence *the_sequence, int n)
 
@@ -133,4 +145,46 @@ cdef extern from "simulation.h":
         bool_t interpolation,
         bool_t *freq_contrib,
         double *affine_matrix,
-        )
+        ) nogil
+
+    void __mrsimulator_core_translate(
+        double * spec,
+        isotopomer_ravel *ravel_isotopomer,
+        float *transition,
+        MRS_sequence *the_sequence,
+        int n_sequence,
+        MRS_fftw_scheme *fftw_scheme,
+        MRS_averaging_scheme *scheme,
+        bool_t interpolation,
+        bool_t *freq_contrib,
+        double *affine_matrix,
+        ) nogil
+
+    unsigned int MRS_site_basis_size(MRS_averaging_scheme *scheme) nogil
+
+    void MRS_save_site_basis(MRS_averaging_scheme *scheme, double *buffer) nogil
+
+    void MRS_load_site_basis(
+        MRS_averaging_scheme *scheme,
+        isotopomer_ravel *ravel_isotopomer,
+        double *buffer,
+        ) nogil
+
+    void __mrsimulator_site_basis(
+        isotopomer_ravel *ravel_isotopomer,
+        MRS_sequence *the_sequence,
+        MRS_averaging_scheme *scheme,
+        ) nogil
+
+    void __mrsimulator_core_from_basis(
+        double * spec,
+        isotopomer_ravel *ravel_isotopomer,
+        float *transition,
+        MRS_sequence *the_sequence,
+        int n_sequence,
+        MRS_fftw_scheme *fftw_scheme,
+        MRS_averaging_scheme *scheme,
+        bool_t interpolation,
+        bool_t *freq_contrib,
+        double *affine_matrix,
+        ) nogil
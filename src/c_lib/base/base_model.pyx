@@ -1,6 +1,13 @@
 cimport base_model as clib
 from libcpp cimport bool as bool_t
+from libc.stdlib cimport calloc, free
+from libc.string cimport memset
 from numpy cimport ndarray
+from cython.parallel cimport parallel, prange, threadid
+import atexit
+import os
+import threading
+
 import numpy as np
 import cython
 from mrsimulator import sandbox as sb
@@ -8,18 +15,334 @@ from mrsimulator import sandbox as sb
 __author__ = "Deepansh J. Srivastava"
 __email__ = "srivastava.89@osu.edu"
 
+# fftw wisdom ________________________________________________________________________
+# The wisdom from the rigorous (measure and patient) fftw planners is cached on disk in
+# a single wisdom file, with a separate file for the single precision plans, whose
+# wisdom is held by the single precision fftw library. The cache is only read when a
+# rigorous planner is first used within the session, and the new wisdom is saved on
+# exit, or with an explicit call to `export_fftw_wisdom`. Set the environment variable
+# `MRSIMULATOR_FFTW_WISDOM_DIR` to an empty string to disable the cache.
+FFTW_WISDOM_DIR = os.environ.get(
+    "MRSIMULATOR_FFTW_WISDOM_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "mrsimulator", "fftw_wisdom"),
+)
+FFTW_THREADS = clib.MRS_fftw_init_threads() != 0
+FFTW_MEASURE = 0
+FFTW_PATIENT = 1 << 5
+FFTW_ESTIMATE = 1 << 6
+__wisdom_filenames__ = {False: "mrsimulator.wisdom", True: "mrsimulator_single.wisdom"}
+_fftw_wisdom = {"imported": set(), "new": set(), "atexit": False}
+
+
+def _wisdom_filename(directory, single_precision):
+    return os.path.join(directory, __wisdom_filenames__[single_precision])
+
+
+def import_fftw_wisdom(directory=None, single_precision=False):
+    """Import the fftw wisdom from the wisdom file within the directory.
+
+    Args:
+        directory: The path to the wisdom directory. The default is FFTW_WISDOM_DIR.
+        single_precision: If true, import the wisdom of the single precision plans.
+
+    Returns:
+        True if the wisdom is imported, otherwise False.
+    """
+    directory = FFTW_WISDOM_DIR if directory is None else directory
+    filename = _wisdom_filename(directory, single_precision)
+    if directory == "" or not os.path.exists(filename):
+        return False
+    if single_precision:
+        return clib.fftwf_import_wisdom_from_filename(filename.encode()) != 0
+    return clib.fftw_import_wisdom_from_filename(filename.encode()) != 0
+
+
+def export_fftw_wisdom(directory=None):
+    """Export the fftw wisdom of the precisions planned with a rigorous planner since
+    the last export.
+
+    Args:
+        directory: The path to the wisdom directory. The default is FFTW_WISDOM_DIR.
+
+    Returns:
+        A list of the exported wisdom filenames.
+    """
+    directory = FFTW_WISDOM_DIR if directory is None else directory
+    if directory == "" or _fftw_wisdom["new"] == set():
+        return []
+
+    os.makedirs(directory, exist_ok=True)
+    filenames = []
+    for single_precision in sorted(_fftw_wisdom["new"]):
+        filename = _wisdom_filename(directory, single_precision)
+        if single_precision:
+            clib.fftwf_export_wisdom_to_filename(filename.encode())
+        else:
+            clib.fftw_export_wisdom_to_filename(filename.encode())
+        filenames.append(filename)
+    _fftw_wisdom["new"].clear()
+    return filenames
+
+
+def _save_fftw_wisdom_on_exit():
+    try:
+        export_fftw_wisdom()
+    except OSError:
+        pass
+
+
+def _use_rigorous_planner(single_precision):
+    """Import the cached wisdom before the first rigorous plan of the precision, and
+    save the new wisdom on exit."""
+    if single_precision not in _fftw_wisdom["imported"]:
+        import_fftw_wisdom(single_precision=single_precision)
+        _fftw_wisdom["imported"].add(single_precision)
+    _fftw_wisdom["new"].add(single_precision)
+    if not _fftw_wisdom["atexit"]:
+        atexit.register(_save_fftw_wisdom_on_exit)
+        _fftw_wisdom["atexit"] = True
+
+
+cdef class SimulationEngine:
+    """A persistent simulation engine.
+
+    The engine holds the powder averaging scheme, the fftw scheme, and the sequences,
+    along with their plans, for a method. The structures are re-used across calls to
+    :func:`one_d_spectrum` and are only re-created when the integration density,
+    integration volume, number of sidebands, rotor frequency, rotor angle, or the
+    spectral dimension grid changes. The event fractions, magnetic flux densities, and
+    the coordinates offsets are updated in place.
+
+    The structures also serve as the scratch buffers of the simulation, therefore, the
+    engine holds an independent copy of the structures for every worker thread.
+    """
+    cdef clib.MRS_averaging_scheme **averaging_scheme
+    cdef clib.MRS_fftw_scheme **fftw_scheme
+    cdef clib.MRS_sequence **sequence
+    cdef unsigned int n_workers
+    cdef unsigned int n_sequence
+    cdef tuple scheme_key
+    cdef tuple fftw_key
+    cdef tuple sequence_key
+
+    def __cinit__(self):
+        self.averaging_scheme = NULL
+        self.fftw_scheme = NULL
+        self.sequence = NULL
+        self.n_workers = 0
+        self.n_sequence = 0
+
+    def __dealloc__(self):
+        self.clear()
+
+    def __reduce__(self):
+        # the C-structures are not serializable. Copies start with an empty engine.
+        return (SimulationEngine, ())
+
+    def clear(self):
+        """Release all the structures held by the engine."""
+        self._free_sequence()
+        self._free_fftw_scheme()
+        self._free_averaging_scheme()
+        free(self.sequence)
+        free(self.fftw_scheme)
+        free(self.averaging_scheme)
+        self.sequence = NULL
+        self.fftw_scheme = NULL
+        self.averaging_scheme = NULL
+        self.n_workers = 0
+
+    cdef void _free_averaging_scheme(self):
+        cdef unsigned int i
+        for i in range(self.n_workers):
+            if self.averaging_scheme[i] is not NULL:
+                clib.MRS_free_averaging_scheme(self.averaging_scheme[i])
+                self.averaging_scheme[i] = NULL
+        self.scheme_key = None
+
+    cdef void _free_fftw_scheme(self):
+        cdef unsigned int i
+        for i in range(self.n_workers):
+            if self.fftw_scheme[i] is not NULL:
+                clib.MRS_free_fftw_scheme(self.fftw_scheme[i])
+                self.fftw_scheme[i] = NULL
+        self.fftw_key = None
+
+    cdef void _free_sequence(self):
+        cdef unsigned int i
+        for i in range(self.n_workers):
+            if self.sequence[i] is not NULL:
+                clib.MRS_free_sequence(self.sequence[i], self.n_sequence)
+                self.sequence[i] = NULL
+        self.n_sequence = 0
+        self.sequence_key = None
+
+    cdef void set_workers(self, unsigned int n_workers):
+        if n_workers == self.n_workers:
+            return
+
+        self.clear()
+        self.averaging_scheme = <clib.MRS_averaging_scheme **> calloc(
+            n_workers, sizeof(clib.MRS_averaging_scheme *)
+        )
+        self.fftw_scheme = <clib.MRS_fftw_scheme **> calloc(
+            n_workers, sizeof(clib.MRS_fftw_scheme *)
+        )
+        self.sequence = <clib.MRS_sequence **> calloc(
+            n_workers, sizeof(clib.MRS_sequence *)
+        )
+        self.n_workers = n_workers
+
+    cdef void set_averaging_scheme(self, unsigned int integration_density,
+            bool_t allow_fourth_rank, unsigned int integration_volume):
+        cdef unsigned int i
+        key = (integration_density, allow_fourth_rank, integration_volume)
+        if key == self.scheme_key:
+            return
+
+        # the plans within the sequences hold a reference to the averaging scheme.
+        self._free_sequence()
+        self._free_averaging_scheme()
+        with nogil:
+            for i in range(self.n_workers):
+                self.averaging_scheme[i] = clib.MRS_create_averaging_scheme(
+                    integration_density, allow_fourth_rank, integration_volume
+                )
+        self.scheme_key = key
+
+    cdef void set_fftw_scheme(self, unsigned int number_of_sidebands,
+            unsigned int fftw_planner, int fftw_threads, bool_t single_precision):
+        cdef unsigned int i
+        cdef unsigned int total_orientations = self.averaging_scheme[0].total_orientations
+        key = (
+            total_orientations, number_of_sidebands, fftw_planner, fftw_threads,
+            single_precision
+        )
+        if key == self.fftw_key:
+            return
+
+        # the rigorous planners start from the wisdom cached on disk.
+        if fftw_planner != FFTW_ESTIMATE:
+            _use_rigorous_planner(bool(single_precision))
+
+        # fftw planner is not thread-safe, the schemes are created serially while
+        # holding the GIL, which also serializes the planners of concurrent callers.
+        self._free_fftw_scheme()
+        for i in range(self.n_workers):
+            self.fftw_scheme[i] = clib.create_fftw_scheme(
+                total_orientations, number_of_sidebands, fftw_planner, fftw_threads,
+                single_precision
+            )
+        self.fftw_key = key
+
+    cdef void set_sequences(self, ndarray[int] cnt, ndarray[double] coord_off,
+            ndarray[double] incre, ndarray[double] frac,
+            ndarray[double] magnetic_flux_density_in_T, ndarray[double] srfiH,
+            ndarray[double] rair, ndarray[int] n_event, unsigned int n_sequence,
+            unsigned int number_of_sidebands):
+        cdef unsigned int i, j, k, w
+        cdef clib.MRS_sequence *seq
+        key = (
+            tuple(cnt), tuple(incre), tuple(srfiH), tuple(rair), tuple(n_event),
+            number_of_sidebands
+        )
+        cdef int *cnt_ptr = &cnt[0]
+        cdef int *n_event_ptr = &n_event[0]
+        cdef double *coord_off_ptr = &coord_off[0]
+        cdef double *incre_ptr = &incre[0]
+        cdef double *frac_ptr = &frac[0]
+        cdef double *B0_ptr = &magnetic_flux_density_in_T[0]
+        cdef double *srfiH_ptr = &srfiH[0]
+        cdef double *rair_ptr = &rair[0]
+        if key != self.sequence_key:
+            self._free_sequence()
+            with nogil:
+                for w in range(self.n_workers):
+                    self.sequence[w] = clib.MRS_create_sequences(
+                        self.averaging_scheme[w], cnt_ptr, coord_off_ptr, incre_ptr,
+                        frac_ptr, B0_ptr, srfiH_ptr, rair_ptr, n_event_ptr, n_sequence,
+                        number_of_sidebands
+                    )
+            self.n_sequence = n_sequence
+            self.sequence_key = key
+            return
+
+        # plans are unchanged, update the remaining event and sequence attributes.
+        for w in range(self.n_workers):
+            k = 0
+            for i in range(n_sequence):
+                seq = &self.sequence[w][i]
+                seq.coordinates_offset = coord_off[i]
+                seq.normalize_offset = 0.5 - coord_off[i] * seq.inverse_increment
+                for j in range(seq.n_events):
+                    seq.events[j].fraction = frac[k]
+                    seq.events[j].magnetic_flux_density_in_T = (
+                        magnetic_flux_density_in_T[k]
+                    )
+                    k += 1
+
+
+class SiteBasisCache:
+    """A cache of the site bases of the single-site spin systems.
+
+    The site bases are the spatial tensors of a site rotated over all orientations of
+    the powder averaging scheme. The bases are independent of the magnetic flux
+    density, the spin transitions, and the sample rotation, and are shared among the
+    simulations of the methods, such as the same spin systems at multiple fields. The
+    bases are keyed by the channel, the averaging scheme parameters, and the
+    anisotropic parameters of the site.
+
+    Args:
+        max_bytes: The memory budget of the cache in bytes. Once the budget is used up,
+            no new bases are stored. The default is 256 MB.
+    """
+
+    def __init__(self, max_bytes=2 ** 28):
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.bases = {}
+        self._lock = threading.Lock()
+
+    def request(self, key, size):
+        """Return a tuple of the buffer of `size` doubles for the `key`, and a boolean
+        which is true if the buffer holds the bases. A new buffer is allocated when
+        within the memory budget, otherwise the buffer is None. The cache may be
+        shared by the simulations running in multiple threads."""
+        with self._lock:
+            if key in self.bases:
+                return self.bases[key], True
+            if self.n_bytes + 8 * size > self.max_bytes:
+                return None, False
+            self.n_bytes += 8 * size
+        return np.empty(size, dtype=np.float64), False
+
+    def __len__(self):
+        return len(self.bases)
+
+
 @cython.profile(False)
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def one_d_spectrum(method,
-       list spin_systems,
+       spin_systems,
        int verbose=0,
        unsigned int number_of_sidebands=90,
        unsigned int integration_density=72,
        unsigned int decompose_spectrum=0,
        unsigned int integration_volume=1,
-       bool_t interpolation=True):
+       bool_t interpolation=True,
+       unsigned int n_threads=1,
+       unsigned int fftw_planner=FFTW_ESTIMATE,
+       unsigned int fftw_threads=1,
+       unsigned int precision=0,
+       SimulationEngine engine=None,
+       basis_cache=None,
+       spin_system_index=None):
     """
+    Simulate the spectrum of the method from the given spin systems. The function does
+    not modify the method or the spin systems, and releases the GIL during the
+    computation. Independent simulations, each with its own engine, may therefore run
+    concurrently from multiple python threads.
 
     :ivar verbose:
         The allowed values are 0, 1, and 11. When the value is 1, the output is
@@ -44,6 +367,39 @@ def one_d_spectrum(method,
         An unsigned integer. When value is 0, the spectum is a sum of spectrum from all
         spin systems. If value is 1, spectrum from individual spin systems is stored
         separately.
+    :ivar spin_systems:
+        A list of SpinSystem objects or a SpinSystemArray object. The parameters of the
+        SpinSystemArray are read directly from its columns.
+    :ivar n_threads:
+        The number of threads over which the spin systems are distributed. Every
+        thread holds private scratch buffers and a private spectrum accumulator. The
+        accumulators are summed in the order of the thread index, making the result
+        reproducible for a given number of threads. The default value is 1.
+    :ivar fftw_planner:
+        The fftw planner flag, FFTW_ESTIMATE (default), FFTW_MEASURE, or FFTW_PATIENT.
+    :ivar fftw_threads:
+        The number of threads used within the fftw plans. The value has no effect
+        unless the library is compiled with fftw threads. The default value is 1.
+    :ivar precision:
+        The floating point precision of the sideband amplitudes, 0 for double and 1
+        for single precision. In single precision, the sideband phases, exponentials,
+        and fft are evaluated in float32, while the frequencies and the spectrum
+        remain in float64. The single precision fftw plans are not threaded. The
+        default value is 0.
+    :ivar engine:
+        A SimulationEngine object. When provided, the averaging scheme, the fftw
+        scheme, and the sequences from the engine are re-used, and only re-created
+        when required. The default is None, in which case, a temporary engine is used.
+    :ivar basis_cache:
+        A SiteBasisCache object. When provided, the site bases of the single-site spin
+        systems are read from, or stored to, the cache, such that the orientation
+        dependent tensors are evaluated once for all methods sharing the cache. The
+        default is None.
+    :ivar spin_system_index:
+        A list of indexes of the spin systems with at least one site from the channel
+        of the method. When provided, only the spin systems at the given indexes are
+        simulated, otherwise, every spin system is checked for the channel. The
+        argument is ignored for a SpinSystemArray. The default is None.
     """
 
     cdef int transition_increment
@@ -87,11 +443,16 @@ def one_d_spectrum(method,
         allow_fourth_rank = 1
 
 # create averaging scheme _____________________________________________________
-    cdef clib.MRS_averaging_scheme *the_averaging_scheme
-    the_averaging_scheme = clib.MRS_create_averaging_scheme(
-        integration_density=integration_density, allow_fourth_rank=allow_fourth_rank,
-        integration_volume=integration_volume
-    )
+    if engine is None:
+        engine = SimulationEngine()
+
+    if n_threads == 0:
+        n_threads = 1
+
+    engine.set_workers(n_threads)
+    engine.set_averaging_scheme(integration_density, allow_fourth_rank,
+                                integration_volume)
+    cdef clib.MRS_averaging_scheme **the_averaging_scheme = engine.averaging_scheme
 
 # create spectral dimensions _______________________________________________
 
@@ -156,8 +517,6 @@ def one_d_spectrum(method,
         increment.append(seq.spectral_width / seq.count)
         event_i.append(len(seq.events))
 
-        seq.origin_offset = np.abs(Bo[0] * gyromagnetic_ratio * 1e6)
-
     frac = np.asarray(fr, dtype=np.float64)
     magnetic_flux_density_in_T = np.asarray(Bo, dtype=np.float64)
     srfiH = np.asarray(vr, dtype=np.float64)
@@ -168,21 +527,23 @@ def one_d_spectrum(method,
     n_event = np.asarray(event_i, dtype=np.int32)
 
     # create spectral_dimensions
-    the_sequence = clib.MRS_create_sequences(the_averaging_scheme, &cnt[0],
-        &coord_off[0], &incre[0], &frac[0], &magnetic_flux_density_in_T[0],
-        &srfiH[0], &rair[0], &n_event[0], n_sequence, number_of_sidebands)
+    engine.set_sequences(cnt, coord_off, incre, frac, magnetic_flux_density_in_T,
+        srfiH, rair, n_event, n_sequence, number_of_sidebands)
+    cdef clib.MRS_sequence **the_sequence = engine.sequence
 
 # normalization factor for the spectrum
     norm = np.prod(incre)
 
 # create fftw scheme __________________________________________________________
 
-    cdef clib.MRS_fftw_scheme *the_fftw_scheme
-    the_fftw_scheme = clib.create_fftw_scheme(the_averaging_scheme.total_orientations, number_of_sidebands)
+    engine.set_fftw_scheme(
+        number_of_sidebands, fftw_planner, fftw_threads, precision == 1
+    )
+    cdef clib.MRS_fftw_scheme **the_fftw_scheme = engine.fftw_scheme
 # # _____________________________________________________________________________
 
 # frequency contrib
-    cdef ndarray[bool_t] freq_contrib_c = np.asarray(freq_contrib, dtype=np.bool)
+    cdef ndarray[bool_t] freq_contrib_c = np.asarray(freq_contrib, dtype=np.bool_)
 
 # affine transformation
 
@@ -209,9 +570,10 @@ def one_d_spectrum(method,
     #     print (f'Sample rotation frequency (𝜈r) = {sample_rotation_frequency_in_Hz} Hz')
 
 # sites _______________________________________________________________________________
-    p_isotopes = None
+    pathway_table = method._get_pathway_table()
+    pathway_arrays = {}
     # CSA
-    cdef int number_of_sites, p_number_of_sites=0
+    cdef int number_of_sites
     cdef ndarray[float] spin_i
     cdef ndarray[double] gyromagnetic_ratio_i
 
@@ -229,175 +591,414 @@ def one_d_spectrum(method,
 
 
     cdef int trans__, pathway_increment, pathway_count, transition_count_per_pathway
-    cdef ndarray[double, ndim=1] amp
-    amp1 = np.zeros(total_n_points, dtype=np.float64)
     amp_individual = []
 
-    cdef clib.isotopomer_ravel isotopomer_struct
+    # the spin systems are first packed into isotopomer structures with the respective
+    # transition pathways, and then simulated in parallel.
+    cdef int n_sys = 0, n_total = len(spin_systems)
+    cdef clib.isotopomer_ravel *isotopomer_struct = <clib.isotopomer_ravel *> calloc(
+        max(n_total, 1), sizeof(clib.isotopomer_ravel)
+    )
+    cdef float **transition_ptr = <float **> calloc(max(n_total, 1), sizeof(float *))
+    cdef ndarray[int] pathway_count_c = np.zeros(n_total + 1, dtype=np.int32)
+    cdef ndarray[int] pathway_increment_c = np.zeros(n_total + 1, dtype=np.int32)
+    cdef ndarray[double] abundance_c = np.zeros(n_total + 1, dtype=np.float64)
+    packed_arrays = []
 
     index_ = []
     # cdef clib.isotopomers_list *isotopomers_list_c
 
     # ---------------------------------------------------------------------
     # sample _______________________________________________________________
-    for index, spin_sys in enumerate(spin_systems):
-        abundance = spin_sys.abundance
-        isotopes = [site.isotope.symbol for site in spin_sys.sites]
-        if channel not in isotopes:
-            continue
-
-        # sub_sites = [site for site in spin_sys.sites if site.isotope.symbol == isotope]
-        index_.append(index)
-        number_of_sites= len(spin_sys.sites)
+    from mrsimulator.spin_system import Site, SpinSystem, SpinSystemArray
+
+    cdef int k
+    if isinstance(spin_systems, SpinSystemArray):
+        # columnar single-site spin systems. The site parameters are read directly
+        # from the contiguous columns without creating python objects per spin system.
+        isotope_id = -1
+        if channel in spin_systems.isotopes:
+            isotope_id = spin_systems.isotopes.index(channel)
+        selection = np.where(spin_systems.isotope_index == isotope_id)[0]
+        columns = np.ascontiguousarray(spin_systems.data[:, selection])
+        index_ = selection.tolist()
+        n_sys = selection.size
+
+        spin_i = np.full(n_sys, spin_quantum_number, dtype=np.float32)
+        gyromagnetic_ratio_i = np.full(n_sys, gyromagnetic_ratio, dtype=np.float64)
+
+        iso_n = columns[0]
+        zeta_n = columns[1]
+        eta_n = columns[2]
+        ori_n = np.ascontiguousarray(columns[3:6].T).ravel()
+
+        Cq_e = np.zeros(n_sys, dtype=np.float64)
+        eta_e = np.zeros(n_sys, dtype=np.float64)
+        ori_e = np.zeros(3 * n_sys, dtype=np.float64)
+        if spin_quantum_number > 0.5:
+            Cq_e = columns[6]
+            eta_e = columns[7]
+            ori_e = np.ascontiguousarray(columns[8:11].T).ravel()
+
+        D_c = np.zeros(n_sys, dtype=np.float64)
+        abundance_c = np.ascontiguousarray(columns[11])
+
+        # all spin systems share the transition pathways of a single-site system.
+        transition_pathway = method._get_transition_pathways_np(
+            SpinSystem(sites=[Site(isotope=channel)]), pathway_table
+        )
+        transition_array = np.asarray(transition_pathway, dtype=np.float32).ravel()
+        pathway_count, transition_count_per_pathway = transition_pathway.shape[:2]
+        pathway_increment = 2 * transition_count_per_pathway
+
+        for k in range(n_sys):
+            isotopomer_struct[k].number_of_sites = 1
+            isotopomer_struct[k].spin = &spin_i[k]
+            isotopomer_struct[k].gyromagnetic_ratio = &gyromagnetic_ratio_i[k]
+
+            isotopomer_struct[k].isotropic_chemical_shift_in_ppm = &iso_n[k]
+            isotopomer_struct[k].shielding_symmetric_zeta_in_ppm = &zeta_n[k]
+            isotopomer_struct[k].shielding_symmetric_eta = &eta_n[k]
+            isotopomer_struct[k].shielding_orientation = &ori_n[3 * k]
+
+            isotopomer_struct[k].quadrupolar_Cq_in_Hz = &Cq_e[k]
+            isotopomer_struct[k].quadrupolar_eta = &eta_e[k]
+            isotopomer_struct[k].quadrupolar_orientation = &ori_e[3 * k]
+
+            isotopomer_struct[k].dipolar_couplings = &D_c[k]
+
+            transition_ptr[k] = &transition_array[0]
+            pathway_count_c[k] = pathway_count
+            pathway_increment_c[k] = pathway_increment
+
+        amp_individual = list(range(n_sys))
+        anisotropic_keys = np.column_stack(
+            (zeta_n, eta_n, ori_n.reshape(-1, 3), Cq_e, eta_e, ori_e.reshape(-1, 3))
+        )
 
-        if number_of_sites > 2:
-            continue
-        # site specification
-        # CSA
-        spin_i = np.empty(number_of_sites, dtype=np.float32)
-        gyromagnetic_ratio_i = np.empty(number_of_sites, dtype=np.float64)
-
-        iso_n = np.zeros(number_of_sites, dtype=np.float64)
-        zeta_n = np.zeros(number_of_sites, dtype=np.float64)
-        eta_n = np.zeros(number_of_sites, dtype=np.float64)
-        ori_n = np.zeros(3*number_of_sites, dtype=np.float64)
-
-        # quad
-        Cq_e = np.zeros(number_of_sites, dtype=np.float64)
-        eta_e = np.zeros(number_of_sites, dtype=np.float64)
-        ori_e = np.zeros(3*number_of_sites, dtype=np.float64)
-
-        # for n sites, coupling grows as sum_{i=1}^{n-1}(i)
-        D_c = np.zeros(number_of_sites, dtype=np.float64)
-
-        amp = np.zeros(total_n_points)
-
-        for i in range(number_of_sites):
-            site = spin_sys.sites[i]
-            spin_i[i] = site.isotope.spin
-            gyromagnetic_ratio_i[i] = site.isotope.gyromagnetic_ratio
-            i3 = 3*i
-
-            # CSA tensor
-            if site.isotropic_chemical_shift is not None:
-                iso_n[i] = site.isotropic_chemical_shift
-
-            shielding = site.shielding_symmetric
-            if shielding is not None:
-                if shielding.zeta is not None:
-                    zeta_n[i] = shielding.zeta
-                if shielding.eta is not None:
-                    eta_n[i] = shielding.eta
-                if shielding.alpha is not None:
-                    ori_n[i3] = shielding.alpha
-                if shielding.beta is not None:
-                    ori_n[i3+1] = shielding.beta
-                if shielding.gamma is not None:
-                    ori_n[i3+2] = shielding.gamma
-
-            # if verbose in [1, 11]:
-            #     text = ((
-            #         f"\n{isotope} site {i} from spin system {index_isotopomer} "
-            #         f"@ {abundance}% abundance"
-            #     ))
-            #     len_ = len(text)
-            #     print(text)
-            #     print(f"{'-'*(len_-1)}")
-            #     print(f'Isotropic chemical shift (δ) = {str(1e6*iso/larmor_frequency)} ppm')
-            #     print(f'Shielding anisotropy (ζ) = {str(1e6*zeta/larmor_frequency)} ppm')
-            #     print(f'Shielding asymmetry (η) = {eta}')
-            #     print(f'Shielding orientation = [alpha = {alpha}, beta = {beta}, gamma = {gamma}]')
-
-            # quad tensor
-            if spin_quantum_number > 0.5:
-                quad = site.quadrupolar
-                if quad is not None:
-                    if quad.Cq is not None:
-                        Cq_e[i] = quad.Cq
-                    if quad.eta is not None:
-                        eta_e[i] = quad.eta
-                    if quad.alpha is not None:
-                        ori_e[i3] = quad.alpha
-                    if quad.beta is not None:
-                        ori_e[i3+1] = quad.beta
-                    if quad.gamma is not None:
-                        ori_e[i3+2] = quad.gamma
+    else:
+        anisotropic_keys = []
+        if spin_system_index is None:
+            spin_system_index = range(len(spin_systems))
+        for index in spin_system_index:
+            spin_sys = spin_systems[index]
+            abundance = spin_sys.abundance
+            isotopes = [site.isotope.symbol for site in spin_sys.sites]
+            if channel not in isotopes:
+                continue
+
+            # sub_sites = [site for site in spin_sys.sites if site.isotope.symbol == isotope]
+            index_.append(index)
+            number_of_sites= len(spin_sys.sites)
+
+            if number_of_sites > 2:
+                continue
+            # site specification
+            # CSA
+            spin_i = np.empty(number_of_sites, dtype=np.float32)
+            gyromagnetic_ratio_i = np.empty(number_of_sites, dtype=np.float64)
+
+            iso_n = np.zeros(number_of_sites, dtype=np.float64)
+            zeta_n = np.zeros(number_of_sites, dtype=np.float64)
+            eta_n = np.zeros(number_of_sites, dtype=np.float64)
+            ori_n = np.zeros(3*number_of_sites, dtype=np.float64)
+
+            # quad
+            Cq_e = np.zeros(number_of_sites, dtype=np.float64)
+            eta_e = np.zeros(number_of_sites, dtype=np.float64)
+            ori_e = np.zeros(3*number_of_sites, dtype=np.float64)
+
+            # for n sites, coupling grows as sum_{i=1}^{n-1}(i)
+            D_c = np.zeros(number_of_sites, dtype=np.float64)
+
+            for i in range(number_of_sites):
+                site = spin_sys.sites[i]
+                spin_i[i] = site.isotope.spin
+                gyromagnetic_ratio_i[i] = site.isotope.gyromagnetic_ratio
+                i3 = 3*i
+
+                # CSA tensor
+                if site.isotropic_chemical_shift is not None:
+                    iso_n[i] = site.isotropic_chemical_shift
+
+                shielding = site.shielding_symmetric
+                if shielding is not None:
+                    if shielding.zeta is not None:
+                        zeta_n[i] = shielding.zeta
+                    if shielding.eta is not None:
+                        eta_n[i] = shielding.eta
+                    if shielding.alpha is not None:
+                        ori_n[i3] = shielding.alpha
+                    if shielding.beta is not None:
+                        ori_n[i3+1] = shielding.beta
+                    if shielding.gamma is not None:
+                        ori_n[i3+2] = shielding.gamma
 
                 # if verbose in [1, 11]:
-                #     print(f'Quadrupolar coupling constant (Cq) = {Cq_e[i]/1e6} MHz')
-                #     print(f'Quadrupolar asymmetry (η) = {eta}')
-                #     print(f'Quadrupolar orientation = [alpha = {alpha}, beta = {beta}, gamma = {gamma}]')
-
-        if number_of_sites != 0:
-            if number_of_sites != p_number_of_sites and isotopes != p_isotopes:
+                #     text = ((
+                #         f"\n{isotope} site {i} from spin system {index_isotopomer} "
+                #         f"@ {abundance}% abundance"
+                #     ))
+                #     len_ = len(text)
+                #     print(text)
+                #     print(f"{'-'*(len_-1)}")
+                #     print(f'Isotropic chemical shift (δ) = {str(1e6*iso/larmor_frequency)} ppm')
+                #     print(f'Shielding anisotropy (ζ) = {str(1e6*zeta/larmor_frequency)} ppm')
+                #     print(f'Shielding asymmetry (η) = {eta}')
+                #     print(f'Shielding orientation = [alpha = {alpha}, beta = {beta}, gamma = {gamma}]')
+
+                # quad tensor
+                if spin_quantum_number > 0.5:
+                    quad = site.quadrupolar
+                    if quad is not None:
+                        if quad.Cq is not None:
+                            Cq_e[i] = quad.Cq
+                        if quad.eta is not None:
+                            eta_e[i] = quad.eta
+                        if quad.alpha is not None:
+                            ori_e[i3] = quad.alpha
+                        if quad.beta is not None:
+                            ori_e[i3+1] = quad.beta
+                        if quad.gamma is not None:
+                            ori_e[i3+2] = quad.gamma
+
+                    # if verbose in [1, 11]:
+                    #     print(f'Quadrupolar coupling constant (Cq) = {Cq_e[i]/1e6} MHz')
+                    #     print(f'Quadrupolar asymmetry (η) = {eta}')
+                    #     print(f'Quadrupolar orientation = [alpha = {alpha}, beta = {beta}, gamma = {gamma}]')
+
+            if number_of_sites != 0:
                 transition_pathway = spin_sys.transition_pathways
                 if transition_pathway is None:
-                    transition_pathway = np.asarray(method._get_transition_pathways_np(spin_sys))
-                    transition_array = np.asarray(transition_pathway, dtype=np.float32).ravel()
+                    # the transition pathways and the respective packed arrays are
+                    # shared among the spin systems with the same ordered isotopes.
+                    key = tuple(isotopes)
+                    if key not in pathway_arrays:
+                        transition_pathway = method._get_transition_pathways_np(
+                            spin_sys, pathway_table
+                        )
+                        pathway_arrays[key] = (
+                            np.asarray(transition_pathway, dtype=np.float32).ravel(),
+                            *transition_pathway.shape[:2],
+                        )
+                    transition_array, pathway_count, transition_count_per_pathway = (
+                        pathway_arrays[key]
+                    )
                 else:
                     transition_pathway = np.asarray(transition_pathway)
                     # convert transition objects to list
                     lst = [item.tolist() for item in transition_pathway.ravel()]
                     transition_array = np.asarray(lst, dtype=np.float32).ravel()
-
-                pathway_count, transition_count_per_pathway = transition_pathway.shape[:2]
+                    pathway_count, transition_count_per_pathway = transition_pathway.shape[:2]
                 pathway_increment = 2*number_of_sites*transition_count_per_pathway
 
-                p_number_of_sites = number_of_sites
-                p_isotopes = isotopes
-
-            # if spin_sys.transitions is not None:
-            #     transition_array = np.asarray(
-            #         spin_sys.transitions, dtype=np.float32
-            #     ).ravel()
-            # else:
-            #     transition_array = np.asarray([0.5, -0.5], dtype=np.float32)
-
-            # the number 2 is because of single site transition [mi, mf]
-            # it dose not work for coupled sites.
-            # transition_increment = 2*number_of_sites
-            # number_of_transitions = int((transition_array.size)/transition_increment)
-
-            isotopomer_struct.number_of_sites = number_of_sites
-            isotopomer_struct.spin = &spin_i[0]
-            isotopomer_struct.gyromagnetic_ratio = &gyromagnetic_ratio_i[0]
-
-            isotopomer_struct.isotropic_chemical_shift_in_ppm = &iso_n[0]
-            isotopomer_struct.shielding_symmetric_zeta_in_ppm = &zeta_n[0]
-            isotopomer_struct.shielding_symmetric_eta = &eta_n[0]
-            isotopomer_struct.shielding_orientation = &ori_n[0]
-
-            isotopomer_struct.quadrupolar_Cq_in_Hz = &Cq_e[0]
-            isotopomer_struct.quadrupolar_eta = &eta_e[0]
-            isotopomer_struct.quadrupolar_orientation = &ori_e[0]
-
-            isotopomer_struct.dipolar_couplings = &D_c[0]
-
-            # isotopomers_list_c[i] = isotopomer_struct
-            for trans__ in range(pathway_count):
-                clib.__mrsimulator_core(
-                    # spectrum information and related amplitude
-                    &amp[0],
-                    &isotopomer_struct,
-                    &transition_array[pathway_increment*trans__],
-                    the_sequence,
-                    n_sequence,
-                    the_fftw_scheme,
-                    the_averaging_scheme,
-                    interpolation,
-                    &freq_contrib_c[0],
-                    &affine_matrix_c[0],
-                    )
-
-            temp = amp*abundance/norm
-
-            if decompose_spectrum == 1:
-                amp_individual.append(temp.reshape(method.shape()))
+                # if spin_sys.transitions is not None:
+                #     transition_array = np.asarray(
+                #         spin_sys.transitions, dtype=np.float32
+                #     ).ravel()
+                # else:
+                #     transition_array = np.asarray([0.5, -0.5], dtype=np.float32)
+
+                # the number 2 is because of single site transition [mi, mf]
+                # it dose not work for coupled sites.
+                # transition_increment = 2*number_of_sites
+                # number_of_transitions = int((transition_array.size)/transition_increment)
+
+                isotopomer_struct[n_sys].number_of_sites = number_of_sites
+                isotopomer_struct[n_sys].spin = &spin_i[0]
+                isotopomer_struct[n_sys].gyromagnetic_ratio = &gyromagnetic_ratio_i[0]
+
+                isotopomer_struct[n_sys].isotropic_chemical_shift_in_ppm = &iso_n[0]
+                isotopomer_struct[n_sys].shielding_symmetric_zeta_in_ppm = &zeta_n[0]
+                isotopomer_struct[n_sys].shielding_symmetric_eta = &eta_n[0]
+                isotopomer_struct[n_sys].shielding_orientation = &ori_n[0]
+
+                isotopomer_struct[n_sys].quadrupolar_Cq_in_Hz = &Cq_e[0]
+                isotopomer_struct[n_sys].quadrupolar_eta = &eta_e[0]
+                isotopomer_struct[n_sys].quadrupolar_orientation = &ori_e[0]
+
+                isotopomer_struct[n_sys].dipolar_couplings = &D_c[0]
+
+                transition_ptr[n_sys] = &transition_array[0]
+                pathway_count_c[n_sys] = pathway_count
+                pathway_increment_c[n_sys] = pathway_increment
+                abundance_c[n_sys] = abundance
+
+                # hold a reference to the arrays until the simulation is complete.
+                packed_arrays.append(
+                    (spin_i, gyromagnetic_ratio_i, iso_n, zeta_n, eta_n, ori_n, Cq_e,
+                     eta_e, ori_e, D_c, transition_array)
+                )
+                # only the single-site spin systems sharing the transition pathways are
+                # grouped, the remaining are assigned a unique key.
+                anisotropic_keys.append(
+                    [zeta_n[0], eta_n[0], *ori_n[:3], Cq_e[0], eta_e[0], *ori_e[:3],
+                     id(transition_array), pathway_count,
+                     -1 if number_of_sites == 1 else n_sys]
+                )
+                amp_individual.append(n_sys)
+                n_sys += 1
             else:
-                amp1 += temp
-        else:
-            if decompose_spectrum == 1:
-                amp_individual.append([])
+                if decompose_spectrum == 1:
+                    amp_individual.append([])
+
+# simulate ____________________________________________________________________________
+    # When decomposed, every spin system is simulated into its own row of the `spec`
+    # array, otherwise, every thread accumulates into its own row of `spec`.
+    cdef int n_rows = n_sys if decompose_spectrum == 1 else n_threads
+    cdef ndarray[double, ndim=2] spec = np.zeros((max(n_rows, 1), total_n_points))
+    cdef ndarray[double, ndim=2] buffer = np.zeros((n_threads, total_n_points))
+    cdef double *spec_ptr = &spec[0, 0]
+    cdef double *buffer_ptr = &buffer[0, 0]
+    cdef double *amp_ptr
+    cdef double *acc_ptr
+    cdef double scale, norm_c = norm
+    cdef int tid, j, n_points = total_n_points
+    cdef bool_t decompose = decompose_spectrum == 1
+
+    # spin systems that differ only in the isotropic chemical shifts are grouped. The
+    # frequencies and amplitudes are evaluated once per group and transition, and
+    # the spectrum of every member is binned at the respective isotropic offset.
+    group_order, group_start = _get_translation_groups(
+        anisotropic_keys, -(-n_sys // n_threads)
+    )
+    cdef ndarray[int] order_c = group_order
+    cdef ndarray[int] start_c = group_start
+    cdef int g, m, n_groups = start_c.size - 1
+    cdef bool_t from_basis
+
+    # the frequencies of every transition from a single-site spin system are linear
+    # combinations of the site spatial tensors (site bases). When the site has more
+    # than one transition, the bases are rotated once over all orientations, and are
+    # re-used for every transition pathway and event. With a basis cache, the bases
+    # are also re-used across the methods. The basis modes are 0) no basis, 1) load
+    # from the cache, 2) rotate, and 3) rotate and save to the cache.
+    cdef ndarray[int] basis_mode_c = np.zeros(max(n_groups, 1), dtype=np.int32)
+    cdef double **basis_ptr = <double **> calloc(max(n_groups, 1), sizeof(double *))
+    cdef ndarray[double] basis_buffer
+    cdef unsigned int basis_size = clib.MRS_site_basis_size(the_averaging_scheme[0])
+    new_bases = {}
+    for g in range(n_groups):
+        k = order_c[start_c[g]]
+        if isotopomer_struct[k].number_of_sites != 1:
+            continue
+        if pathway_count_c[k] * pathway_increment_c[k] > 2:
+            basis_mode_c[g] = 2
+        if basis_cache is None:
+            continue
+        key = (
+            channel, integration_density, integration_volume, allow_fourth_rank,
+            *np.asarray(anisotropic_keys[k][:10], dtype=np.float64).tolist()
+        )
+        if key in new_bases:
+            continue
+        buffer_, ready = basis_cache.request(key, basis_size)
+        if buffer_ is None:
+            continue
+        basis_buffer = buffer_
+        basis_ptr[g] = &basis_buffer[0]
+        basis_mode_c[g] = 1 if ready else 3
+        if not ready:
+            new_bases[key] = buffer_
+
+    with nogil, parallel(num_threads=n_threads):
+        for g in prange(n_groups, schedule='static', chunksize=1):
+            tid = threadid()
+            k = order_c[start_c[g]]
+
+            from_basis = basis_mode_c[g] != 0
+            if basis_mode_c[g] == 1:
+                clib.MRS_load_site_basis(
+                    the_averaging_scheme[tid], &isotopomer_struct[k], basis_ptr[g]
+                )
+            elif basis_mode_c[g] >= 2:
+                clib.__mrsimulator_site_basis(
+                    &isotopomer_struct[k], the_sequence[tid], the_averaging_scheme[tid]
+                )
+                if basis_mode_c[g] == 3:
+                    clib.MRS_save_site_basis(the_averaging_scheme[tid], basis_ptr[g])
+
+            for trans__ in range(pathway_count_c[k]):
+                for m in range(start_c[g], start_c[g + 1]):
+                    k = order_c[m]
+                    if decompose:
+                        amp_ptr = spec_ptr + k * n_points
+                    else:
+                        amp_ptr = buffer_ptr + tid * n_points
+                        memset(amp_ptr, 0, n_points * sizeof(double))
+
+                    if m == start_c[g] and from_basis:
+                        clib.__mrsimulator_core_from_basis(
+                            amp_ptr,
+                            &isotopomer_struct[k],
+                            transition_ptr[k] + pathway_increment_c[k] * trans__,
+                            the_sequence[tid],
+                            n_sequence,
+                            the_fftw_scheme[tid],
+                            the_averaging_scheme[tid],
+                            interpolation,
+                            &freq_contrib_c[0],
+                            &affine_matrix_c[0],
+                            )
+                    elif m == start_c[g]:
+                        clib.__mrsimulator_core(
+                            # spectrum information and related amplitude
+                            amp_ptr,
+                            &isotopomer_struct[k],
+                            transition_ptr[k] + pathway_increment_c[k] * trans__,
+                            the_sequence[tid],
+                            n_sequence,
+                            the_fftw_scheme[tid],
+                            the_averaging_scheme[tid],
+                            interpolation,
+                            &freq_contrib_c[0],
+                            &affine_matrix_c[0],
+                            )
+                    else:
+                        clib.__mrsimulator_core_translate(
+                            amp_ptr,
+                            &isotopomer_struct[k],
+                            transition_ptr[k] + pathway_increment_c[k] * trans__,
+                            the_sequence[tid],
+                            n_sequence,
+                            the_fftw_scheme[tid],
+                            the_averaging_scheme[tid],
+                            interpolation,
+                            &freq_contrib_c[0],
+                            &affine_matrix_c[0],
+                            )
+
+                    if not decompose:
+                        scale = abundance_c[k] / norm_c
+                        acc_ptr = spec_ptr + tid * n_points
+                        for j in range(n_points):
+                            acc_ptr[j] = acc_ptr[j] + amp_ptr[j] * scale
+
+            if decompose:
+                for m in range(start_c[g], start_c[g + 1]):
+                    k = order_c[m]
+                    amp_ptr = spec_ptr + k * n_points
+                    scale = abundance_c[k] / norm_c
+                    for j in range(n_points):
+                        amp_ptr[j] = amp_ptr[j] * scale
+
+    free(isotopomer_struct)
+    free(transition_ptr)
+    free(basis_ptr)
+    if basis_cache is not None:
+        basis_cache.bases.update(new_bases)
+
+    if decompose_spectrum == 1:
+        amp1 = np.zeros(total_n_points, dtype=np.float64)
+        amp_individual = [
+            item if isinstance(item, list) else spec[item].reshape(method.shape())
+            for item in amp_individual
+        ]
+    else:
+        # reduce the thread accumulators in a fixed order.
+        amp1 = spec[0].copy()
+        for k in range(1, n_threads):
+            amp1 += spec[k]
 
     # reverse the spectrum if gyromagnetic ratio is positive.
     if decompose_spectrum == 1 and len(amp_individual) != 0:
@@ -410,22 +1011,54 @@ def one_d_spectrum(method,
         if gyromagnetic_ratio < 0:
             amp1 = np.fft.fftn(np.fft.ifftn(amp1).conj()).real
 
-    clib.MRS_free_sequence(the_sequence, n_sequence)
-    clib.MRS_free_averaging_scheme(the_averaging_scheme)
-    clib.MRS_free_fftw_scheme(the_fftw_scheme)
     return amp1, index_
 
 
+def _get_translation_groups(keys, max_size):
+    """Group the spin systems with identical rows of anisotropic `keys`.
+
+    Args:
+        keys: A 2D array-like of the anisotropic parameters, one row per spin system.
+        max_size: The maximum number of spin systems per group. Larger groups are
+            split to balance the load over the threads.
+
+    Returns:
+        A tuple of two int32 arrays, the spin system indexes ordered by group, and the
+        start of every group within the ordered indexes followed by the total count.
+    """
+    keys = np.asarray(keys, dtype=np.float64)
+    n = keys.shape[0]
+    if n == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int32)
+
+    _, inverse, counts = np.unique(
+        keys, axis=0, return_inverse=True, return_counts=True
+    )
+    order = np.argsort(inverse.ravel(), kind="stable")
+    bounds = np.append(0, np.cumsum(counts))
+    start = [i for a, b in zip(bounds[:-1], bounds[1:]) for i in range(a, b, max_size)]
+    return (
+        np.asarray(order, dtype=np.int32),
+        np.asarray(start + [n], dtype=np.int32),
+    )
+
+
+# Zeeman energy states keyed by the ordered tuple of the site spin quantum numbers.
+_zeeman_states = {}
+
+
 @cython.profile(False)
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def get_zeeman_states(sys):
     cdef int i, j, n_site = len(sys.sites)
 
-    two_Ip1 = [int(2 * site.isotope.spin + 1) for site in sys.sites]
-    spin_quantum_numbers = [
-        np.arange(two_Ip1[i]) - site.isotope.spin for i, site in enumerate(sys.sites)
-    ]
+    key = tuple(site.isotope.spin for site in sys.sites)
+    if key in _zeeman_states:
+        return _zeeman_states[key]
+
+    two_Ip1 = [int(2 * spin + 1) for spin in key]
+    spin_quantum_numbers = [np.arange(two_Ip1[i]) - spin for i, spin in enumerate(key)]
 
     lst = []
     for j in range(n_site):
@@ -436,4 +1069,7 @@ def get_zeeman_states(sys):
             else:
                 k = np.kron(k, np.ones(two_Ip1[i]))
         lst.append(k)
-    return np.asarray(lst).T
+    states = np.asarray(lst).T
+    states.flags.writeable = False
+    _zeeman_states[key] = states
+    return states
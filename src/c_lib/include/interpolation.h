@@ -9,6 +9,23 @@
 
 #include "config.h"
 
+/** The number of triangles processed per batch in the batch interpolations. */
+#define MRS_TRIANGLE_BATCH 64
+
+/**
+ * Runtime CPU dispatch. With gcc on x86-64 linux, the batch interpolations are
+ * compiled for the AVX2 and the baseline instruction sets, and the variant is
+ * selected at load time based on the host CPU. Elsewhere, the batch
+ * interpolations are compiled for the target instruction set, for example,
+ * NEON on arm64.
+ */
+#if defined(__GNUC__) && !defined(__clang__) && defined(__x86_64__) && \
+    defined(__linux__)
+#define MRS_TARGET_CLONES __attribute__((target_clones("avx2", "default")))
+#else
+#define MRS_TARGET_CLONES
+#endif
+
 /**
  * @func triangle_interpolation
  *
@@ -44,3 +61,41 @@ extern int triangle_interpolation(double *f1, double *f2, double *f3,
 extern int triangle_interpolation2D(double *f11, double *f12, double *f13,
                                     double *f21, double *f22, double *f23,
                                     double *amp, double *spec, int m0, int m1);
+
+/**
+ * @func triangle_interpolation_batch
+ *
+ * Create a batch of triangles with coordinates (freq1[i], freq2[i], freq3[i])
+ * onto a 1D grid. The vertices are sorted over the whole batch with branchless
+ * min-max operations before the triangles are binned in order. The result is
+ * identical to calling triangle_interpolation for every triangle.
+ *
+ * @param count The number of triangles.
+ * @param freq1 A pointer to the first coordinates of the triangles.
+ * @param freq2 A pointer to the second coordinates of the triangles.
+ * @param freq3 A pointer to the third coordinates of the triangles.
+ * @param amp A pointer to the areas of the triangles.
+ * @param spec A pointer to the starting of the array of one dimensional grid.
+ * @param points The number of points on the 1D grid.
+ */
+extern void triangle_interpolation_batch(int count, const double *freq1,
+                                         const double *freq2,
+                                         const double *freq3,
+                                         const double *amp, double *spec,
+                                         int points);
+
+/**
+ * @func triangle_interpolation2D_batch
+ *
+ * Rasterize a batch of triangles with coordinates ((freq11[i], freq21[i]),
+ * (freq12[i], freq22[i]), (freq13[i], freq23[i])) onto a 2D grid. The result
+ * is identical to calling triangle_interpolation2D for every triangle.
+ *
+ * @param count The number of triangles.
+ * @param m0 An interger with the rows in the 2D grid.
+ * @param m1 An interger with the columns in the 2D grid.
+ */
+extern void triangle_interpolation2D_batch(
+    int count, const double *freq11, const double *freq12,
+    const double *freq13, const double *freq21, const double *freq22,
+    const double *freq23, const double *amp, double *spec, int m0, int m1);
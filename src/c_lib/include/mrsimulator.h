@@ -186,6 +186,18 @@ void MRS_get_normalized_frequencies_from_plan(MRS_averaging_scheme *scheme,
                                               bool refresh, MRS_sequence *seq,
                                               double fraction);
 
+/**
+ * @brief Process the plan for normalized frequencies at every orientation from
+ * the rotor frame tensors.
+ *
+ * Same as MRS_get_normalized_frequencies_from_plan(), except the second and
+ * fourth rank tensors are read from the `w2` and `w4` buffers of the averaging
+ * scheme, and are not rotated from the common frame.
+ */
+void MRS_get_normalized_frequencies_from_rotor_frame(
+    MRS_averaging_scheme *scheme, MRS_plan *plan, double R0, bool refresh,
+    MRS_sequence *seq, double fraction);
+
 void MRS_get_frequencies_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
                                    double R0, complex128 *R2, complex128 *R4,
                                    bool refresh, MRS_sequence *seq);
@@ -239,6 +251,65 @@ void MRS_rotate_components_from_PAS_to_common_frame(
     bool *freq_contrib       // the pointer to freq contribs boolean
 );
 
+/**
+ * @func MRS_rotate_site_basis
+ *
+ * Evaluate the spatial tensors of the first site of the isotopomer at a unit
+ * Larmor frequency and rotate the tensors from the common frame to the rotor
+ * frame over all orientations. Since the frequency components of a site are
+ * linear in the spatial tensors, where the coefficients are the spin transition
+ * functions and powers of the Larmor frequency, the rotated tensors are the
+ * basis for the frequencies of every spin transition and every magnetic flux
+ * density. The bases are stored in the averaging scheme.
+ *
+ * @param scheme A pointer to the MRS_averaging_scheme.
+ * @param plan A pointer to the MRS_plan.
+ * @param ravel_isotopomer A pointer to the isotopomer_ravel structure.
+ */
+void MRS_rotate_site_basis(MRS_averaging_scheme *scheme, MRS_plan *plan,
+                           isotopomer_ravel *ravel_isotopomer);
+
+/**
+ * @func MRS_site_basis_size
+ *
+ * The number of doubles required to store the site bases of the averaging
+ * scheme with MRS_save_site_basis().
+ */
+unsigned int MRS_site_basis_size(MRS_averaging_scheme *scheme);
+
+/**
+ * @func MRS_save_site_basis
+ *
+ * Copy the site bases from MRS_rotate_site_basis() to the @p buffer of size
+ * MRS_site_basis_size(). Since the bases are independent of the magnetic flux
+ * density, the spin transitions, and the sample rotation, the buffer may be
+ * re-used with the methods that share the averaging scheme parameters.
+ */
+void MRS_save_site_basis(MRS_averaging_scheme *scheme, double *buffer);
+
+/**
+ * @func MRS_load_site_basis
+ *
+ * Restore the site bases of the isotopomer from the @p buffer of a previous
+ * MRS_save_site_basis() call.
+ */
+void MRS_load_site_basis(MRS_averaging_scheme *scheme,
+                         isotopomer_ravel *ravel_isotopomer, double *buffer);
+
+/**
+ * @func MRS_get_components_from_site_basis
+ *
+ * Evaluate the rotor frame tensors, `w2` and `w4`, of the averaging scheme,
+ * and the zeroth rank frequency component, @p R0, of the spin transition as a
+ * linear combination of the site bases from MRS_rotate_site_basis(). The
+ * arguments follow MRS_rotate_components_from_PAS_to_common_frame().
+ */
+void MRS_get_components_from_site_basis(MRS_averaging_scheme *scheme,
+                                        isotopomer_ravel *ravel_isotopomer,
+                                        float *transition,
+                                        bool allow_fourth_rank, double *R0,
+                                        double B0_in_T, bool *freq_contrib);
+
 extern void __get_components(unsigned int number_of_sidebands,
                              double spin_frequency, double *restrict pre_phase);
 
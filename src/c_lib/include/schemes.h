@@ -54,6 +54,14 @@ typedef struct MRS_averaging_scheme {
   // double *freq_offset;         //  buffer for local + sideband frequencies.
   unsigned int integration_volume;  //  0-octant, 1-hemisphere, 2-sphere.
   bool allow_fourth_rank;  // If true, compute wigner matrices for wigner-d 4j.
+
+  /* The spatial tensors of a site at a unit Larmor frequency and a unit spin
+   * transition function, rotated to the rotor frame over all orientations.
+   * The bases are allocated on first use. @see MRS_rotate_site_basis() */
+  complex128 *w2_basis;  //  shielding, 1st and 2nd order quad 2nd rank bases.
+  complex128 *w4_basis;  //  2nd order quad 4th rank basis.
+  double R0_basis[2];    //  shielding and 2nd order quad zeroth rank bases.
+  bool basis_active[4];  //  false when the respective basis is zero.
 } MRS_averaging_scheme;
 
 // typedef struct MRS_averaging_scheme;
@@ -119,10 +127,48 @@ typedef struct MRS_fftw_scheme {
   fftw_complex *vector;  // holds the amplitude of sidebands.
 
   fftw_plan the_fftw_plan;  //  The plan for fftw routine.
+
+  /** The sideband amplitudes, |vector|^2, as a double array with a stride of
+   * `stride`. In double precision, the amplitudes are the real part of the
+   * `vector` array (stride 2). In single precision, the amplitudes overwrite
+   * the `vector_f` array (stride 1).
+   */
+  double *amplitudes;
+  unsigned int stride;
+
+  /* single precision buffers and plan, allocated only in single precision. */
+  bool single_precision;      //  If true, evaluate the sidebands in float32.
+  fftwf_complex *vector_f;    //  holds the amplitude of sidebands (float32).
+  fftwf_plan the_fftwf_plan;  //  The plan for fftwf routine.
+  complex64 *w_f;             //  buffer for the lab frame tensors (float32).
+  complex64 *pre_phase_f;     //  buffer for the sideband phase (float32).
 } MRS_fftw_scheme;
 
+/**
+ * Create a new fftw scheme.
+ *
+ * @param total_orientations The total number of orientations.
+ * @param number_of_sidebands The number of sidebands.
+ * @param planner_flag The fftw planner rigor flag, FFTW_ESTIMATE, FFTW_MEASURE,
+ *            or FFTW_PATIENT. The rigorous planners use the accumulated wisdom
+ *            when available.
+ * @param n_threads The number of threads for the fftw plan. The value is
+ *            ignored when the library is compiled without fftw threads, and
+ *            for the single precision plans.
+ * @param single_precision If true, the sideband amplitudes are evaluated with
+ *            single precision (float32) buffers and an fftwf plan.
+ * @return A pointer to the MRS_fftw_scheme.
+ */
 MRS_fftw_scheme *create_fftw_scheme(unsigned int total_orientations,
-                                    unsigned int number_of_sidebands);
+                                    unsigned int number_of_sidebands,
+                                    unsigned int planner_flag, int n_threads,
+                                    bool single_precision);
+
+/**
+ * Initialize the fftw threads. Returns a non-zero value on success, and zero
+ * on failure or when the library is compiled without fftw threads.
+ */
+int MRS_fftw_init_threads(void);
 
 void MRS_free_fftw_scheme(MRS_fftw_scheme *fftw_scheme);
 
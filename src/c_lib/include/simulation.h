@@ -48,3 +48,37 @@ extern void __mrsimulator_core(
     float *transition, MRS_sequence *the_sequence, int n_sequence,
     MRS_fftw_scheme *fftw_scheme, MRS_averaging_scheme *scheme,
     bool interpolation, bool *freq_contrib, double *affine_matrix);
+
+/**
+ * Re-evaluate the spectrum of a spin transition from the frequencies and the
+ * amplitudes of the previous `__mrsimulator_core` call on the same sequences and
+ * schemes. Only the isotropic offsets are evaluated from the given isotopomer.
+ * The result is exact when the isotopomer differs from the isotopomer of the
+ * previous call only in the isotropic chemical shifts.
+ */
+extern void __mrsimulator_core_translate(
+    double *spec, isotopomer_ravel *ravel_isotopomer, float *transition,
+    MRS_sequence *the_sequence, int n_sequence, MRS_fftw_scheme *fftw_scheme,
+    MRS_averaging_scheme *scheme, bool interpolation, bool *freq_contrib,
+    double *affine_matrix);
+
+/**
+ * Rotate the spatial tensors of the single-site isotopomer to the rotor frame
+ * over all orientations. The rotated tensors are held by the averaging scheme
+ * and are the basis for the frequencies of every spin transition and event in
+ * the subsequent `__mrsimulator_core_from_basis` calls.
+ */
+extern void __mrsimulator_site_basis(isotopomer_ravel *ravel_isotopomer,
+                                     MRS_sequence *the_sequence,
+                                     MRS_averaging_scheme *scheme);
+
+/**
+ * Same as `__mrsimulator_core`, except the frequencies are evaluated from the
+ * site bases of the last `__mrsimulator_site_basis` call on the same scheme
+ * and isotopomer. Only single-site isotopomers are supported.
+ */
+extern void __mrsimulator_core_from_basis(
+    double *spec, isotopomer_ravel *ravel_isotopomer, float *transition,
+    MRS_sequence *the_sequence, int n_sequence, MRS_fftw_scheme *fftw_scheme,
+    MRS_averaging_scheme *scheme, bool interpolation, bool *freq_contrib,
+    double *affine_matrix);
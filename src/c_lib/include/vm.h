@@ -358,6 +358,54 @@ static inline void vm_double_complex_exp_imag_only(int count,
   }
 }
 
+/** Single precision suit ================================================== */
+/**
+ * Convert the elements of vector x of type double to type float.
+ * res = (float) x
+ */
+static inline void vm_double_to_float(int count, const double *restrict x,
+                                      float *restrict res) {
+  while (count-- > 0) {
+    *res++ = (float)*x++;
+  }
+}
+
+/**
+ * Exponent of the elements of vector x stored in res of type complex64.
+ * res = exp(x(imag))
+ */
+static inline void vm_float_complex_exp_imag_only(int count,
+                                                  const void *restrict x,
+                                                  void *restrict res) {
+  float *x_ = (float *)x;
+  float *res_ = (float *)res;
+
+  while (count-- > 0) {
+    x_++;
+    *res_++ = cosf(*x_);
+    *res_++ = sinf(*x_++);
+  }
+}
+
+/**
+ * Absolute value square of the elements of vector x of type complex64, stored
+ * inplace as a vector of type double. The i-th double occupies the same memory
+ * as the i-th complex64 element, therefore, the conversion is safe inplace.
+ * x = (double) |x|^2
+ */
+static inline void vm_float_complex_abs_square_to_double_inplace(int count,
+                                                                 void *x) {
+  float *x_ = (float *)x;
+  double *res_ = (double *)x;
+  float re, im;
+
+  while (count-- > 0) {
+    re = *x_++;
+    im = *x_++;
+    *res_++ = (double)(re * re + im * im);
+  }
+}
+
 #ifndef __blas_activate
 //========================================================================== //
 //                  Wrapper for blas and blas like functions                 //
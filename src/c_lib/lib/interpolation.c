@@ -10,78 +10,106 @@
 #include "interpolation.h"
 
 double TOL = 1.0e-6;
-// triangle_interpolation is an optimized version of tent. Still plenty of
-// room for optimization.
 
-int triangle_interpolation(double *freq1, double *freq2, double *freq3,
-                           double *amp, double *spec, int *points) {
-  double df1, df2, top = 0.0, t, diff, f10 = 0.0, f21 = 0.0, temp, n_i;
+/* Sort the values (a, b, c) in ascending order into f. The min-max network is
+ * branchless, triangle_interpolation_batch evaluates the same network over a
+ * batch of triangles. */
+static inline void __sort3(double a, double b, double c, double *f) {
+  double lo = (a > b) ? b : a;
+  double hi = (a > b) ? a : b;
+  f[0] = (lo > c) ? c : lo;
+  f[1] = (hi > c) ? ((lo > c) ? lo : c) : hi;
+  f[2] = (hi > c) ? hi : c;
+}
 
-  int p, pmid, pmax, i, j;
-  int clip_right1 = 0, clip_left1 = 0, clip_right2 = 0, clip_left2 = 0;
+/* Sort the values of f in ascending order, carrying along the values of x. The
+ * compare-swap network is branchless and stable, that is, the ties retain the
+ * order of an insertion sort. */
+static inline void __compare_swap(double *f, double *x, int i, int j) {
+  int t = f[i] > f[j];
+  double f_lo = t ? f[j] : f[i], f_hi = t ? f[i] : f[j];
+  double x_lo = t ? x[j] : x[i], x_hi = t ? x[i] : x[j];
+  f[i] = f_lo;
+  f[j] = f_hi;
+  x[i] = x_lo;
+  x[j] = x_hi;
+}
 
-  p = (int)(freq1[0]);
-  if (fabs(freq1[0] - freq2[0]) < TOL && fabs(freq1[0] - freq3[0]) < TOL) {
-    if (p >= points[0] || p < 0) {
-      return 0;
-    }
-    diff = freq1[0] - (double)p;
-    n_i = 0.5;
+static inline void __sort3_pairs(double *f, double *x) {
+  __compare_swap(f, x, 0, 1);
+  __compare_swap(f, x, 1, 2);
+  __compare_swap(f, x, 0, 1);
+}
+
+/* Return true if the triangle with vertices (f1, f2, f3) is degenerate, that
+ * is, all vertices lie within TOL of f1 or within the same bin. */
+static inline bool __is_degenerate(double f1, double f2, double f3) {
+  return (fabs(f1 - f2) < TOL && fabs(f1 - f3) < TOL) ||
+         ((int)f1 == (int)f2 && (int)f1 == (int)f3);
+}
+
+/* Bin the amplitude of a degenerate triangle with vertices (f1, f2, f3). */
+static inline void __degenerate_triangle_interpolation(double f1, double f2,
+                                                       double f3, double amp,
+                                                       double *spec,
+                                                       int points) {
+  double diff, n_i = 0.5;
+  int p = (int)f1;
+  if (p >= points || p < 0) {
+    return;
+  }
+
+  if (fabs(f1 - f2) < TOL && fabs(f1 - f3) < TOL) {
+    diff = f1 - (double)p;
     if (fabs(diff - n_i) < TOL) {
-      spec[p] += amp[0];
-      return 0;
+      spec[p] += amp;
+      return;
     }
     if (diff < n_i) {
-      if (p != 0) spec[p - 1] += amp[0] * (n_i - diff);
-      spec[p] += amp[0] * (n_i + diff);
-      return 0;
+      if (p != 0) spec[p - 1] += amp * (n_i - diff);
+      spec[p] += amp * (n_i + diff);
+      return;
     }
     if (diff > n_i) {
-      if (p + 1 != points[0]) spec[p + 1] += amp[0] * (diff - n_i);
-      spec[p] += amp[0] * (1 + n_i - diff);
-      return 0;
+      if (p + 1 != points) spec[p + 1] += amp * (diff - n_i);
+      spec[p] += amp * (1 + n_i - diff);
     }
-    return 0;
+    return;
   }
+  spec[p] += amp;
+}
 
-  if ((int)freq1[0] == (int)freq2[0] && (int)freq1[0] == (int)freq3[0]) {
-    if (p >= points[0] || p < 0) {
-      return 0;
-    }
-    spec[p] += amp[0];
-    return 0;
-  }
-  double f[3] = {freq1[0], freq2[0], freq3[0]};
-
-  // arrange the numbers in ascending order
-  for (j = 1; j <= 2; j++) {
-    t = f[j];
-    i = j - 1;
-    while (i >= 0 && f[i] > t) {
-      f[i + 1] = f[i];
-      i--;
-    }
-    f[i + 1] = t;
-  }
+/* Rasterize the triangle with vertices f0 <= f1 <= f2 onto a 1D grid, where
+ * top = 2 amp / (f2 - f0) is the height of the triangle, and df1 = top / (f1 -
+ * f0) and df2 = top / (f2 - f1) are the slopes of its rising and falling edges.
+ * The amplitude of a bin within a ramp is evaluated in closed form at the bin
+ * center, such that the ramp loops are free of loop-carried dependencies. */
+static inline void __sorted_triangle_interpolation(double f0, double f1,
+                                                   double f2, double top,
+                                                   double df1, double df2,
+                                                   double *spec, int points) {
+  double diff, f10 = f1 - f0, f21 = f2 - f1;
+  int p, q, pmid, pmax;
+  int clip_right1 = 0, clip_left1 = 0, clip_right2 = 0, clip_left2 = 0;
 
-  p = (int)f[0];
-  if (p > points[0]) {
-    return 0;
+  p = (int)f0;
+  if (p > points) {
+    return;
   }
 
-  pmax = (int)f[2];
+  pmax = (int)f2;
   if (pmax < 0) {
-    return 0;
+    return;
   }
 
-  pmid = (int)f[1];
-  if (pmid >= points[0]) {
-    pmid = points[0];
+  pmid = (int)f1;
+  if (pmid >= points) {
+    pmid = points;
     clip_right1 = 1;
   }
 
-  if (pmax >= points[0]) {
-    pmax = points[0];
+  if (pmax >= points) {
+    pmax = points;
     clip_right2 = 1;
   }
 
@@ -95,26 +123,19 @@ int triangle_interpolation(double *freq1, double *freq2, double *freq3,
     clip_left2 = 1;
   }
 
-  top += (amp[0] * 2.0 / (f[2] - f[0]));
-  f10 += f[1] - f[0];
-  f21 += f[2] - f[1];
-
   if (p != pmid) {
-    df1 = top / f10;
-    diff = (double)p + 1. - f[0];
+    diff = (double)p + 1. - f0;
     if (clip_left1 == 0) {
       spec[p++] += 0.5 * diff * diff * df1;
     } else {
       spec[p++] += (diff - 0.5) * df1;
     }
-    diff -= 0.5;
-    diff *= df1;
-    while (p != pmid) {
-      diff += df1;
-      spec[p++] += diff;
+    for (q = p; q < pmid; q++) {
+      spec[q] += ((double)q + 0.5 - f0) * df1;
     }
+    p = pmid;
     if (clip_right1 == 0) {
-      spec[p] += (f[1] - (double)p) * (f10 + ((double)p - f[0])) * 0.5 * df1;
+      spec[p] += (f1 - (double)p) * (f10 + ((double)p - f0)) * 0.5 * df1;
     }
   } else {
     if (clip_right1 == 0 && clip_left1 == 0) {
@@ -123,54 +144,117 @@ int triangle_interpolation(double *freq1, double *freq2, double *freq3,
   }
 
   if (p != pmax) {
-    df2 = top / f21;
-    diff = f[2] - (double)p - 1.;
-
+    diff = f2 - (double)p - 1.;
     if (clip_left2 == 0) {
       spec[p++] += (f21 - diff) * (diff + f21) * 0.5 * df2;
     } else {
       spec[p++] += (diff + 0.5) * df2;
     }
-    diff += 0.5;
-    diff *= df2;
-    while (p != pmax) {
-      diff -= df2;
-      spec[p++] += diff;
+    for (q = p; q < pmax; q++) {
+      spec[q] += (f2 - (double)q - 0.5) * df2;
     }
+    p = pmax;
     if (clip_right2 == 0) {
-      temp = (f[2] - (double)p);
-      spec[p] += temp * temp * 0.5 * df2;
+      diff = f2 - (double)p;
+      spec[p] += diff * diff * 0.5 * df2;
     }
   } else {
     if (clip_right2 == 0) {
       spec[p] += f21 * top * 0.5;
     }
   }
+}
+
+int triangle_interpolation(double *freq1, double *freq2, double *freq3,
+                           double *amp, double *spec, int *points) {
+  if (__is_degenerate(freq1[0], freq2[0], freq3[0])) {
+    __degenerate_triangle_interpolation(freq1[0], freq2[0], freq3[0], amp[0],
+                                        spec, points[0]);
+    return 0;
+  }
+
+  double f[3], top;
+  __sort3(freq1[0], freq2[0], freq3[0], f);
+  top = amp[0] * 2.0 / (f[2] - f[0]);
+  __sorted_triangle_interpolation(f[0], f[1], f[2], top, top / (f[1] - f[0]),
+                                  top / (f[2] - f[1]), spec, points[0]);
   return 0;
 }
 
-int triangle_interpolation2D(double *freq11, double *freq12, double *freq13,
-                             double *freq21, double *freq22, double *freq23,
-                             double *amp, double *spec, int m0, int m1) {
-  double df1, df2, top = 0.0, t1, t2, diff, f10 = 0.0, f21 = 0.0, temp, n_i;
-  double slope_diff, abs_slope_diff, line_up, line_down;
-  int p, pmid, pmax, i, j;
-  int clip_right1 = 0, clip_left1 = 0, clip_right2 = 0, clip_left2 = 0;
-  double f01_slope, f02_slope, f12_slope, amp_section, denom;
-  double area_up_triangle, area_down_triangle;
-  double freq00_01, freq01_02, freq10_01, freq11_02, freq00_12, freq10_12;
+/* The batch is processed in two stages. The first stage sorts the vertices,
+ * classifies the triangles, and evaluates the heights and slopes of the
+ * triangles over the whole batch with branchless, vectorizable loops. The
+ * second stage bins the triangles in the order of the batch, where the ramps
+ * of each triangle are accumulated with vectorizable loops. */
+MRS_TARGET_CLONES
+void triangle_interpolation_batch(int count, const double *restrict freq1,
+                                  const double *restrict freq2,
+                                  const double *restrict freq3,
+                                  const double *restrict amp, double *spec,
+                                  int points) {
+  double f0[MRS_TRIANGLE_BATCH], f1[MRS_TRIANGLE_BATCH];
+  double f2[MRS_TRIANGLE_BATCH], top[MRS_TRIANGLE_BATCH];
+  double df1[MRS_TRIANGLE_BATCH], df2[MRS_TRIANGLE_BATCH];
+  int degenerate[MRS_TRIANGLE_BATCH];
+  double a, b, c, lo, hi;
+  int k, n, start;
+
+  for (start = 0; start < count; start += MRS_TRIANGLE_BATCH) {
+    n = count - start;
+    n = (n < MRS_TRIANGLE_BATCH) ? n : MRS_TRIANGLE_BATCH;
+
+    // stage 1: sort, classify, and evaluate the heights and slopes. The values
+    // of the degenerate triangles are not finite and are never used.
+    for (k = 0; k < n; k++) {
+      a = freq1[start + k];
+      b = freq2[start + k];
+      c = freq3[start + k];
+      lo = (a > b) ? b : a;
+      hi = (a > b) ? a : b;
+      f0[k] = (lo > c) ? c : lo;
+      f1[k] = (hi > c) ? ((lo > c) ? lo : c) : hi;
+      f2[k] = (hi > c) ? hi : c;
+      // (int) is monotonic, all vertices are within a bin if the extremes are.
+      degenerate[k] = (fabs(a - b) < TOL) & (fabs(a - c) < TOL);
+      degenerate[k] |= (int)f0[k] == (int)f2[k];
+      top[k] = amp[start + k] * 2.0 / (f2[k] - f0[k]);
+      df1[k] = top[k] / (f1[k] - f0[k]);
+      df2[k] = top[k] / (f2[k] - f1[k]);
+    }
+
+    // stage 2: bin.
+    for (k = 0; k < n; k++) {
+      if (degenerate[k]) {
+        __degenerate_triangle_interpolation(freq1[start + k], freq2[start + k],
+                                            freq3[start + k], amp[start + k],
+                                            spec, points);
+        continue;
+      }
+      __sorted_triangle_interpolation(f0[k], f1[k], f2[k], top[k], df1[k],
+                                      df2[k], spec, points);
+    }
+  }
+}
+
+/* Bin the amplitude of a triangle that is degenerate along the first
+ * dimension onto the 2D grid. */
+static inline void __degenerate_triangle_interpolation2D(
+    double *freq11, double *freq12, double *freq13, double *freq21,
+    double *freq22, double *freq23, double *amp, double *spec, int m0, int m1) {
+  double diff, temp, n_i;
+  int p;
 
   p = (int)(freq11[0]);
 
   if (fabs(freq11[0] - freq12[0]) < TOL && fabs(freq11[0] - freq13[0]) < TOL) {
     if (p >= m0 || p < 0) {
-      return 0;
+      return;
     }
     diff = freq11[0] - (double)p;
     n_i = 0.5;
     if (fabs(diff - n_i) < TOL) {
       triangle_interpolation(freq21, freq22, freq23, amp, &spec[p * m1], &m1);
-      return 0;
+      return;
     }
     if (diff < n_i) {
       if (p != 0) {
@@ -180,7 +264,7 @@ int triangle_interpolation2D(double *freq11, double *freq12, double *freq13,
       }
       temp = amp[0] * (n_i + diff);
       triangle_interpolation(freq21, freq22, freq23, &temp, &spec[p * m1], &m1);
-      return 0;
+      return;
     }
     if (diff > n_i) {
       if (p + 1 != m0) {
@@ -190,44 +274,39 @@ int triangle_interpolation2D(double *freq11, double *freq12, double *freq13,
       }
       temp = amp[0] * (1 + n_i - diff);
       triangle_interpolation(freq21, freq22, freq23, &temp, &spec[p * m1], &m1);
-      return 0;
+      return;
     }
-    return 0;
+    return;
   }
 
-  if ((int)freq11[0] == (int)freq12[0] && (int)freq11[0] == (int)freq13[0]) {
-    if (p >= m0 || p < 0) {
-      return 0;
-    }
-    triangle_interpolation(freq21, freq22, freq23, amp, &spec[p * m1], &m1);
-    return 0;
+  // all vertices are within the same bin along the first dimension.
+  if (p >= m0 || p < 0) {
+    return;
   }
+  triangle_interpolation(freq21, freq22, freq23, amp, &spec[p * m1], &m1);
+}
 
-  double f1[3] = {freq11[0], freq12[0], freq13[0]};
-  double f2[3] = {freq21[0], freq22[0], freq23[0]};
-
-  // arrange the numbers in ascending order
-  for (j = 1; j <= 2; j++) {
-    t1 = f1[j];
-    t2 = f2[j];
-    i = j - 1;
-    while (i >= 0 && f1[i] > t1) {
-      f1[i + 1] = f1[i];
-      f2[i + 1] = f2[i];
-      i--;
-    }
-    f1[i + 1] = t1;
-    f2[i + 1] = t2;
-  }
+/* Rasterize the triangle with vertices ((f1[0], f2[0]), (f1[1], f2[1]),
+ * (f1[2], f2[2])), where f1[0] <= f1[1] <= f1[2], onto a 2D grid. */
+static inline void __sorted_triangle_interpolation2D(double *f1, double *f2,
+                                                     double amp, double *spec,
+                                                     int m0, int m1) {
+  double df1, df2, top = 0.0, diff, f10 = 0.0, f21 = 0.0, temp;
+  double slope_diff, abs_slope_diff, line_up, line_down;
+  int p, pmid, pmax;
+  int clip_right1 = 0, clip_left1 = 0, clip_right2 = 0, clip_left2 = 0;
+  double f01_slope, f02_slope, f12_slope, amp_section, denom;
+  double area_up_triangle, area_down_triangle;
+  double freq00_01, freq01_02, freq10_01, freq11_02, freq00_12, freq10_12;
 
   p = (int)f1[0];
   if (p > m0) {
-    return 0;
+    return;
   }
 
   pmax = (int)f1[2];
   if (pmax < 0) {
-    return 0;
+    return;
   }
 
   pmid = (int)f1[1];
@@ -251,7 +330,7 @@ int triangle_interpolation2D(double *freq11, double *freq12, double *freq13,
     clip_left2 = 1;
   }
 
-  top += (amp[0] * 2.0 / (f1[2] - f1[0]));
+  top += (amp * 2.0 / (f1[2] - f1[0]));
   f10 += f1[1] - f1[0];
   f21 += f1[2] - f1[1];
 
@@ -475,9 +554,79 @@ int triangle_interpolation2D(double *freq11, double *freq12, double *freq13,
                              &spec[p * m1], &m1);
     }
   }
+}
+
+
+int triangle_interpolation2D(double *freq11, double *freq12, double *freq13,
+                             double *freq21, double *freq22, double *freq23,
+                             double *amp, double *spec, int m0, int m1) {
+  if (__is_degenerate(freq11[0], freq12[0], freq13[0])) {
+    __degenerate_triangle_interpolation2D(freq11, freq12, freq13, freq21,
+                                          freq22, freq23, amp, spec, m0, m1);
+    return 0;
+  }
+
+  double f1[3] = {freq11[0], freq12[0], freq13[0]};
+  double f2[3] = {freq21[0], freq22[0], freq23[0]};
+  __sort3_pairs(f1, f2);
+  __sorted_triangle_interpolation2D(f1, f2, amp[0], spec, m0, m1);
   return 0;
 }
 
+MRS_TARGET_CLONES
+void triangle_interpolation2D_batch(
+    int count, const double *restrict freq11, const double *restrict freq12,
+    const double *restrict freq13, const double *restrict freq21,
+    const double *restrict freq22, const double *restrict freq23,
+    const double *restrict amp, double *spec, int m0, int m1) {
+  double f1[3 * MRS_TRIANGLE_BATCH], f2[3 * MRS_TRIANGLE_BATCH];
+  bool degenerate[MRS_TRIANGLE_BATCH];
+  double a[3], b[3];
+  int k, n, start;
+
+  for (start = 0; start < count; start += MRS_TRIANGLE_BATCH) {
+    n = count - start;
+    n = (n < MRS_TRIANGLE_BATCH) ? n : MRS_TRIANGLE_BATCH;
+
+    // stage 1: sort and classify.
+    for (k = 0; k < n; k++) {
+      a[0] = freq11[start + k];
+      a[1] = freq12[start + k];
+      a[2] = freq13[start + k];
+      b[0] = freq21[start + k];
+      b[1] = freq22[start + k];
+      b[2] = freq23[start + k];
+      degenerate[k] = __is_degenerate(a[0], a[1], a[2]);
+      __sort3_pairs(a, b);
+      f1[k] = a[0];
+      f1[k + MRS_TRIANGLE_BATCH] = a[1];
+      f1[k + 2 * MRS_TRIANGLE_BATCH] = a[2];
+      f2[k] = b[0];
+      f2[k + MRS_TRIANGLE_BATCH] = b[1];
+      f2[k + 2 * MRS_TRIANGLE_BATCH] = b[2];
+    }
+
+    // stage 2: bin.
+    for (k = 0; k < n; k++) {
+      if (degenerate[k]) {
+        __degenerate_triangle_interpolation2D(
+            (double *)&freq11[start + k], (double *)&freq12[start + k],
+            (double *)&freq13[start + k], (double *)&freq21[start + k],
+            (double *)&freq22[start + k], (double *)&freq23[start + k],
+            (double *)&amp[start + k], spec, m0, m1);
+        continue;
+      }
+      a[0] = f1[k];
+      a[1] = f1[k + MRS_TRIANGLE_BATCH];
+      a[2] = f1[k + 2 * MRS_TRIANGLE_BATCH];
+      b[0] = f2[k];
+      b[1] = f2[k + MRS_TRIANGLE_BATCH];
+      b[2] = f2[k + 2 * MRS_TRIANGLE_BATCH];
+      __sorted_triangle_interpolation2D(a, b, amp[start + k], spec, m0, m1);
+    }
+  }
+}
+
 void rasterization(double *grid, double *v0, double *v1, double *v2, int rows,
                    int columns) {
   double A12, B12, C12, A20, B20, C20, A01, B01, C01;
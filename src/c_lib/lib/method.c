@@ -141,7 +141,9 @@ void MRS_free_sequence(MRS_sequence *the_sequence, unsigned int n) {
     for (evt = 0; evt < sequence->n_events; evt++) {
       MRS_free_event(&sequence->events[evt]);
     }
+    free(sequence->events);
     free(sequence->local_frequency);
     free(sequence->freq_offset);
   }
+  free(the_sequence);
 }
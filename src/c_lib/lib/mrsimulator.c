@@ -272,6 +272,47 @@ MRS_plan *MRS_copy_plan(MRS_plan *plan) {
   return new_plan;
 }
 
+/**
+ * Single precision variant of the MRS_get_amplitudes_from_plan. The lab frame
+ * tensors, w2 and w4, and the sideband phases, pre_phase_2 and pre_phase_4, are
+ * converted to float32 and the sideband phase exponent, the exponential, and
+ * the fft are evaluated in float32. The absolute value square is written back
+ * as double to the `fftw_scheme->amplitudes` array.
+ */
+static void __get_amplitudes_from_plan_single(MRS_averaging_scheme *scheme,
+                                              MRS_plan *plan,
+                                              MRS_fftw_scheme *fftw_scheme) {
+  unsigned int nsb = plan->number_of_sidebands;
+  unsigned int n_orientations = scheme->total_orientations;
+  float one[2] = {1.0, 0.0}, zero[2] = {0.0, 0.0};
+
+  vm_double_to_float(10 * n_orientations, (double *)scheme->w2,
+                     (float *)fftw_scheme->w_f);
+  vm_double_to_float(10 * nsb, (double *)plan->pre_phase_2,
+                     (float *)fftw_scheme->pre_phase_f);
+  cblas_cgemm(CblasRowMajor, CblasTrans, CblasTrans, nsb, n_orientations, 5,
+              one, (float *)(fftw_scheme->pre_phase_f), nsb,
+              (float *)(fftw_scheme->w_f), 5, zero,
+              (float *)(fftw_scheme->vector_f), n_orientations);
+
+  if (scheme->w4 != NULL) {
+    vm_double_to_float(18 * n_orientations, (double *)scheme->w4,
+                       (float *)fftw_scheme->w_f);
+    vm_double_to_float(18 * nsb, (double *)plan->pre_phase_4,
+                       (float *)fftw_scheme->pre_phase_f);
+    cblas_cgemm(CblasRowMajor, CblasTrans, CblasTrans, nsb, n_orientations, 9,
+                one, (float *)(fftw_scheme->pre_phase_f), nsb,
+                (float *)(fftw_scheme->w_f), 9, one,
+                (float *)(fftw_scheme->vector_f), n_orientations);
+  }
+
+  vm_float_complex_exp_imag_only(plan->size, fftw_scheme->vector_f,
+                                 fftw_scheme->vector_f);
+  fftwf_execute(fftw_scheme->the_fftwf_plan);
+  vm_float_complex_abs_square_to_double_inplace(plan->size,
+                                                fftw_scheme->vector_f);
+}
+
 /**
  * @func MRS_get_amplitudes_from_plan
  *
@@ -292,6 +333,11 @@ void MRS_get_amplitudes_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
     return;
   }
 
+  if (fftw_scheme->single_precision) {
+    __get_amplitudes_from_plan_single(scheme, plan, fftw_scheme);
+    return;
+  }
+
   /* =========== Calculate the spinning sideband amplitude. ================= */
 
   // if (refresh) {
@@ -392,7 +438,7 @@ void MRS_get_frequencies_from_plan(MRS_averaging_scheme *scheme, MRS_plan *plan,
 
   /* If refresh is true, zero the local_frequencies before update. */
   if (refresh) {
-    cblas_dscal(scheme->total_orientations, 0.0, seq->local_frequency, 1);
+    vm_double_zeros(scheme->total_orientations, seq->local_frequency);
     seq->R0_offset = 0.0;
   }
 
@@ -441,9 +487,23 @@ void MRS_get_normalized_frequencies_from_plan(MRS_averaging_scheme *scheme,
                           scheme->wigner_4j_matrices, R4, scheme->exp_Im_alpha,
                           scheme->w2, scheme->w4);
 
+  MRS_get_normalized_frequencies_from_rotor_frame(scheme, plan, R0, refresh,
+                                                  seq, fraction);
+}
+
+/**
+ * @func MRS_get_normalized_frequencies_from_rotor_frame
+ *
+ * Get the lab-frame normalized frequency contributions from the zeroth, and
+ * the rotor frame second and fourth-rank tensors, `w2` and `w4`, of the
+ * averaging scheme.
+ */
+void MRS_get_normalized_frequencies_from_rotor_frame(
+    MRS_averaging_scheme *scheme, MRS_plan *plan, double R0, bool refresh,
+    MRS_sequence *seq, double fraction) {
   /* If refresh is true, zero the local_frequencies before update */
   if (refresh) {
-    cblas_dscal(scheme->total_orientations, 0.0, seq->local_frequency, 1);
+    vm_double_zeros(scheme->total_orientations, seq->local_frequency);
     seq->R0_offset = 0.0;
   }
 
@@ -596,6 +656,196 @@ void MRS_rotate_components_from_PAS_to_common_frame(
   }
 }
 
+static inline bool __is_zero(unsigned int n, double *x) {
+  unsigned int i;
+  for (i = 0; i < n; i++) {
+    if (x[i] != 0.0) return false;
+  }
+  return true;
+}
+
+static inline void __allocate_site_basis(MRS_averaging_scheme *scheme) {
+  if (scheme->w2_basis == NULL) {
+    scheme->w2_basis = malloc_complex128(15 * scheme->total_orientations);
+  }
+  if (scheme->w4 != NULL && scheme->w4_basis == NULL) {
+    scheme->w4_basis = malloc_complex128(9 * scheme->total_orientations);
+  }
+}
+
+/**
+ * @func MRS_rotate_site_basis
+ *
+ * The spatial tensors are evaluated at a unit Larmor frequency, that is, the
+ * shielding bases are in units of Hz/MHz, and the second-order quadrupolar
+ * bases in units of Hz^2. The bases with all zero components are flagged
+ * inactive and are not rotated.
+ */
+void MRS_rotate_site_basis(MRS_averaging_scheme *scheme, MRS_plan *plan,
+                           isotopomer_ravel *ravel_isotopomer) {
+  unsigned int b, size_2 = 5 * scheme->total_orientations;
+  double R0_temp;
+  complex128 R2[15], R4[9];
+  bool quad = ravel_isotopomer->spin[0] > 0.5;
+  bool second_order = quad && plan->allow_fourth_rank;
+
+  __allocate_site_basis(scheme);
+
+  vm_double_zeros(30, (double *)R2);
+  vm_double_zeros(18, (double *)R4);
+  scheme->R0_basis[0] = 0.0;
+  scheme->R0_basis[1] = 0.0;
+
+  /* Nuclear shielding bases, scaled by the Larmor frequency in MHz. */
+  sSOT_1st_order_nuclear_shielding_tensor_components(
+      &scheme->R0_basis[0], R2,
+      ravel_isotopomer->isotropic_chemical_shift_in_ppm[0],
+      ravel_isotopomer->shielding_symmetric_zeta_in_ppm[0],
+      ravel_isotopomer->shielding_symmetric_eta[0],
+      ravel_isotopomer->shielding_orientation);
+
+  /* Electric quadrupolar bases. The second-order bases are scaled by the
+   * inverse of the Larmor frequency in Hz. */
+  if (quad) {
+    sSOT_1st_order_electric_quadrupole_tensor_components(
+        &R2[5], ravel_isotopomer->spin[0],
+        ravel_isotopomer->quadrupolar_Cq_in_Hz[0],
+        ravel_isotopomer->quadrupolar_eta[0],
+        ravel_isotopomer->quadrupolar_orientation);
+  }
+  if (second_order) {
+    sSOT_2nd_order_electric_quadrupole_tensor_components(
+        &R0_temp, &R2[10], R4, ravel_isotopomer->spin[0], 1.0,
+        ravel_isotopomer->quadrupolar_Cq_in_Hz[0],
+        ravel_isotopomer->quadrupolar_eta[0],
+        ravel_isotopomer->quadrupolar_orientation);
+    scheme->R0_basis[1] = R0_temp;
+  }
+
+  for (b = 0; b < 3; b++) {
+    scheme->basis_active[b] = !__is_zero(10, (double *)&R2[5 * b]);
+  }
+  /* The second-order quadrupolar bases are both zero or both non-zero. */
+  scheme->basis_active[3] = scheme->basis_active[2] && second_order;
+
+  /* Rotate the bases to the rotor frame over all orientations. */
+  for (b = 0; b < 3; b++) {
+    if (!scheme->basis_active[b]) continue;
+    __batch_wigner_rotation(
+        scheme->octant_orientations, plan->n_octants,
+        scheme->wigner_2j_matrices, &R2[5 * b], scheme->wigner_4j_matrices, R4,
+        scheme->exp_Im_alpha, &scheme->w2_basis[b * size_2],
+        (b == 2 && scheme->basis_active[3]) ? scheme->w4_basis : NULL);
+  }
+}
+
+/**
+ * @func MRS_site_basis_size
+ *
+ * The site bases are packed as the two zeroth rank bases, the four activity
+ * flags, the three second rank bases, and the fourth rank basis, if any.
+ */
+unsigned int MRS_site_basis_size(MRS_averaging_scheme *scheme) {
+  unsigned int size = 6 + 30 * scheme->total_orientations;
+  if (scheme->w4 != NULL) size += 18 * scheme->total_orientations;
+  return size;
+}
+
+/**
+ * @func MRS_save_site_basis
+ *
+ * Copy the site bases of the averaging scheme to the buffer.
+ */
+void MRS_save_site_basis(MRS_averaging_scheme *scheme, double *buffer) {
+  unsigned int b, size_2 = 30 * scheme->total_orientations;
+  buffer[0] = scheme->R0_basis[0];
+  buffer[1] = scheme->R0_basis[1];
+  for (b = 0; b < 4; b++) buffer[2 + b] = (double)scheme->basis_active[b];
+  cblas_dcopy(size_2, (double *)scheme->w2_basis, 1, &buffer[6], 1);
+  if (scheme->w4 != NULL) {
+    cblas_dcopy(18 * scheme->total_orientations, (double *)scheme->w4_basis, 1,
+                &buffer[6 + size_2], 1);
+  }
+}
+
+/**
+ * @func MRS_load_site_basis
+ *
+ * Copy the site bases from the buffer to the averaging scheme. The shielding
+ * zeroth rank basis is the isotropic chemical shift, and is taken from the
+ * isotopomer.
+ */
+void MRS_load_site_basis(MRS_averaging_scheme *scheme,
+                         isotopomer_ravel *ravel_isotopomer, double *buffer) {
+  unsigned int b, size_2 = 30 * scheme->total_orientations;
+  __allocate_site_basis(scheme);
+  scheme->R0_basis[0] = ravel_isotopomer->isotropic_chemical_shift_in_ppm[0];
+  scheme->R0_basis[1] = buffer[1];
+  for (b = 0; b < 4; b++) scheme->basis_active[b] = buffer[2 + b] != 0.0;
+  cblas_dcopy(size_2, &buffer[6], 1, (double *)scheme->w2_basis, 1);
+  if (scheme->w4 != NULL) {
+    cblas_dcopy(18 * scheme->total_orientations, &buffer[6 + size_2], 1,
+                (double *)scheme->w4_basis, 1);
+  }
+}
+
+/**
+ * @func MRS_get_components_from_site_basis
+ *
+ * The rotor frame tensors of the spin transition are
+ *    w2 = p(i,j) v0 W2_σ + d(i,j) W2_q + c2(i,j)/v0 W2_qq, and
+ *    w4 = c4(i,j)/v0 W4_qq,
+ * where v0 is the Larmor frequency, and W2 and W4 are the rotated bases.
+ */
+void MRS_get_components_from_site_basis(MRS_averaging_scheme *scheme,
+                                        isotopomer_ravel *ravel_isotopomer,
+                                        float *transition,
+                                        bool allow_fourth_rank, double *R0,
+                                        double B0_in_T, bool *freq_contrib) {
+  unsigned int b, size_2 = 10 * scheme->total_orientations;
+  unsigned int size_4 = 18 * scheme->total_orientations;
+  double coef[4] = {0.0, 0.0, 0.0, 0.0}, cl_value[3], p_value, scale;
+  double larmor_freq_in_MHz =
+      -B0_in_T * ravel_isotopomer->gyromagnetic_ratio[0];
+  float mi = transition[0], mf = transition[1];
+
+  *R0 = 0.0;
+  if (mi != mf) {
+    /* Nuclear shielding components */
+    p_value = STF_p(mf, mi) * larmor_freq_in_MHz;
+    if (freq_contrib[0]) *R0 += p_value * scheme->R0_basis[0];
+    if (freq_contrib[1]) coef[0] = p_value;
+
+    /* Electric quadrupolar components */
+    if (ravel_isotopomer->spin[0] > 0.5) {
+      if (freq_contrib[2]) coef[1] = STF_d(mf, mi);
+      if (allow_fourth_rank) {
+        STF_cL(cl_value, mf, mi, ravel_isotopomer->spin[0]);
+        scale = 1.0 / (larmor_freq_in_MHz * 1e6);
+        if (freq_contrib[3]) {
+          *R0 += cl_value[0] * scale * scheme->R0_basis[1];
+        }
+        if (freq_contrib[4]) coef[2] = cl_value[1] * scale;
+        if (freq_contrib[5]) coef[3] = cl_value[2] * scale;
+      }
+    }
+  }
+
+  vm_double_zeros(size_2, (double *)scheme->w2);
+  for (b = 0; b < 3; b++) {
+    if (coef[b] == 0.0 || !scheme->basis_active[b]) continue;
+    cblas_daxpy(size_2, coef[b], (double *)scheme->w2_basis + b * size_2, 1,
+                (double *)scheme->w2, 1);
+  }
+
+  if (scheme->w4 == NULL) return;
+  vm_double_zeros(size_4, (double *)scheme->w4);
+  if (coef[3] != 0.0 && scheme->basis_active[3]) {
+    cblas_daxpy(size_4, coef[3], (double *)scheme->w4_basis, 1,
+                (double *)scheme->w4, 1);
+  }
+}
+
 /**
  * @func __get_components_2
  *
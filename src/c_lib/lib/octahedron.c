@@ -154,81 +154,90 @@ void octahedronGetPolarAngleCosineAzimuthalAnglePhaseOverOctant(
   free(zr);
 }
 
+/* The triangles over the face of an octant are interpolated row by row. The
+ * vertices of row `r` are at [start, start + length), with length = nt - r + 1,
+ * and the vertices of the following row start at next = start + length. Every
+ * row contributes `length - 1` up triangles, (start + k, start + k + 1,
+ * next + k), and `length - 2` down triangles, (start + k + 1, next + k,
+ * next + k + 1). The triangles are gathered into batches in the interleaved
+ * order, up-k followed by down-k, and are binned with the batch interpolation.
+ */
 void octahedronInterpolation(double *spec, double *freq, int nt, double *amp,
                              int stride, int m) {
-  int i = 0, j = 0, local_index, n_pts = (nt + 1) * (nt + 2) / 2;
-  unsigned int int_i_stride, int_j_stride;
-  double amp1 = 0.0, temp;
-  double *amp_address, *freq_address;
-
-  /* Interpolate between 1d points by setting up triangles of unit area */
-
-  local_index = nt - 1;
-  amp_address = &amp[(nt + 1) * stride];
-  freq_address = &freq[nt + 1];
-
-  while (i < n_pts - 1) {
-    int_i_stride = i * stride;
-    int_j_stride = j * stride;
-    temp = amp[int_i_stride + stride] + amp_address[int_j_stride];
-    amp1 = temp;
-    amp1 += amp[int_i_stride];
-
-    triangle_interpolation(&freq[i], &freq[i + 1], &freq_address[j], &amp1,
-                           spec, &m);
-
-    if (i < local_index) {
-      amp1 = temp;
-      amp1 += amp_address[int_j_stride + stride];
-      triangle_interpolation(&freq[i + 1], &freq_address[j],
-                             &freq_address[j + 1], &amp1, spec, &m);
-    } else {
-      local_index = j + nt;
-      i++;
+  double f1[MRS_TRIANGLE_BATCH], f2[MRS_TRIANGLE_BATCH];
+  double f3[MRS_TRIANGLE_BATCH], amp1[MRS_TRIANGLE_BATCH];
+  double temp;
+  int row, k, k0, k1, count, start = 0, next, length;
+
+  for (row = 0; row < nt; row++) {
+    length = nt - row + 1;
+    next = start + length;
+    for (k0 = 0; k0 < length - 1; k0 += MRS_TRIANGLE_BATCH / 2) {
+      k1 = k0 + MRS_TRIANGLE_BATCH / 2;
+      k1 = (k1 < length - 1) ? k1 : length - 1;
+      count = 0;
+      for (k = k0; k < k1; k++) {
+        temp = amp[(start + k + 1) * stride] + amp[(next + k) * stride];
+
+        f1[count] = freq[start + k];
+        f2[count] = freq[start + k + 1];
+        f3[count] = freq[next + k];
+        amp1[count++] = temp + amp[(start + k) * stride];
+
+        if (k < length - 2) {
+          f1[count] = freq[start + k + 1];
+          f2[count] = freq[next + k];
+          f3[count] = freq[next + k + 1];
+          amp1[count++] = temp + amp[(next + k + 1) * stride];
+        }
+      }
+      triangle_interpolation_batch(count, f1, f2, f3, amp1, spec, m);
     }
-    i++;
-    j++;
+    start = next;
   }
 }
 
 void octahedronInterpolation2D(double *spec, double *freq1, double *freq2,
                                int nt, double *amp, int stride, int m0,
                                int m1) {
-  int i = 0, j = 0, local_index, n_pts = (nt + 1) * (nt + 2) / 2;
-  unsigned int int_i_stride, int_j_stride;
-  double amp1 = 0.0, temp;
-  double *amp_address, *freq1_address, *freq2_address;
-
-  /* Interpolate between 1d points by setting up triangles of unit area */
-
-  local_index = nt - 1;
-  amp_address = &amp[(nt + 1) * stride];
-  freq1_address = &freq1[nt + 1];
-  freq2_address = &freq2[nt + 1];
-
-  while (i < n_pts - 1) {
-    int_i_stride = i * stride;
-    int_j_stride = j * stride;
-    temp = amp[int_i_stride + stride] + amp_address[int_j_stride];
-    amp1 = temp;
-    amp1 += amp[int_i_stride];
-
-    triangle_interpolation2D(&freq1[i], &freq1[i + 1], &freq1_address[j],
-                             &freq2[i], &freq2[i + 1], &freq2_address[j], &amp1,
-                             spec, m0, m1);
-
-    if (i < local_index) {
-      amp1 = temp;
-      amp1 += amp_address[int_j_stride + stride];
-      triangle_interpolation2D(&freq1[i + 1], &freq1_address[j],
-                               &freq1_address[j + 1], &freq2[i + 1],
-                               &freq2_address[j], &freq2_address[j + 1], &amp1,
-                               spec, m0, m1);
-    } else {
-      local_index = j + nt;
-      i++;
+  double f11[MRS_TRIANGLE_BATCH], f12[MRS_TRIANGLE_BATCH];
+  double f13[MRS_TRIANGLE_BATCH], f21[MRS_TRIANGLE_BATCH];
+  double f22[MRS_TRIANGLE_BATCH], f23[MRS_TRIANGLE_BATCH];
+  double amp1[MRS_TRIANGLE_BATCH];
+  double temp;
+  int row, k, k0, k1, count, start = 0, next, length;
+
+  for (row = 0; row < nt; row++) {
+    length = nt - row + 1;
+    next = start + length;
+    for (k0 = 0; k0 < length - 1; k0 += MRS_TRIANGLE_BATCH / 2) {
+      k1 = k0 + MRS_TRIANGLE_BATCH / 2;
+      k1 = (k1 < length - 1) ? k1 : length - 1;
+      count = 0;
+      for (k = k0; k < k1; k++) {
+        temp = amp[(start + k + 1) * stride] + amp[(next + k) * stride];
+
+        f11[count] = freq1[start + k];
+        f12[count] = freq1[start + k + 1];
+        f13[count] = freq1[next + k];
+        f21[count] = freq2[start + k];
+        f22[count] = freq2[start + k + 1];
+        f23[count] = freq2[next + k];
+        amp1[count++] = temp + amp[(start + k) * stride];
+
+        if (k < length - 2) {
+          f11[count] = freq1[start + k + 1];
+          f12[count] = freq1[next + k];
+          f13[count] = freq1[next + k + 1];
+          f21[count] = freq2[start + k + 1];
+          f22[count] = freq2[next + k];
+          f23[count] = freq2[next + k + 1];
+          amp1[count++] = temp + amp[(next + k + 1) * stride];
+        }
+      }
+      triangle_interpolation2D_batch(count, f11, f12, f13, f21, f22, f23, amp1,
+                                     spec, m0, m1);
     }
-    i++;
-    j++;
+    start = next;
   }
 }
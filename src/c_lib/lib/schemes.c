@@ -107,6 +107,8 @@ static inline void averaging_scheme_setup(MRS_averaging_scheme *scheme,
      * fourth rank tensors. */
     scheme->w4 = malloc_complex128(9 * scheme->total_orientations);
   }
+  scheme->w2_basis = NULL;
+  scheme->w4_basis = NULL;
 }
 
 /* Free the memory from the mrsimulator plan associated with the spherical
@@ -116,8 +118,11 @@ void MRS_free_averaging_scheme(MRS_averaging_scheme *scheme) {
   free(scheme->exp_Im_alpha);
   free(scheme->w2);
   free(scheme->w4);
+  free(scheme->w2_basis);
+  free(scheme->w4_basis);
   free(scheme->wigner_2j_matrices);
   free(scheme->wigner_4j_matrices);
+  free(scheme);
 }
 
 /* Create a new orientation averaging scheme. */
@@ -177,36 +182,77 @@ MRS_averaging_scheme *MRS_create_averaging_scheme_from_alpha_beta(
 /* ----------------------------------------------------------------------- */
 /* fftw routine setup .................................................... */
 /* ....................................................................... */
+int MRS_fftw_init_threads(void) {
+#ifdef MRS_FFTW_THREADS
+  return fftw_init_threads();
+#else
+  return 0;
+#endif
+}
+
 MRS_fftw_scheme *create_fftw_scheme(unsigned int total_orientations,
-                                    unsigned int number_of_sidebands) {
+                                    unsigned int number_of_sidebands,
+                                    unsigned int planner_flag, int n_threads,
+                                    bool single_precision) {
   unsigned int size = total_orientations * number_of_sidebands;
   int nssb = (int)number_of_sidebands;
   MRS_fftw_scheme *fftw_scheme = malloc(sizeof(MRS_fftw_scheme));
 
+  fftw_scheme->single_precision = single_precision;
+  fftw_scheme->vector = NULL;
+  fftw_scheme->vector_f = NULL;
+  fftw_scheme->w_f = NULL;
+  fftw_scheme->pre_phase_f = NULL;
+
+  if (single_precision) {
+    /* The sideband amplitudes are evaluated in the complex64 `vector_f` array
+     * and written back, inplace, as a double array of the same byte size. The
+     * buffers for the lab frame tensors and the sideband phase hold the single
+     * precision copies of the 2nd and 4th rank operands. */
+    fftw_scheme->vector_f =
+        (fftwf_complex *)fftwf_malloc(sizeof(fftwf_complex) * size);
+    fftw_scheme->w_f = malloc_complex64(9 * total_orientations);
+    fftw_scheme->pre_phase_f = malloc_complex64(9 * number_of_sidebands);
+    fftw_scheme->amplitudes = (double *)fftw_scheme->vector_f;
+    fftw_scheme->stride = 1;
+
+    fftw_scheme->the_fftwf_plan = fftwf_plan_many_dft(
+        1, &nssb, total_orientations, fftw_scheme->vector_f, NULL,
+        total_orientations, 1, fftw_scheme->vector_f, NULL, total_orientations,
+        1, FFTW_FORWARD, planner_flag);
+    return fftw_scheme;
+  }
+
   fftw_scheme->vector =
       (fftw_complex *)fftw_malloc(sizeof(fftw_complex) * size);
+  fftw_scheme->amplitudes = (double *)fftw_scheme->vector;
+  fftw_scheme->stride = 2;
   // malloc_complex128(plan->size);
   // gettimeofday(&fft_setup_time, NULL);
 
-  // int fftw_thread = fftw_init_threads();
-  // if (fftw_thread == 0) {
-  //   printf("failed to initialize fftw threading");
-  // }
-  // fftw_plan_with_nthreads(2);
+#ifdef MRS_FFTW_THREADS
+  fftw_plan_with_nthreads(n_threads);
+#endif
 
+  /* The rigorous planners overwrite the array during planning. The vector is
+   * always updated before the plan is executed. */
   fftw_scheme->the_fftw_plan =
       fftw_plan_many_dft(1, &nssb, total_orientations, fftw_scheme->vector,
                          NULL, total_orientations, 1, fftw_scheme->vector, NULL,
-                         total_orientations, 1, FFTW_FORWARD, FFTW_ESTIMATE);
-
-  // char *filename = "128_sidebands.wisdom";
-  // int status = fftw_export_wisdom_to_filename(filename);
-  // printf("file save status %i \n", status);
+                         total_orientations, 1, FFTW_FORWARD, planner_flag);
   /* ----------------------------------------------------------------------- */
   return fftw_scheme;
 }
 
 void MRS_free_fftw_scheme(MRS_fftw_scheme *fftw_scheme) {
-  fftw_destroy_plan(fftw_scheme->the_fftw_plan);
-  fftw_free(fftw_scheme->vector);
+  if (fftw_scheme->single_precision) {
+    fftwf_destroy_plan(fftw_scheme->the_fftwf_plan);
+    fftwf_free(fftw_scheme->vector_f);
+    free(fftw_scheme->w_f);
+    free(fftw_scheme->pre_phase_f);
+  } else {
+    fftw_destroy_plan(fftw_scheme->the_fftw_plan);
+    fftw_free(fftw_scheme->vector);
+  }
+  free(fftw_scheme);
 }
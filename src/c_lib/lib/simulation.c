@@ -16,17 +16,120 @@ static inline void __zero_components(double *R0, complex128 *R2,
   vm_double_zeros(18, (double *)R4);
 }
 
+/* Evaluate the minimum, lo, and the maximum, hi, of the n values of freq. */
+static inline void __frequency_bounds(double *freq, unsigned int n, double *lo,
+                                      double *hi) {
+  unsigned int k;
+  double f_lo = freq[0], f_hi = freq[0];
+  for (k = 1; k < n; k++) {
+    f_lo = (freq[k] < f_lo) ? freq[k] : f_lo;
+    f_hi = (freq[k] > f_hi) ? freq[k] : f_hi;
+  }
+  *lo = f_lo;
+  *hi = f_hi;
+}
+
+/**
+ * Evaluate the minimum and the maximum of the normalized local frequencies over
+ * every octant. The bounds are used to skip the interpolation of the octants
+ * whose frequencies, at a given sideband offset, fall outside the spectral
+ * window.
+ */
+static inline void __octant_bounds(double *local_frequency,
+                                   MRS_averaging_scheme *scheme,
+                                   unsigned int n_octants, double *f_min,
+                                   double *f_max) {
+  unsigned int j;
+  for (j = 0; j < n_octants; j++) {
+    __frequency_bounds(&local_frequency[j * scheme->octant_orientations],
+                       scheme->octant_orientations, &f_min[j], &f_max[j]);
+  }
+}
+
+/**
+ * Return true if any frequency within [f_min, f_max] + offset may contribute to
+ * the spectrum of `count` points. The triangle interpolation ignores the
+ * triangles with all vertices at or below -1 or at or above `count`.
+ */
+static inline bool __in_window(double f_min, double f_max, double offset,
+                               int count) {
+  return (f_max + offset > -1.0) && (f_min + offset < (double)count);
+}
+
+/**
+ * Restrict the interval [lo, hi] to the values of x for which c + s x lies
+ * within the open interval (L, U). The interval is empty when lo > hi.
+ */
+static inline void __restrict_interval(double s, double c, double L, double U,
+                                       double *lo, double *hi) {
+  double a, b, t;
+  if (s == 0.0) {
+    if (c <= L || c >= U) {
+      *lo = 1.0;
+      *hi = 0.0;
+    }
+    return;
+  }
+  a = (L - c) / s;
+  b = (U - c) / s;
+  if (s < 0.0) {
+    t = a;
+    a = b;
+    b = t;
+  }
+  *lo = (a > *lo) ? a : *lo;
+  *hi = (b < *hi) ? b : *hi;
+}
+
+/**
+ * Evaluate the ranges of the sideband indexes whose offset, offset + m step,
+ * where m is the sideband order, lies within [lo, hi]. The sideband indexes are
+ * in FFT order, that is, the orders [0, n_positive) are at the indexes [0,
+ * n_positive), and the negative orders [n_positive - n, 0) are at the indexes
+ * [n_positive, n). The ranges, [k_start[r], k_end[r]) for r = 0, 1, retain the
+ * FFT order and are widened by one order on either side.
+ */
+static inline void __sideband_ranges(double offset, double step, double lo,
+                                     double hi, int n, int *k_start,
+                                     int *k_end) {
+  int n_positive = (n + 1) / 2, m_lo = n_positive - n, m_hi = n_positive - 1;
+  double a, b, t;
+
+  if (lo > hi) {
+    k_start[0] = k_end[0] = k_start[1] = k_end[1] = 0;
+    return;
+  }
+  if (step != 0.0) {
+    a = (lo - offset) / step;
+    b = (hi - offset) / step;
+    if (step < 0.0) {
+      t = a;
+      a = b;
+      b = t;
+    }
+    // a and b are bounded by the sideband orders, since [lo, hi] is.
+    m_lo = ((int)floor(a) - 1 > m_lo) ? (int)floor(a) - 1 : m_lo;
+    m_hi = ((int)ceil(b) + 1 < m_hi) ? (int)ceil(b) + 1 : m_hi;
+  }
+
+  k_start[0] = (m_lo > 0) ? m_lo : 0;
+  k_end[0] = (m_hi + 1 > k_start[0]) ? m_hi + 1 : k_start[0];
+  k_start[1] = n + m_lo;
+  k_end[1] = n + ((m_hi < -1) ? m_hi : -1) + 1;
+  k_end[1] = (k_end[1] > k_start[1]) ? k_end[1] : k_start[1];
+}
+
 static inline void one_dimensional_averaging(MRS_sequence *the_sequence,
                                              MRS_averaging_scheme *scheme,
                                              MRS_fftw_scheme *fftw_scheme,
                                              double *spec,
                                              unsigned int number_of_sidebands) {
   unsigned int i, j, evt, step_vector = 0, address;
-  MRS_plan *plan;
+  MRS_plan *plan = NULL;
   MRS_event *event;
   int size = scheme->total_orientations * number_of_sidebands;
   double *freq_amp = malloc_double(size);
-  double offset, offset1;
+  double offset, offset1, f_min[8], f_max[8];
 
   vm_double_ones(size, freq_amp);
 
@@ -45,11 +148,18 @@ static inline void one_dimensional_averaging(MRS_sequence *the_sequence,
                 &freq_amp[j], scheme->octant_orientations);
   }
 
+  __octant_bounds(the_sequence[0].local_frequency, scheme, plan->n_octants,
+                  f_min, f_max);
+
   for (i = 0; i < number_of_sidebands; i++) {
     offset1 = offset + plan->vr_freq[i] * the_sequence[0].inverse_increment;
     if ((int)offset1 >= 0 && (int)offset1 <= the_sequence[0].count) {
       step_vector = i * scheme->total_orientations;
       for (j = 0; j < plan->n_octants; j++) {
+        if (!__in_window(f_min[j], f_max[j], offset1, the_sequence[0].count)) {
+          step_vector += scheme->octant_orientations;
+          continue;
+        }
         address = j * scheme->octant_orientations;
         // Add offset(isotropic + sideband_order) to the local frequency
         // from [n to n+octant_orientation]
@@ -75,7 +185,7 @@ static inline void two_dimensional_averaging(MRS_sequence *the_sequence,
                                              double *affine_matrix) {
   unsigned int i, k, j, evt;
   unsigned int step_vector_i = 0, step_vector_k = 0, address;
-  MRS_plan *planA, *planB;
+  MRS_plan *planA = NULL, *planB = NULL;
   MRS_event *event;
   int size = scheme->total_orientations * number_of_sidebands;
   double *freq_ampA = malloc_double(size);
@@ -84,6 +194,9 @@ static inline void two_dimensional_averaging(MRS_sequence *the_sequence,
   double offset0, offset1, offsetA, offsetB;
   double *dim0, *dim1;
   double norm0, norm1;
+  double f0_min[8], f0_max[8], f1_min[8], f1_max[8];
+  double g0_min, g0_max, g1_min, g1_max, step, lo, hi, offset_lo, offset_hi;
+  int r, k_start[2], k_end[2];
 
   vm_double_ones(size, freq_ampA);
   vm_double_ones(size, freq_ampB);
@@ -91,28 +204,6 @@ static inline void two_dimensional_averaging(MRS_sequence *the_sequence,
   dim0 = the_sequence[0].local_frequency;
   dim1 = the_sequence[1].local_frequency;
 
-  // scale and shear the first dimension.
-  if (affine_matrix[0] != 1) {
-    cblas_dscal(scheme->total_orientations, affine_matrix[0], dim0, 1);
-    // the_sequence[0].R0_offset *= affine_matrix[0];
-  }
-  if (affine_matrix[1] != 0) {
-    cblas_daxpy(scheme->total_orientations, affine_matrix[1], dim1, 1, dim0, 1);
-    // the_sequence[0].R0_offset += affine_matrix[1] *
-    // the_sequence[1].R0_offset;
-  }
-
-  // scale and shear the second dimension.
-  if (affine_matrix[3] != 1) {
-    cblas_dscal(scheme->total_orientations, affine_matrix[3], dim1, 1);
-    // the_sequence[1].R0_offset *= affine_matrix[3];
-  }
-  if (affine_matrix[2] != 0) {
-    cblas_daxpy(scheme->total_orientations, affine_matrix[2], dim0, 1, dim1, 1);
-    // the_sequence[1].R0_offset += affine_matrix[2] *
-    // the_sequence[0].R0_offset;
-  }
-
   // offset = plan->vr_freq[i] + plan->isotropic_offset +
   //          the_sequence[seq].normalize_offset;
 
@@ -138,53 +229,104 @@ static inline void two_dimensional_averaging(MRS_sequence *the_sequence,
                 scheme->octant_orientations);
   }
 
+  __octant_bounds(dim0, scheme, planA->n_octants, f0_min, f0_max);
+  __octant_bounds(dim1, scheme, planA->n_octants, f1_min, f1_max);
+
+  // The bounds of the local frequencies over all octants.
+  __frequency_bounds(dim0, planA->n_octants * scheme->octant_orientations,
+                     &g0_min, &g0_max);
+  __frequency_bounds(dim1, planA->n_octants * scheme->octant_orientations,
+                     &g1_min, &g1_max);
+
+  // The sideband offsets along the second dimension are offset1 + m step,
+  // where m is the sideband order, see __get_frequency_in_FFT_order().
+  step = (number_of_sidebands > 1)
+             ? planB->vr_freq[1] * the_sequence[1].inverse_increment
+             : 0.0;
+  offset_lo = offset1;
+  offset_hi = offset1;
+  for (k = 0; k < number_of_sidebands; k++) {
+    offsetB = offset1 + planB->vr_freq[k] * the_sequence[1].inverse_increment;
+    offset_lo = (offsetB < offset_lo) ? offsetB : offset_lo;
+    offset_hi = (offsetB > offset_hi) ? offsetB : offset_hi;
+  }
+
   for (i = 0; i < number_of_sidebands; i++) {
     offsetA = offset0 + planA->vr_freq[i] * the_sequence[0].inverse_increment;
-    for (k = 0; k < number_of_sidebands; k++) {
-      offsetB = offset1 + planB->vr_freq[k] * the_sequence[1].inverse_increment;
-
-      norm0 = offsetA;
-      norm1 = offsetB;
-
-      // scale and shear the offsets
-      norm0 *= affine_matrix[0];
-      norm0 += affine_matrix[1] * offsetB;
-
-      norm1 *= affine_matrix[3];
-      norm1 += affine_matrix[2] * norm0;
-
-      norm0 += the_sequence[0].normalize_offset;
-      norm1 += the_sequence[1].normalize_offset;
 
-      if ((int)norm0 >= 0 && (int)norm0 <= the_sequence[0].count) {
+    // Window culling. For a given offsetA, norm0 and norm1 below are linear in
+    // offsetB. Restrict offsetB to the values for which the sideband centers
+    // and the local frequencies of some octant fall within the spectral window
+    // along both dimensions, and visit only the sideband orders k within this
+    // range. The window is widened by one point, the exact tests follow.
+    lo = offset_lo;
+    hi = offset_hi;
+    __restrict_interval(
+        affine_matrix[1],
+        affine_matrix[0] * offsetA + the_sequence[0].normalize_offset,
+        ((-g0_max > 0.0) ? -g0_max : 0.0) - 2.0,
+        the_sequence[0].count + ((-g0_min < 1.0) ? -g0_min : 1.0) + 1.0, &lo,
+        &hi);
+    __restrict_interval(
+        affine_matrix[3] + affine_matrix[2] * affine_matrix[1],
+        affine_matrix[2] * affine_matrix[0] * offsetA +
+            the_sequence[1].normalize_offset,
+        ((-g1_max > 0.0) ? -g1_max : 0.0) - 2.0,
+        the_sequence[1].count + ((-g1_min < 1.0) ? -g1_min : 1.0) + 1.0, &lo,
+        &hi);
+    __sideband_ranges(offset1, step, lo, hi, number_of_sidebands, k_start,
+                      k_end);
+
+    for (r = 0; r < 2; r++) {
+      for (k = k_start[r]; k < (unsigned int)k_end[r]; k++) {
+        offsetB =
+            offset1 + planB->vr_freq[k] * the_sequence[1].inverse_increment;
+
+        norm0 = offsetA;
+        norm1 = offsetB;
+
+        // scale and shear the offsets
+        norm0 *= affine_matrix[0];
+        norm0 += affine_matrix[1] * offsetB;
+
+        norm1 *= affine_matrix[3];
+        norm1 += affine_matrix[2] * norm0;
+
+        norm0 += the_sequence[0].normalize_offset;
+        norm1 += the_sequence[1].normalize_offset;
+
+        if ((int)norm0 < 0 || (int)norm0 > the_sequence[0].count ||
+            (int)norm1 < 0 || (int)norm1 > the_sequence[1].count) {
+          continue;
+        }
         step_vector_i = i * scheme->total_orientations;
-        // for (k = 0; k < number_of_sidebands; k++) {
-        //   offsetB =
-        //       offset1 + plan->vr_freq[k] * the_sequence[1].inverse_increment;
-        //   norm1 = offsetB + the_sequence[1].normalize_offset;
-        if ((int)norm1 >= 0 && (int)norm1 <= the_sequence[1].count) {
-          step_vector_k = k * scheme->total_orientations;
-
-          // step_vector = 0;
-          for (j = 0; j < planA->n_octants; j++) {
-            address = j * scheme->octant_orientations;
-            // Add offset(isotropic + sideband_order) to the local frequency
-            // from [n to n+octant_orientation]
-            vm_double_add_offset(scheme->octant_orientations, &dim0[address],
-                                 norm0, the_sequence[0].freq_offset);
-            vm_double_add_offset(scheme->octant_orientations, &dim1[address],
-                                 norm1, the_sequence[1].freq_offset);
-
-            vm_double_multiply(scheme->total_orientations,
-                               &freq_ampA[step_vector_i + address],
-                               &freq_ampB[step_vector_k + address], freq_amp);
-            // Perform tenting on every sideband order over all orientations
-            octahedronInterpolation2D(
-                spec, the_sequence[0].freq_offset, the_sequence[1].freq_offset,
-                scheme->integration_density, freq_amp, 1, the_sequence[0].count,
-                the_sequence[1].count);
-            // step_vector += scheme->octant_orientations;
+        step_vector_k = k * scheme->total_orientations;
+
+        for (j = 0; j < planA->n_octants; j++) {
+          // skip the octants outside the spectral window along either
+          // dimension.
+          if (!__in_window(f0_min[j], f0_max[j], norm0,
+                           the_sequence[0].count) ||
+              !__in_window(f1_min[j], f1_max[j], norm1,
+                           the_sequence[1].count)) {
+            continue;
           }
+          address = j * scheme->octant_orientations;
+          // Add offset(isotropic + sideband_order) to the local frequency
+          // from [n to n+octant_orientation]
+          vm_double_add_offset(scheme->octant_orientations, &dim0[address],
+                               norm0, the_sequence[0].freq_offset);
+          vm_double_add_offset(scheme->octant_orientations, &dim1[address],
+                               norm1, the_sequence[1].freq_offset);
+
+          vm_double_multiply(scheme->octant_orientations,
+                             &freq_ampA[step_vector_i + address],
+                             &freq_ampB[step_vector_k + address], freq_amp);
+          // Perform tenting on every sideband order over all orientations
+          octahedronInterpolation2D(
+              spec, the_sequence[0].freq_offset, the_sequence[1].freq_offset,
+              scheme->integration_density, freq_amp, 1, the_sequence[0].count,
+              the_sequence[1].count);
         }
       }
     }
@@ -194,52 +336,47 @@ static inline void two_dimensional_averaging(MRS_sequence *the_sequence,
   free(freq_ampB);
 }
 
-void __mrsimulator_core(
-    // spectrum information and related amplitude
-    double *spec,  // amplitude vector representing the spectrum.
-
-    // A pointer to the isotopomer_ravel structure containing information about
-    // the sites within an isotopomer.
-    isotopomer_ravel *ravel_isotopomer,
-
-    // A pointer to a spin transition packed as quantum numbers from the initial
-    // energy state followed by the quantum numbers from the final energy state.
-    // The energy states are given in Zeeman basis.
-    float *transition,
-
-    // A pointer to MRS_sequence structure containing information on the events
-    // per spectroscopic dimension.
-    MRS_sequence *the_sequence,
-
-    // The total number of spectroscopic dimensions.
-    int n_sequence,
-
-    // A pointer to the fftw scheme.
-    MRS_fftw_scheme *fftw_scheme,
-
-    // A pointer to the powder averaging scheme.
-    MRS_averaging_scheme *scheme,
+/**
+ * Scale and shear the normalized local frequencies of a two-dimensional method
+ * with the affine matrix.
+ */
+static inline void __affine_transform_local_frequencies(
+    MRS_sequence *the_sequence, MRS_averaging_scheme *scheme,
+    double *affine_matrix) {
+  double *dim0 = the_sequence[0].local_frequency;
+  double *dim1 = the_sequence[1].local_frequency;
 
-    // if true, perform a 1D interpolation
-    bool interpolation,
+  // scale and shear the first dimension.
+  if (affine_matrix[0] != 1) {
+    cblas_dscal(scheme->total_orientations, affine_matrix[0], dim0, 1);
+  }
+  if (affine_matrix[1] != 0) {
+    cblas_daxpy(scheme->total_orientations, affine_matrix[1], dim1, 1, dim0, 1);
+  }
 
-    /**
-     * Each event consists of the following freq contrib ordered as
-     * 1. Shielding 1st order 0th rank
-     * 2. Shielding 1st order 2th rank
-     * 3. Quad 1st order 2th rank
-     * 4. Quad 2st order 0th rank
-     * 5. Quad 2st order 2th rank
-     * 6. Quad 2st order 4th rank
-     *
-     * The freq contrib from each event is a list of boolean, where 1 mean allow
-     * frequency contribution and 0 means remove. The `freq_contrib` variable is
-     * a stack of boolean list, where the stack is ordered according to the
-     * events.
-     */
-    bool *freq_contrib,
+  // scale and shear the second dimension.
+  if (affine_matrix[3] != 1) {
+    cblas_dscal(scheme->total_orientations, affine_matrix[3], dim1, 1);
+  }
+  if (affine_matrix[2] != 0) {
+    cblas_daxpy(scheme->total_orientations, affine_matrix[2], dim0, 1, dim1, 1);
+  }
+}
 
-    double *affine_matrix) {
+/**
+ * Evaluate the normalized local frequencies and the sideband amplitudes of the
+ * spin transition over all orientations. The result is held by the sequences
+ * and the fftw scheme, and is consumed by `__spectral_averaging`.
+ */
+static void __frequencies_and_amplitudes(isotopomer_ravel *ravel_isotopomer,
+                                         float *transition,
+                                         MRS_sequence *the_sequence,
+                                         int n_sequence,
+                                         MRS_fftw_scheme *fftw_scheme,
+                                         MRS_averaging_scheme *scheme,
+                                         bool *freq_contrib,
+                                         double *affine_matrix,
+                                         bool from_basis) {
   /*
   The sideband computation is based on the method described by Eden and Levitt
   et. al. `Computation of Orientational Averages in Solid-State NMR by Gaussian
@@ -247,7 +384,7 @@ void __mrsimulator_core(
   */
   bool refresh;
   bool *freq_contrib_ptr = freq_contrib;
-  unsigned int evt;
+  unsigned int evt, j;
   int seq;
   double B0_in_T, fraction;
 
@@ -259,14 +396,10 @@ void __mrsimulator_core(
   complex128 *R2_temp = malloc_complex128(5);
   complex128 *R4_temp = malloc_complex128(9);
 
-  double *spec_site_ptr;
   int transition_increment = 2 * ravel_isotopomer->number_of_sites;
-  MRS_plan *plan;
+  MRS_plan *plan = NULL;
   MRS_event *event;
 
-  // spec_site = site * the_sequence[0].count;
-  spec_site_ptr = &spec[0];
-
   // Loop over the sequence.
   for (seq = 0; seq < n_sequence; seq++) {
     refresh = 1;
@@ -277,34 +410,43 @@ void __mrsimulator_core(
       B0_in_T = event->magnetic_flux_density_in_T;
       fraction = event->fraction;
 
-      /* Initialize with zeroing all spatial components */
-      __zero_components(&R0, R2, R4);
-
-      /* Rotate all frequency components from PAS to a common frame */
-      MRS_rotate_components_from_PAS_to_common_frame(
-          ravel_isotopomer,         // isotopomer structure
-          transition,               // the transition
-          plan->allow_fourth_rank,  // if 1, prepare for 4th rank computation
-          &R0,                      // the R0 components
-          R2,                       // the R2 components
-          R4,                       // the R4 components
-          &R0_temp,                 // the temporary R0 components
-          R2_temp,                  // the temporary R2 components
-          R4_temp,                  // the temporary R4 components
-          B0_in_T,                  // magnetic flux density in T
-          freq_contrib_ptr          // the pointer to freq contribs boolean
-      );
-
+      if (from_basis) {
+        /* Combine the rotor frame site bases for the transition */
+        MRS_get_components_from_site_basis(
+            scheme, ravel_isotopomer, transition, plan->allow_fourth_rank, &R0,
+            B0_in_T, freq_contrib_ptr);
+        MRS_get_normalized_frequencies_from_rotor_frame(
+            scheme, plan, R0, refresh, &the_sequence[seq], fraction);
+      } else {
+        /* Initialize with zeroing all spatial components */
+        __zero_components(&R0, R2, R4);
+
+        /* Rotate all frequency components from PAS to a common frame */
+        MRS_rotate_components_from_PAS_to_common_frame(
+            ravel_isotopomer,         // isotopomer structure
+            transition,               // the transition
+            plan->allow_fourth_rank,  // if 1, prepare for 4th rank computation
+            &R0,                      // the R0 components
+            R2,                       // the R2 components
+            R4,                       // the R4 components
+            &R0_temp,                 // the temporary R0 components
+            R2_temp,                  // the temporary R2 components
+            R4_temp,                  // the temporary R4 components
+            B0_in_T,                  // magnetic flux density in T
+            freq_contrib_ptr          // the pointer to freq contribs boolean
+        );
+
+        // Add a loop over all couplings.. here
+        /* Get frequencies and amplitudes per octant ....................... */
+        /* Always evalute the frequencies before the amplitudes. */
+        MRS_get_normalized_frequencies_from_plan(
+            scheme, plan, R0, R2, R4, refresh, &the_sequence[seq], fraction);
+      }
       freq_contrib_ptr += 6;
 
-      // Add a loop over all couplings.. here
-      /* Get frequencies and amplitudes per octant ......................... */
-      /* Always evalute the frequencies before the amplitudes. */
-      MRS_get_normalized_frequencies_from_plan(
-          scheme, plan, R0, R2, R4, refresh, &the_sequence[seq], fraction);
       MRS_get_amplitudes_from_plan(scheme, plan, fftw_scheme, 1);
       if (plan->number_of_sidebands != 1) {
-        cblas_dcopy(plan->size, (double *)fftw_scheme->vector, 2,
+        cblas_dcopy(plan->size, fftw_scheme->amplitudes, fftw_scheme->stride,
                     event->freq_amplitude, 1);
       }
       transition += transition_increment;
@@ -317,39 +459,19 @@ void __mrsimulator_core(
   free(R2_temp);
   free(R4_temp);
 
-  /* ---------------------------------------------------------------------
-   *              Calculating the tent for every sideband
-   * Allowing only sidebands that are within the spectral bandwidth
-   *
-   * for (i = 0; i < plan->number_of_sidebands; i++) {
-   *   offset = plan->vr_freq[i] + plan->isotropic_offset;
-   *   if ((int)offset >= 0 && (int)offset <= dimension->count) {
-
-   *     vm_double_ramp(plan->octant_orientations,
-   plan->local_frequency, 1.0,
-   *                    offset, plan->freq_offset);
-   *     octahedronInterpolation(
-   *         spec_site_ptr, plan->freq_offset,
-   *         plan->integration_density,
-   *         (double *)&plan->vector[i * plan->octant_orientations], 2,
-   *         dimension->count);
-   *   }
-   * }
-   */
-  unsigned int i, j, step_vector, address;
-  double offset, offset0;
   if (n_sequence == 1 && the_sequence[0].n_events == 1) {
     /**
      * If the number of sidebands is 1, the sideband amplitude at every
-     * sideband order is one. In this case, update the `fftw_scheme->vector` is
+     * sideband order is one. In this case, the `fftw_scheme->amplitudes` are
      * the same as the weights from the orientation averaging,
      */
     if (plan->number_of_sidebands == 1) {
-      /* Copy the plan->norm_amplitudes to fftw_scheme->vector. */
+      /* Copy the plan->norm_amplitudes to fftw_scheme->amplitudes. */
       for (j = 0; j < plan->n_octants; j++) {
-        cblas_dcopy(
-            scheme->octant_orientations, plan->norm_amplitudes, 1,
-            (double *)&fftw_scheme->vector[j * scheme->octant_orientations], 2);
+        cblas_dcopy(scheme->octant_orientations, plan->norm_amplitudes, 1,
+                    &fftw_scheme->amplitudes[j * scheme->octant_orientations *
+                                             fftw_scheme->stride],
+                    fftw_scheme->stride);
       }
     } else {
       /**
@@ -358,18 +480,86 @@ void __mrsimulator_core(
        */
       for (j = 0; j < scheme->octant_orientations; j++) {
         cblas_dscal(plan->n_octants * plan->number_of_sidebands,
-                    plan->norm_amplitudes[j], (double *)&fftw_scheme->vector[j],
-                    2 * scheme->octant_orientations);
+                    plan->norm_amplitudes[j],
+                    &fftw_scheme->amplitudes[j * fftw_scheme->stride],
+                    fftw_scheme->stride * scheme->octant_orientations);
       }
     }
+  }
+
+  if (n_sequence == 2) {
+    __affine_transform_local_frequencies(the_sequence, scheme, affine_matrix);
+  }
+}
+
+/**
+ * Update the normalized isotropic offsets, R0_offset, of the sequences from the
+ * zeroth-rank frequency components of the spin transition. The local
+ * frequencies and the amplitudes held by the sequences are left unchanged.
+ */
+static void __isotropic_offsets(isotopomer_ravel *ravel_isotopomer,
+                                float *transition, MRS_sequence *the_sequence,
+                                int n_sequence, bool *freq_contrib) {
+  bool *freq_contrib_ptr = freq_contrib;
+  unsigned int evt;
+  int seq;
+  double R0 = 0.0, R0_temp = 0.0;
+  complex128 R2[5], R4[9], R2_temp[5], R4_temp[9];
+  int transition_increment = 2 * ravel_isotopomer->number_of_sites;
+  MRS_event *event;
+
+  for (seq = 0; seq < n_sequence; seq++) {
+    the_sequence[seq].R0_offset = 0.0;
+    for (evt = 0; evt < the_sequence[seq].n_events; evt++) {
+      event = &the_sequence[seq].events[evt];
+      __zero_components(&R0, R2, R4);
+      MRS_rotate_components_from_PAS_to_common_frame(
+          ravel_isotopomer, transition, event->plan->allow_fourth_rank, &R0, R2,
+          R4, &R0_temp, R2_temp, R4_temp, event->magnetic_flux_density_in_T,
+          freq_contrib_ptr);
+      the_sequence[seq].R0_offset +=
+          R0 * the_sequence[seq].inverse_increment * event->fraction;
+
+      freq_contrib_ptr += 6;
+      transition += transition_increment;
+    }
+  }
+}
+
+/**
+ * Bin the frequencies and amplitudes, evaluated with
+ * `__frequencies_and_amplitudes`, into the spectrum. The function does not
+ * modify the frequencies and the amplitudes, and may be called repeatedly with
+ * different isotropic offsets.
+ */
+static void __spectral_averaging(double *spec, MRS_sequence *the_sequence,
+                                 int n_sequence, MRS_fftw_scheme *fftw_scheme,
+                                 MRS_averaging_scheme *scheme,
+                                 bool interpolation, double *affine_matrix) {
+  MRS_sequence *last = &the_sequence[n_sequence - 1];
+  MRS_plan *plan = last->events[last->n_events - 1].plan;
 
+  /* ---------------------------------------------------------------------
+   *              Calculating the tent for every sideband
+   * Allowing only sidebands that are within the spectral bandwidth
+   */
+  unsigned int i, j, step_vector, address;
+  double offset, offset0, f_min[8], f_max[8];
+  if (n_sequence == 1 && the_sequence[0].n_events == 1) {
     offset0 = the_sequence[0].normalize_offset + the_sequence[0].R0_offset;
+    __octant_bounds(the_sequence[0].local_frequency, scheme, plan->n_octants,
+                    f_min, f_max);
 
     for (i = 0; i < plan->number_of_sidebands; i++) {
       offset = plan->vr_freq[i] * the_sequence[0].inverse_increment + offset0;
       if ((int)offset >= 0 && (int)offset <= the_sequence[0].count) {
         step_vector = i * scheme->total_orientations;
         for (j = 0; j < plan->n_octants; j++) {
+          if (!__in_window(f_min[j], f_max[j], offset,
+                           the_sequence[0].count)) {
+            step_vector += scheme->octant_orientations;
+            continue;
+          }
           address = j * scheme->octant_orientations;
 
           // Add offset(isotropic + sideband_order) to the local frequency
@@ -378,10 +568,10 @@ void __mrsimulator_core(
                                &the_sequence[0].local_frequency[address],
                                offset, the_sequence[0].freq_offset);
           // Perform tenting on every sideband order over all orientations.
-          octahedronInterpolation(spec_site_ptr, the_sequence[0].freq_offset,
-                                  scheme->integration_density,
-                                  (double *)&fftw_scheme->vector[step_vector],
-                                  2, the_sequence[0].count);
+          octahedronInterpolation(
+              spec, the_sequence[0].freq_offset, scheme->integration_density,
+              &fftw_scheme->amplitudes[step_vector * fftw_scheme->stride],
+              fftw_scheme->stride, the_sequence[0].count);
           step_vector += scheme->octant_orientations;
         }
       }
@@ -404,6 +594,91 @@ void __mrsimulator_core(
   }
 }
 
+void __mrsimulator_core(
+    // spectrum information and related amplitude
+    double *spec,  // amplitude vector representing the spectrum.
+
+    // A pointer to the isotopomer_ravel structure containing information about
+    // the sites within an isotopomer.
+    isotopomer_ravel *ravel_isotopomer,
+
+    // A pointer to a spin transition packed as quantum numbers from the initial
+    // energy state followed by the quantum numbers from the final energy state.
+    // The energy states are given in Zeeman basis.
+    float *transition,
+
+    // A pointer to MRS_sequence structure containing information on the events
+    // per spectroscopic dimension.
+    MRS_sequence *the_sequence,
+
+    // The total number of spectroscopic dimensions.
+    int n_sequence,
+
+    // A pointer to the fftw scheme.
+    MRS_fftw_scheme *fftw_scheme,
+
+    // A pointer to the powder averaging scheme.
+    MRS_averaging_scheme *scheme,
+
+    // if true, perform a 1D interpolation
+    bool interpolation,
+
+    /**
+     * Each event consists of the following freq contrib ordered as
+     * 1. Shielding 1st order 0th rank
+     * 2. Shielding 1st order 2th rank
+     * 3. Quad 1st order 2th rank
+     * 4. Quad 2st order 0th rank
+     * 5. Quad 2st order 2th rank
+     * 6. Quad 2st order 4th rank
+     *
+     * The freq contrib from each event is a list of boolean, where 1 mean allow
+     * frequency contribution and 0 means remove. The `freq_contrib` variable is
+     * a stack of boolean list, where the stack is ordered according to the
+     * events.
+     */
+    bool *freq_contrib,
+
+    double *affine_matrix) {
+  __frequencies_and_amplitudes(ravel_isotopomer, transition, the_sequence,
+                               n_sequence, fftw_scheme, scheme, freq_contrib,
+                               affine_matrix, false);
+  __spectral_averaging(spec, the_sequence, n_sequence, fftw_scheme, scheme,
+                       interpolation, affine_matrix);
+}
+
+void __mrsimulator_site_basis(isotopomer_ravel *ravel_isotopomer,
+                              MRS_sequence *the_sequence,
+                              MRS_averaging_scheme *scheme) {
+  MRS_rotate_site_basis(scheme, the_sequence[0].events[0].plan,
+                        ravel_isotopomer);
+}
+
+void __mrsimulator_core_from_basis(
+    double *spec, isotopomer_ravel *ravel_isotopomer, float *transition,
+    MRS_sequence *the_sequence, int n_sequence, MRS_fftw_scheme *fftw_scheme,
+    MRS_averaging_scheme *scheme, bool interpolation, bool *freq_contrib,
+    double *affine_matrix) {
+  __frequencies_and_amplitudes(ravel_isotopomer, transition, the_sequence,
+                               n_sequence, fftw_scheme, scheme, freq_contrib,
+                               affine_matrix, true);
+  __spectral_averaging(spec, the_sequence, n_sequence, fftw_scheme, scheme,
+                       interpolation, affine_matrix);
+}
+
+void __mrsimulator_core_translate(double *spec,
+                                  isotopomer_ravel *ravel_isotopomer,
+                                  float *transition, MRS_sequence *the_sequence,
+                                  int n_sequence, MRS_fftw_scheme *fftw_scheme,
+                                  MRS_averaging_scheme *scheme,
+                                  bool interpolation, bool *freq_contrib,
+                                  double *affine_matrix) {
+  __isotropic_offsets(ravel_isotopomer, transition, the_sequence, n_sequence,
+                      freq_contrib);
+  __spectral_averaging(spec, the_sequence, n_sequence, fftw_scheme, scheme,
+                       interpolation, affine_matrix);
+}
+
 void mrsimulator_core(
     // spectrum information and related amplitude
     double *spec,               // The amplitude of the spectrum.
@@ -452,7 +727,8 @@ void mrsimulator_core(
       integration_density, allow_fourth_rank, integration_volume);
 
   MRS_fftw_scheme *fftw_scheme =
-      create_fftw_scheme(scheme->total_orientations, number_of_sidebands);
+      create_fftw_scheme(scheme->total_orientations, number_of_sidebands,
+                         FFTW_ESTIMATE, 1, false);
 
   // gettimeofday(&all_site_time, NULL);
   __mrsimulator_core(
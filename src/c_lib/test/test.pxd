@@ -68,6 +68,28 @@ cdef extern from "interpolation.h":
         int m0,
         int m1)
 
+    void triangle_interpolation_batch(
+        int count,
+        const double *freq1,
+        const double *freq2,
+        const double *freq3,
+        const double *amp,
+        double *spec,
+        int points)
+
+    void triangle_interpolation2D_batch(
+        int count,
+        const double *freq11,
+        const double *freq12,
+        const double *freq13,
+        const double *freq21,
+        const double *freq22,
+        const double *freq23,
+        const double *amp,
+        double *spec,
+        int m0,
+        int m1)
+
 cdef extern from "octahedron.h":
     void octahedronInterpolation(
         double *spec,
@@ -268,6 +268,73 @@ def triangle_interpolation2D(vector1, vector2, np.ndarray[double, ndim=2] spectr
     clib.triangle_interpolation2D(f11, f12, f13, f21, f22, f23, &amp_[0],
                 &spectrum_amp[0, 0], shape[0], shape[1])
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def triangle_interpolation_batch(np.ndarray[double, ndim=2] freq,
+                                 np.ndarray[double, ndim=1] amp,
+                                 np.ndarray[double, ndim=1] spectrum_amp,
+                                 bool_t batch=True):
+    r"""
+    Interpolate a batch of triangles onto a 1D grid.
+
+    :ivar freq: A 2D array of shape (3, n) with the vertices of the n triangles.
+    :ivar amp: A 1D array of n triangle areas.
+    :ivar spectrum_amp: A numpy array of amplitudes. This array is the output.
+    :ivar batch: If true, use the batch interpolation, else, interpolate one
+                 triangle at a time.
+    """
+    cdef int i, n = amp.size
+    cdef int points = spectrum_amp.size
+    cdef np.ndarray[double, ndim=2] f = np.ascontiguousarray(freq)
+
+    if batch:
+        clib.triangle_interpolation_batch(
+            n, &f[0, 0], &f[1, 0], &f[2, 0], &amp[0], &spectrum_amp[0], points
+        )
+        return
+
+    for i in range(n):
+        clib.triangle_interpolation(
+            &f[0, i], &f[1, i], &f[2, i], &amp[i], &spectrum_amp[0], &points
+        )
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def triangle_interpolation2D_batch(np.ndarray[double, ndim=2] freq1,
+                                   np.ndarray[double, ndim=2] freq2,
+                                   np.ndarray[double, ndim=1] amp,
+                                   np.ndarray[double, ndim=2] spectrum_amp,
+                                   bool_t batch=True):
+    r"""
+    Interpolate a batch of triangles onto a 2D grid.
+
+    :ivar freq1: A 2D array of shape (3, n) with the first dimension vertices.
+    :ivar freq2: A 2D array of shape (3, n) with the second dimension vertices.
+    :ivar amp: A 1D array of n triangle areas.
+    :ivar spectrum_amp: A 2D numpy array of amplitudes. This array is the output.
+    :ivar batch: If true, use the batch interpolation, else, interpolate one
+                 triangle at a time.
+    """
+    cdef int i, n = amp.size
+    cdef int m0 = spectrum_amp.shape[0], m1 = spectrum_amp.shape[1]
+    cdef np.ndarray[double, ndim=2] f1 = np.ascontiguousarray(freq1)
+    cdef np.ndarray[double, ndim=2] f2 = np.ascontiguousarray(freq2)
+
+    if batch:
+        clib.triangle_interpolation2D_batch(
+            n, &f1[0, 0], &f1[1, 0], &f1[2, 0], &f2[0, 0], &f2[1, 0], &f2[2, 0],
+            &amp[0], &spectrum_amp[0, 0], m0, m1
+        )
+        return
+
+    for i in range(n):
+        clib.triangle_interpolation2D(
+            &f1[0, i], &f1[1, i], &f1[2, i], &f2[0, i], &f2[1, i], &f2[2, i],
+            &amp[i], &spectrum_amp[0, 0], m0, m1
+        )
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def __batch_wigner_rotation(unsigned int octant_orientations,
@@ -19,6 +19,7 @@ __version__ = "0.6.0.dev0"
 
 from .spin_system import Site  # lgtm [py/import-own-module]
 from .spin_system import SpinSystem  # lgtm [py/import-own-module]
+from .spin_system import SpinSystemArray  # lgtm [py/import-own-module]
 from .simulator import Simulator  # lgtm [py/import-own-module]
 from .transition import Transition  # lgtm [py/import-own-module]
 from .method.event import Event  # lgtm [py/import-own-module]
@@ -11,6 +11,7 @@ from mrsimulator.spin_system.isotope import Isotope
 from mrsimulator.transition import Transition
 from mrsimulator.transition.transition_list import TransitionPathway
 from mrsimulator.utils.parseable import Parseable
+from pydantic import PrivateAttr
 from pydantic import validator
 
 from .named_method_updates import named_methods
@@ -115,6 +116,11 @@ class Method(Parseable):
     simulation: Union[cp.CSDM, np.ndarray] = None
     experiment: Union[cp.CSDM, np.ndarray] = None
 
+    # transition pathways keyed by the ordered isotopes of the spin system, and the
+    # transition queries and channels for which the pathways were evaluated.
+    _pathway_table: dict = PrivateAttr(default_factory=dict)
+    _pathway_signature: tuple = PrivateAttr(default=None)
+
     property_default_units: ClassVar = {
         "magnetic_flux_density": "T",
         "rotor_angle": "rad",
@@ -316,13 +322,38 @@ class Method(Parseable):
                 segments += [selected_transitions]
         return segments
 
-    def _get_transition_pathways_np(self, spin_system):
+    def _get_pathway_table(self) -> dict:
+        """Return the table of transition pathways keyed by the ordered tuple of the
+        site isotopes. The table is reset when the channels or the transition queries
+        of the events change."""
+        signature = (
+            tuple(item.symbol for item in self.channels),
+            tuple(
+                repr(ent.transition_query.dict())
+                for seq in self.spectral_dimensions
+                for ent in seq.events
+            ),
+        )
+        if signature != self._pathway_signature:
+            self._pathway_table = {}
+            self._pathway_signature = signature
+        return self._pathway_table
+
+    def _get_transition_pathways_np(self, spin_system, table=None):
+        table = self._get_pathway_table() if table is None else table
+        key = tuple(site.isotope.symbol for site in spin_system.sites)
+        if key in table:
+            return table[key]
+
         segments = self._get_transition_pathways(spin_system)
         segments_index = [np.arange(item.shape[0]) for item in segments]
         cartesian_index = cartesian_product(*segments_index)
-        return [
-            [segments[i][j] for i, j in enumerate(item)] for item in cartesian_index
-        ]
+        pathways = np.asarray(
+            [[segments[i][j] for i, j in enumerate(item)] for item in cartesian_index]
+        )
+        pathways.flags.writeable = False
+        table[key] = pathways
+        return pathways
 
     def get_transition_pathways(self, spin_system) -> list:
         """
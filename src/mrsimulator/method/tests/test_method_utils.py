@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import numpy as np
 from mrsimulator import Site
 from mrsimulator import SpinSystem
 from mrsimulator.methods import Method1D
@@ -8,3 +9,24 @@ def test_warnings():
     s = SpinSystem(sites=[Site(isotope="23Na")])
     m = Method1D(channels=["1H"])
     assert m.get_transition_pathways(s) == []
+
+
+def test_pathway_table():
+    m = Method1D(channels=["13C"])
+    sys_1 = SpinSystem(sites=[Site(isotope="13C"), Site(isotope="1H")])
+    sys_2 = SpinSystem(sites=[Site(isotope="1H"), Site(isotope="13C")])
+
+    pathways = m._get_transition_pathways_np(sys_1)
+    assert pathways.shape == (2, 1, 2, 2)
+    assert m._get_transition_pathways_np(sys_1) is pathways
+    assert set(m._pathway_table.keys()) == {("13C", "1H")}
+
+    # the table is keyed by the ordered isotopes of the sites.
+    pathways_2 = m._get_transition_pathways_np(sys_2)
+    assert np.array_equal(pathways_2, pathways[..., ::-1])
+
+    # the table is reset when the transition query changes.
+    m.spectral_dimensions[0].events[0].transition_query.P = {"channel-1": [[1]]}
+    assert m._get_transition_pathways_np(sys_1) is not pathways
+    assert set(m._pathway_table.keys()) == {("13C", "1H")}
+    assert np.array_equal(m._get_transition_pathways_np(sys_1), pathways[:, :, ::-1])
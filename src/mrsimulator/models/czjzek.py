@@ -1,22 +1,34 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+from mrsimulator.simulator.parallel import get_n_jobs
 from mrsimulator.spin_system.tensors import SymmetricTensor
 
-from .utils import get_Haeberlen_components
+from .utils import get_Haeberlen_components_from_cartesian
 from .utils import get_principal_components
 from .utils import x_y_from_zeta_eta
+from .utils import x_y_to_zeta_eta
 
 __author__ = "Deepansh J. Srivastava"
 __email__ = "srivastava.89@osu.edu"
 
+# the number of random variates drawn and processed at once.
+CHUNK_SIZE = 250000
+
 
-def _czjzek_random_distribution_tensors(sigma, n):
+def _czjzek_random_distribution_components(sigma, n, rng=np.random):
     r"""Czjzek random distribution model.
 
     Args:
         float sigma: The standard deviation of the five-dimensional multi-variate normal
             distribution.
         int n: Number of samples drawn from the Czjzek random distribution model.
+        rng: A numpy random Generator. The default is the numpy.random module.
+
+    Returns:
+        A `5 x n` ndarray with the Sxx, Syy, Sxy, Sxz, and Syz components of the `n`
+        traceless symmetric tensors. The Szz component follows from the trace.
 
     Description
     -----------
@@ -40,43 +52,79 @@ def _czjzek_random_distribution_tensors(sigma, n):
 
     Syz = Szy = sqrt(3) * U3
     """
+    components = np.empty((5, n))  # xx, yy, xy, xz, yz
 
     # The random sampling U1, U2, ... U5
-    U1 = np.random.normal(0.0, sigma, n)
+    U1 = rng.normal(0.0, sigma, n)
 
     sqrt_3_sigma = np.sqrt(3) * sigma
-    sqrt_3_U2 = np.random.normal(0.0, sqrt_3_sigma, n)
-    sqrt_3_U3 = np.random.normal(0.0, sqrt_3_sigma, n)
-    sqrt_3_U4 = np.random.normal(0.0, sqrt_3_sigma, n)
-    sqrt_3_U5 = np.random.normal(0.0, sqrt_3_sigma, n)
+    components[3] = rng.normal(0.0, sqrt_3_sigma, n)  # xz = sqrt(3) U2
+    components[4] = rng.normal(0.0, sqrt_3_sigma, n)  # yz = sqrt(3) U3
+    components[2] = rng.normal(0.0, sqrt_3_sigma, n)  # xy = sqrt(3) U4
+    sqrt_3_U5 = rng.normal(0.0, sqrt_3_sigma, n)
 
-    # Create N random tensors
-    tensors = np.zeros((n, 3, 3))  # n x 3 x 3 tensors
+    np.subtract(sqrt_3_U5, U1, out=components[0])  # xx
+    np.negative(sqrt_3_U5, out=components[1])
+    components[1] -= U1  # yy
+    return components
 
-    tensors[:, 0, 0] = sqrt_3_U5 - U1  # xx
-    tensors[:, 0, 1] = sqrt_3_U4  # xy
-    tensors[:, 0, 2] = sqrt_3_U2  # xz
 
-    tensors[:, 1, 0] = sqrt_3_U4  # yx
-    tensors[:, 1, 1] = -sqrt_3_U5 - U1  # yy
-    tensors[:, 1, 2] = sqrt_3_U3  # yz
+def _czjzek_pdf(zeta, eta, sigma):
+    r"""Analytical Czjzek probability density at the given zeta and eta coordinates.
 
-    tensors[:, 2, 0] = sqrt_3_U2  # zx
-    tensors[:, 2, 1] = sqrt_3_U3  # zy
-    tensors[:, 2, 2] = 2 * U1  # zz
+    .. math::
+        f(\zeta, \eta) = \frac{\zeta^4 \eta}{\sqrt{2 \pi} \sigma_C^5}
+        \left(1 - \frac{\eta^2}{9}\right)
+        \exp\left(-\frac{\zeta^2}{2 \sigma_C^2} \left(1 + \frac{\eta^2}{3}
+        \right)\right),
 
-    return tensors
+    where :math:`\sigma_C = 2\sigma` is the standard deviation from the original Czjzek
+    paper.
+    """
+    sigma_c = 2 * sigma
+    zeta_sq = zeta * zeta
+    eta_sq = eta * eta
+    res = (zeta_sq * zeta_sq * eta) * (1 - eta_sq / 9)
+    res *= np.exp(-zeta_sq * (1 + eta_sq / 3) / (2 * sigma_c ** 2))
+    res[(eta < 0) | (eta > 1)] = 0
+    return res / ((2 * np.pi) ** 0.5 * sigma_c ** 5)
+
+
+def _bin_index(values, limits, n):
+    """Return the bin index of the values over n uniform bins within the limits, with
+    the last bin including the upper limit, as in numpy.histogram. Values outside the
+    limits are assigned an index of -1."""
+    index = np.floor((values - limits[0]) * (n / (limits[1] - limits[0])))
+    index[values == limits[1]] = n - 1
+    index[~((index >= 0) & (index < n))] = -1
+    return index.astype(np.int64)
+
+
+def _chunks(size: int, seed):
+    """Split the size into chunks of at most CHUNK_SIZE, each paired with an
+    independent random number generator spawned from the seed."""
+    bounds = list(range(0, size, CHUNK_SIZE)) + [size]
+    streams = np.random.SeedSequence(seed).spawn(len(bounds) - 1)
+    rngs = [np.random.default_rng(stream) for stream in streams]
+    return list(zip(bounds[:-1], bounds[1:], rngs))
 
 
 class AbstractDistribution:
-    def pdf(self, pos, size: int = 400000):
+    def pdf(self, pos, size: int = 400000, seed=None, n_jobs: int = -1):
         """Generates a probability distribution function by binning the random
         variates of length size onto the given grid system.
 
         Args:
             pos: A list of coordinates along the two dimensions given as NumPy arrays.
-            size: The number of random variates drawn in generating the pdf. The default
-                is 400000.
+            size: The number of random variates drawn in generating the pdf. The size
+                must be positive. The default is 400000.
+            seed: The seed of the random number generator. The random variates are
+                drawn in chunks, with an independent random stream per chunk spawned
+                from the seed, such that the pdf is reproducible for a given seed,
+                irrespective of `n_jobs`. The default is None.
+            n_jobs: The number of threads drawing and binning the chunks. A negative
+                value is counted backwards from the number of cores. The default is -1,
+                that is, all cores.
 
         Returns:
             A list of x and y coordinates and the corresponding amplitudes.
@@ -94,14 +142,70 @@ class AbstractDistribution:
 
         x_size = pos[0].size
         y_size = pos[1].size
-        zeta, eta = self.rvs(size)
-        hist, _, _ = np.histogram2d(zeta, eta, bins=[x_size, y_size], range=[x, y])
 
+        def histogram(chunk):
+            start, end, rng = chunk
+            zeta, eta = self._rvs(end - start, rng)
+            index_z = _bin_index(zeta, x, x_size)
+            index_e = _bin_index(eta, y, y_size)
+            valid = (index_z >= 0) & (index_e >= 0)
+            index = index_z[valid] * y_size + index_e[valid]
+            return np.bincount(index, minlength=x_size * y_size)
+
+        size = int(size)
+        if size <= 0:
+            raise ValueError(f"The size must be a positive integer, got {size}.")
+
+        chunks = _chunks(size, seed)
+        n_jobs = min(get_n_jobs(n_jobs), len(chunks))
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            hist = sum(executor.map(histogram, chunks))
+
+        hist = hist.reshape(x_size, y_size).astype(np.float64)
         hist /= hist.sum()
 
         x_, y_ = np.meshgrid(pos[0], pos[1])
         return x_, y_, hist.T
 
+    def rvs(self, size: int, seed=None, n_jobs: int = -1):
+        """Draw random variates of length `size` from the distribution.
+
+        Args:
+            size: The number of random points to draw.
+            seed: The seed of the random number generator. The default is None.
+            n_jobs: The number of threads drawing the random variates. The default
+                is -1, that is, all cores.
+
+        Returns:
+            A list of two NumPy array, where the first and the second array are the
+            anisotropic/quadrupolar coupling constant and asymmetry parameter,
+            respectively. When the distribution is polar, the arrays are the x and y
+            coordinates.
+
+        Example:
+            >>> Cq_dist, eta_dist = cz_model.rvs(size=1000000)
+        """
+        size = int(size)
+        output = np.empty((2, size))
+
+        def draw(chunk):
+            start, end, rng = chunk
+            output[:, start:end] = self._rvs(end - start, rng)
+
+        chunks = _chunks(size, seed)
+        n_jobs = min(get_n_jobs(n_jobs), max(len(chunks), 1))
+        with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+            list(executor.map(draw, chunks))
+        return output[0], output[1]
+
+    def _rvs(self, size: int, rng):
+        """Draw `size` random variates using the random number generator `rng`."""
+        components = self._components(size, rng)
+        zeta, eta = get_Haeberlen_components_from_cartesian(*components)
+        if not self.polar:
+            return zeta, eta
+        return x_y_from_zeta_eta(zeta, eta)
+
 
 class CzjzekDistribution(AbstractDistribution):
     r"""A Czjzek distribution model class.
@@ -142,24 +246,51 @@ class CzjzekDistribution(AbstractDistribution):
         self.sigma = sigma
         self.polar = polar
 
-    def rvs(self, size: int):
-        """Draw random variates of length `size` from the distribution.
+    def pdf(self, pos, size: int = None, seed=None, n_jobs: int = -1):
+        """Evaluates the probability distribution function of the Czjzek model over
+        the given grid system.
 
         Args:
-            size: The number of random points to draw.
+            pos: A list of coordinates along the two dimensions given as NumPy arrays.
+            size: The number of random variates drawn in generating the pdf. The default
+                is None, that is, the pdf is evaluated from the analytical expression of
+                the Czjzek distribution at the grid points, without random sampling.
+            seed: The seed of the random number generator, when `size` is provided.
+                The default is None.
+            n_jobs: The number of threads drawing and binning the random variates,
+                when `size` is provided. The default is -1, that is, all cores.
 
         Returns:
-            A list of two NumPy array, where the first and the second array are the
-            anisotropic/quadrupolar coupling constant and asymmetry parameter,
-            respectively.
+            A list of x and y coordinates and the corresponding amplitudes.
 
         Example:
-            >>> Cq_dist, eta_dist = cz_model.rvs(size=1000000)
+            >>> import numpy as np
+            >>> cq = np.arange(50) - 25
+            >>> eta = np.arange(21)/20
+            >>> Cq_dist, eta_dist, amp = cz_model.pdf(pos=[cq, eta])
         """
-        tensors = _czjzek_random_distribution_tensors(self.sigma, size)
+        if size is not None:
+            return super().pdf(pos, size, seed, n_jobs)
+
+        x_, y_ = np.meshgrid(pos[0], pos[1])
         if not self.polar:
-            return get_Haeberlen_components(tensors)
-        return x_y_from_zeta_eta(*get_Haeberlen_components(tensors))
+            amp = _czjzek_pdf(x_, y_, self.sigma)
+        else:
+            # the polar coordinates follow dx dy = (pi/4) |zeta| d|zeta| d(eta).
+            zeta, eta = x_y_to_zeta_eta(x_.ravel(), y_.ravel())
+            zeta = np.abs(zeta)
+            amp = _czjzek_pdf(zeta, eta, self.sigma)
+            index = np.where(zeta > 0)
+            amp[index] /= zeta[index] * np.pi / 4
+            amp = amp.reshape(x_.shape)
+            # the polar coordinates span the first quadrant only.
+            amp[(x_ < 0) | (y_ < 0)] = 0
+
+        amp /= amp.sum()
+        return x_, y_, amp
+
+    def _components(self, size: int, rng):
+        return _czjzek_random_distribution_components(self.sigma, size, rng)
 
 
 class ExtCzjzekDistribution(AbstractDistribution):
@@ -208,23 +339,9 @@ class ExtCzjzekDistribution(AbstractDistribution):
         self.eps = eps
         self.polar = polar
 
-    def rvs(self, size: int):
-        """Draw random variates of length `size` from the distribution.
-
-        Args:
-            size: The number of random points to draw.
-
-        Returns:
-            A list of two NumPy array, where the first and the second array are the
-            anisotropic/quadrupolar coupling constant and asymmetry parameter,
-            respectively.
-
-        Example:
-            >>> Cq_dist, eta_dist = ext_cz_model.rvs(size=1000000)
-        """
-
+    def _components(self, size: int, rng):
         # czjzek_random_distribution model
-        tensors = _czjzek_random_distribution_tensors(1, size)
+        components = _czjzek_random_distribution_components(1, size, rng)
 
         symmetric_tensor = self.symmetric_tensor
 
@@ -245,9 +362,8 @@ class ExtCzjzekDistribution(AbstractDistribution):
         # the perturbation factor
         rho = self.eps * norm_T0 / np.sqrt(30)
 
-        # total tensor
-        total_tensors = np.diag(T0) + rho * tensors
-
-        if not self.polar:
-            return get_Haeberlen_components(total_tensors)
-        return x_y_from_zeta_eta(*get_Haeberlen_components(total_tensors))
+        # total tensor. The dominant tensor only adds to the diagonal components.
+        components *= rho
+        components[0] += T0[0]
+        components[1] += T0[1]
+        return components
@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+import json
+from os import path
+
+import numpy as np
+from mrsimulator import Simulator
+from mrsimulator import SpinSystemArray
+from mrsimulator.method import Method
+from mrsimulator.simulator.config import ConfigSimulator
+
+from .utils import x_y_to_zeta_eta
+
+__author__ = "Deepansh J. Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+__tensors__ = ["shielding_symmetric", "quadrupolar"]
+__anisotropy_key__ = {"shielding_symmetric": "zeta", "quadrupolar": "Cq"}
+
+
+class LineshapeKernel:
+    r"""A library of lineshapes over a two-dimensional grid of tensor parameters.
+
+    The lineshape of a single-site spin system is simulated once for every node of the
+    grid, given as the outer product of the coordinates along the
+    anisotropy/quadrupolar coupling constant and the asymmetry parameter, and stored
+    as the columns of a dense kernel matrix, :math:`{\bf K}`. The spectrum of any
+    distribution of the tensor parameters over the grid then follows as a single
+    matrix-vector product,
+
+    .. math::
+        {\bf s} = {\bf K} {\bf p},
+
+    where :math:`{\bf p}` is the probability distribution function evaluated at the
+    grid nodes, for example, the ``amp`` array from the ``pdf`` method of the
+    :ref:`czjzek_distribution` models. The kernel only depends on the method, the
+    tensor, and the simulator configuration, and is reused across the evaluations of
+    the distributions, for example, during a least-squares fit of the distribution
+    parameters.
+
+    Args:
+        list pos: A list of two ndarrays with the grid coordinates along the
+            anisotropy/quadrupolar coupling constant and the asymmetry parameter,
+            identical to the `pos` argument of the distribution ``pdf`` method. When
+            `polar` is True, the coordinates are the x and y coordinates. The
+            anisotropy coordinates are in ppm for the shielding tensor and in Hz for
+            the quadrupolar tensor.
+        Method method: The method used in the simulation of the lineshapes.
+        str isotope: The isotope of the site.
+        str tensor: The tensor whose parameters are distributed, either
+            ``shielding_symmetric`` or ``quadrupolar``. The default is
+            ``quadrupolar``.
+        bool polar: If true, the grid coordinates are the polar x and y coordinates.
+            The default is False.
+        float isotropic_chemical_shift: The isotropic chemical shift of the site in
+            ppm. The default is 0.
+        ConfigSimulator config: The simulator configuration. The default is None,
+            that is, the default configuration.
+        int n_jobs: The number of jobs used in the simulation of the lineshapes. The
+            default is 1.
+        str filename: An optional filename of the kernel library. When the file
+            exists, and holds a kernel for the same arguments, the kernel is loaded
+            from the file. Otherwise, the kernel is simulated and saved to the file.
+
+    Example:
+        >>> from mrsimulator.models import LineshapeKernel
+        >>> from mrsimulator.methods import BlochDecayCentralTransitionSpectrum
+        >>> method = BlochDecayCentralTransitionSpectrum(
+        ...     channels=["27Al"],
+        ...     spectral_dimensions=[{"count": 256, "spectral_width": 5e4}],
+        ... )
+        >>> pos = [np.linspace(0, 1e7, 16), np.linspace(0, 1, 11)]
+        >>> kernel = LineshapeKernel(pos, method, isotope="27Al")
+        >>> kernel.kernel.shape
+        (256, 176)
+    """
+
+    def __init__(
+        self,
+        pos: list,
+        method: Method,
+        isotope: str,
+        tensor: str = "quadrupolar",
+        polar: bool = False,
+        isotropic_chemical_shift: float = 0,
+        config: ConfigSimulator = None,
+        n_jobs: int = 1,
+        filename: str = None,
+    ):
+        if tensor not in __tensors__:
+            raise ValueError(
+                f"{tensor} is not a valid tensor. The allowed values are {__tensors__}."
+            )
+        config = ConfigSimulator() if config is None else config
+        self.pos = [np.asarray(item, dtype=np.float64) for item in pos]
+        self.method = method.copy(update={"simulation": None, "experiment": None})
+        self.isotope = isotope
+        self.tensor = tensor
+        self.polar = polar
+        self.isotropic_chemical_shift = isotropic_chemical_shift
+        self.config = config.copy(update={"decompose_spectrum": "spin_system"})
+
+        # the origin offset of the spectral dimensions, as assigned by the simulator.
+        B0 = self.method.spectral_dimensions[0].events[0].magnetic_flux_density
+        gamma = self.method.channels[0].gyromagnetic_ratio
+        for seq in self.method.spectral_dimensions:
+            seq.origin_offset = np.abs(B0 * gamma * 1e6)
+
+        if filename is not None and path.exists(filename):
+            with np.load(filename) as data:
+                if str(data["key"]) == self._key():
+                    self.kernel = data["kernel"]
+                    self.shape = tuple(data["shape"])
+                    return
+
+        self._simulate(n_jobs)
+        if filename is not None:
+            self.save(filename)
+
+    def _key(self) -> str:
+        """A string identifying the arguments used in the simulation of the kernel."""
+        grid = [item.tolist() for item in self.pos]
+        contents = {
+            "pos": grid,
+            "method": self.method.json(),
+            "isotope": self.isotope,
+            "tensor": self.tensor,
+            "polar": self.polar,
+            "isotropic_chemical_shift": self.isotropic_chemical_shift,
+            "config": self.config.get_int_dict(),
+        }
+        return json.dumps(contents, sort_keys=True)
+
+    def _simulate(self, n_jobs: int):
+        """Simulate the lineshape of every grid node and store the lineshapes as the
+        columns of the kernel."""
+        x, y = np.meshgrid(self.pos[0], self.pos[1])
+        if self.polar:
+            zeta, eta = x_y_to_zeta_eta(x.ravel(), y.ravel())
+        else:
+            zeta, eta = x.ravel(), y.ravel()
+
+        params = {__anisotropy_key__[self.tensor]: zeta, "eta": eta}
+        spin_systems = SpinSystemArray(
+            isotopes=self.isotope,
+            isotropic_chemical_shifts=self.isotropic_chemical_shift,
+            **{self.tensor: params},
+            abundance=1,
+        )
+        sim = Simulator(spin_systems=spin_systems, methods=[self.method.copy()])
+        sim.config = self.config
+        sim.run(pack_as_csdm=False, n_jobs=n_jobs)
+
+        amp = sim.methods[0].simulation
+        self.shape = amp.shape[1:]
+        self.kernel = np.ascontiguousarray(amp.reshape(amp.shape[0], -1).T)
+
+    def spectrum(self, amp: np.ndarray, pack_as_csdm: bool = False):
+        """Evaluate the spectrum of a distribution over the grid.
+
+        Args:
+            ndarray amp: The distribution evaluated at the grid nodes, with a shape
+                matching the ``amp`` array from the distribution ``pdf`` method, that
+                is, (pos[1].size, pos[0].size).
+            bool pack_as_csdm: If true, the spectrum is returned as a CSDM object.
+                The default is False.
+
+        Returns:
+            A ndarray or a CSDM object.
+
+        Example:
+            >>> from mrsimulator.models import CzjzekDistribution
+            >>> _, _, amp = CzjzekDistribution(sigma=1e6).pdf(pos)
+            >>> spectrum = kernel.spectrum(amp)
+        """
+        amp = np.asarray(amp, dtype=np.float64)
+        if amp.size != self.kernel.shape[1]:
+            raise ValueError(
+                f"The size of the distribution, {amp.size}, does not match the number "
+                f"of grid nodes, {self.kernel.shape[1]}."
+            )
+        spectrum = (self.kernel @ amp.ravel()).reshape(self.shape)
+        if not pack_as_csdm:
+            return spectrum
+        return Simulator()._as_csdm_object([spectrum], self.method)
+
+    def save(self, filename: str):
+        """Save the kernel library to a numpy ``.npz`` file.
+
+        Args:
+            str filename: The filename.
+        """
+        with open(filename, "wb") as f:
+            np.savez(f, kernel=self.kernel, shape=self.shape, key=self._key())
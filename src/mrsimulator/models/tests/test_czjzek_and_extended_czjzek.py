@@ -2,6 +2,7 @@
 from os import path
 
 import numpy as np
+import pytest
 from mrsimulator.models import CzjzekDistribution
 from mrsimulator.models import ExtCzjzekDistribution
 from mrsimulator.models.utils import x_y_from_zeta_eta
@@ -116,9 +117,61 @@ def test_czjzek_pdf():
     error = "Czjzek analytical is not equal to numerical"
     np.testing.assert_almost_equal(res, amp, decimal=2, err_msg=error)
 
+    # the pdf from the random variates.
+    _, _, amp_rvs = CzjzekDistribution(sigma).pdf([z_range, e_range], size=COUNT)
+    np.testing.assert_almost_equal(amp[1:-1], amp_rvs[1:-1], decimal=3, err_msg=error)
+
+    # eta outside the [0, 1] range.
+    e_range = np.arange(31) / 20 - 0.25
+    _, eta, amp = CzjzekDistribution(sigma).pdf([z_range, e_range])
+    assert np.all(amp[(eta < 0) | (eta > 1)] == 0)
+
+
+def test_czjzek_pdf_polar():
+    pos = [np.arange(50) * 0.25, np.arange(50) * 0.25]
+    cz_model = CzjzekDistribution(sigma=1.2, polar=True)
+    x, y, amp = cz_model.pdf(pos)
+    assert x.shape == y.shape == amp.shape == (50, 50)
+    np.testing.assert_almost_equal(amp.sum(), 1)
+
+    _, _, amp_rvs = cz_model.pdf(pos, size=COUNT)
+    error = "Czjzek analytical is not equal to numerical"
+    np.testing.assert_almost_equal(amp, amp_rvs, decimal=3, err_msg=error)
+
+    # x and y outside the first quadrant.
+    pos = [np.arange(60) * 0.25 - 2.5, np.arange(60) * 0.25 - 2.5]
+    x, y, amp = cz_model.pdf(pos)
+    assert np.all(amp[(x < 0) | (y < 0)] == 0)
+    np.testing.assert_almost_equal(amp.sum(), 1)
+
 
 def test_czjzek_polar():
     x, y = CzjzekDistribution(sigma=0.5, polar=True).rvs(size=COUNT)
     x1, y1 = x_y_from_zeta_eta(*x_y_to_zeta_eta(x, y))
     np.testing.assert_almost_equal(x, x1)
     np.testing.assert_almost_equal(y, y1)
+
+
+def test_rvs_and_pdf_seed():
+    S0 = {"Cq": 1e6, "eta": 0.3}
+    pos = [np.arange(41) * 0.1e6 - 2e6, np.arange(21) / 20]
+    for model in [CzjzekDistribution(1e6), ExtCzjzekDistribution(S0, eps=0.2)]:
+        # reproducible for a given seed, irrespective of the number of threads.
+        zeta, eta = model.rvs(size=6e5, seed=42, n_jobs=1)
+        zeta_, eta_ = model.rvs(size=6e5, seed=42, n_jobs=3)
+        assert zeta.size == 600000
+        np.testing.assert_equal(zeta, zeta_)
+        np.testing.assert_equal(eta, eta_)
+        assert not np.array_equal(zeta, model.rvs(size=6e5, seed=1)[0])
+
+        # the chunked pdf is the histogram of the random variates.
+        _, _, amp = model.pdf(pos, size=6e5, seed=42, n_jobs=2)
+        delta = [(pos[0][1] - pos[0][0]) / 2, (pos[1][1] - pos[1][0]) / 2]
+        limits = [[pos[i][0] - delta[i], pos[i][-1] + delta[i]] for i in range(2)]
+        hist, _, _ = np.histogram2d(zeta, eta, bins=[41, 21], range=limits)
+        np.testing.assert_allclose(amp, hist.T / hist.sum(), atol=1e-12)
+
+    # an empty sample has no pdf.
+    for size in [0, -1]:
+        with pytest.raises(ValueError, match=".*size must be a positive integer.*"):
+            model.pdf(pos, size=size)
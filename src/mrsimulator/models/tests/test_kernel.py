@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import SpinSystemArray
+from mrsimulator.methods import BlochDecayCentralTransitionSpectrum
+from mrsimulator.models import CzjzekDistribution
+from mrsimulator.models import LineshapeKernel
+from mrsimulator.models.utils import x_y_to_zeta_eta
+
+__author__ = "Deepansh J. Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+METHOD = BlochDecayCentralTransitionSpectrum(
+    channels=["27Al"],
+    magnetic_flux_density=9.4,
+    rotor_frequency=1e9,
+    spectral_dimensions=[{"count": 256, "spectral_width": 5e4}],
+)
+
+
+def simulate(zeta, eta, amp):
+    spin_systems = SpinSystemArray(
+        isotopes="27Al",
+        isotropic_chemical_shifts=10,
+        quadrupolar={"Cq": zeta, "eta": eta},
+        abundance=amp,
+    )
+    sim = Simulator(spin_systems=spin_systems, methods=[METHOD])
+    sim.run()
+    return sim.methods[0].simulation
+
+
+def test_kernel_spectrum():
+    pos = [np.linspace(0, 1e7, 20), np.linspace(0, 1, 11)]
+    kernel = LineshapeKernel(pos, METHOD, "27Al", isotropic_chemical_shift=10)
+    assert kernel.kernel.shape == (256, 220)
+    assert METHOD.simulation is None
+
+    Cq, eta, amp = CzjzekDistribution(2e6).pdf(pos)
+    spectrum = kernel.spectrum(amp)
+    expected = simulate(Cq.ravel(), eta.ravel(), amp.ravel())
+    np.testing.assert_allclose(spectrum, expected.y[0].components[0], atol=1e-15)
+
+    csdm = kernel.spectrum(amp, pack_as_csdm=True)
+    assert csdm.x[0] == expected.x[0]
+    np.testing.assert_allclose(csdm.y[0].components[0], spectrum)
+
+    error = "does not match the number of grid nodes"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        kernel.spectrum(amp[:-1])
+
+
+def test_kernel_polar():
+    pos = [np.linspace(0, 5e6, 10), np.linspace(0, 5e6, 10)]
+    kernel = LineshapeKernel(
+        pos, METHOD, "27Al", polar=True, isotropic_chemical_shift=10
+    )
+    x, y, amp = CzjzekDistribution(2e6, polar=True).pdf(pos)
+
+    zeta, eta = x_y_to_zeta_eta(x.ravel(), y.ravel())
+    expected = simulate(zeta, eta, amp.ravel())
+    spectrum = kernel.spectrum(amp)
+    np.testing.assert_allclose(spectrum, expected.y[0].components[0], atol=1e-15)
+
+    error = "is not a valid tensor"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        LineshapeKernel(pos, METHOD, "27Al", tensor="dipolar")
+
+
+def test_kernel_cache(tmp_path):
+    filename = str(tmp_path / "kernel.npz")
+    pos = [np.linspace(0, 1e7, 5), np.linspace(0, 1, 3)]
+    kernel = LineshapeKernel(pos, METHOD, "27Al", filename=filename)
+
+    # the kernel is loaded from the file.
+    cached = LineshapeKernel(pos, METHOD, "27Al", filename=filename)
+    np.testing.assert_equal(cached.kernel, kernel.kernel)
+    assert cached.shape == kernel.shape
+    cached.kernel[:] = 0
+    cached.save(filename)
+    assert np.all(LineshapeKernel(pos, METHOD, "27Al", filename=filename).kernel == 0)
+
+    # a kernel with different arguments is simulated and replaces the file.
+    other = LineshapeKernel(pos, METHOD, "27Al", polar=True, filename=filename)
+    assert not np.all(other.kernel == 0)
+    with np.load(filename) as data:
+        np.testing.assert_equal(data["kernel"], other.kernel)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 from mrsimulator.models.utils import get_Haeberlen_components
+from mrsimulator.models.utils import get_Haeberlen_components_from_cartesian
 from mrsimulator.models.utils import get_principal_components
 from mrsimulator.models.utils import x_y_from_zeta_eta
 from mrsimulator.models.utils import x_y_to_zeta_eta
@@ -35,19 +36,47 @@ def test_get_Haeberlen_components():
     pas = [-15, -15, 30]
     tensors = np.diag(pas)[np.newaxis, :, :]
     components = get_Haeberlen_components(tensors)
-    assert components == (30, 0)
+    np.testing.assert_allclose(components, ([30], [0]))
 
     # 2
     pas = [-30, 0, 30]
     tensors = np.diag(pas)[np.newaxis, :, :]
     components = get_Haeberlen_components(tensors)
-    assert components == (30, 1)
+    np.testing.assert_allclose(components, ([30], [1]))
 
     # 3
     pas = [-22.5, -7.5, 30]
     tensors = np.diag(pas)[np.newaxis, :, :]
     components = get_Haeberlen_components(tensors)
-    assert components == (30, 0.5)
+    np.testing.assert_allclose(components, ([30], [0.5]))
+
+
+def test_get_Haeberlen_components_random():
+    # random traceless symmetric tensors
+    tensors = np.random.normal(size=(10000, 3, 3))
+    tensors += tensors.transpose(0, 2, 1)
+    trace = np.trace(tensors, axis1=1, axis2=2)
+    tensors -= trace[:, np.newaxis, np.newaxis] * np.eye(3) / 3
+
+    eig_val = np.linalg.eigvalsh(tensors)
+    index = np.argsort(np.abs(eig_val), axis=1, kind="mergesort")
+    eig_val = np.take_along_axis(eig_val, index, axis=1)
+    zeta_ = eig_val[:, 2]
+    eta_ = (eig_val[:, 0] - eig_val[:, 1]) / zeta_
+
+    zeta, eta = get_Haeberlen_components(tensors)
+    np.testing.assert_allclose(zeta, zeta_, rtol=1e-10)
+    np.testing.assert_allclose(eta, eta_, atol=1e-6)
+
+    # from the five independent components.
+    args = [tensors[:, i, j] for i, j in [(0, 0), (1, 1), (0, 1), (0, 2), (1, 2)]]
+    zeta, eta = get_Haeberlen_components_from_cartesian(*args)
+    np.testing.assert_allclose(zeta, zeta_, rtol=1e-10)
+
+    # zero tensor
+    zeta, eta = get_Haeberlen_components(np.zeros((1, 3, 3)))
+    assert zeta[0] == 0
+    assert np.isnan(eta[0])
 
 
 def test_x_y_from_zeta_eta():
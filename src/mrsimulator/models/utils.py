@@ -28,18 +28,56 @@ def get_Haeberlen_components(tensors):
         ndarray tensors: A `N x 3 x 3` ndarray of `N` traceless symmetric second-rank
             Cartesian tensors.
     """
-    n = tensors.shape[0]
-    eig_val = np.linalg.eigvalsh(tensors)
-    eig_val_sort_ = np.argsort(np.abs(eig_val), axis=1, kind="mergesort")
-    eig_val_sort_ = (eig_val_sort_.T + 3 * np.arange(n)).T.ravel()
-    eig_val_sorted = eig_val.ravel()[eig_val_sort_].reshape(n, 3)
+    return get_Haeberlen_components_from_cartesian(
+        tensors[:, 0, 0],
+        tensors[:, 1, 1],
+        tensors[:, 0, 1],
+        tensors[:, 0, 2],
+        tensors[:, 1, 2],
+    )
 
-    eig_val_sort_ = eig_val = None
-    del eig_val_sort_, eig_val
 
-    zeta = eig_val_sorted[:, -1]
-    eta = (eig_val_sorted[:, 0] - eig_val_sorted[:, 1]) / zeta
+def get_Haeberlen_components_from_cartesian(xx, yy, xy, xz, yz):
+    r"""Return zeta and eta parameters using the Haeberlen convention from the five
+    independent Cartesian components of traceless symmetric second-rank tensors.
 
+    The eigenvalues of a traceless symmetric tensor follow in closed form from the
+    invariants, :math:`p = \sqrt{\text{tr}(S^2)/6}` and
+    :math:`\cos 3\phi = \det(S) / 2p^3`, as :math:`2p\cos\phi`,
+    :math:`2p\cos(\phi - 2\pi/3)`, and :math:`2p\cos(\phi + 2\pi/3)`, with
+    :math:`\phi \in [0, \pi/3]`. Ordering the eigenvalues by magnitude gives
+
+    .. math::
+        \zeta = \pm 2p \cos\psi, \quad \eta = \sqrt{3}\tan\psi,
+
+    where :math:`\psi = \min(\phi, \pi/3 - \phi)`, and the sign is positive for
+    :math:`\phi \le \pi/6`.
+
+    Args:
+        ndarray xx: The Sxx components.
+        ndarray yy: The Syy components. The Szz component is -(Sxx + Syy).
+        ndarray xy: The Sxy components.
+        ndarray xz: The Sxz components.
+        ndarray yz: The Syz components.
+    """
+    zz = -(xx + yy)
+    xy_sq, xz_sq, yz_sq = xy * xy, xz * xz, yz * yz
+
+    p = np.sqrt((xx * xx + yy * yy + zz * zz + 2 * (xy_sq + xz_sq + yz_sq)) / 6)
+    det = xx * (yy * zz - yz_sq) - xy * (xy * zz - yz * xz) + xz * (xy * yz - yy * xz)
+
+    # zero tensors have a zero zeta and an undefined eta.
+    zero = p == 0
+    p3 = 2 * p * p * p
+    p3[zero] = 1
+    phi = np.arccos(np.clip(det / p3, -1, 1)) / 3
+
+    positive = phi <= np.pi / 6
+    psi = np.where(positive, phi, np.pi / 3 - phi)
+    zeta = 2 * p * np.cos(psi)
+    zeta[~positive] *= -1
+    eta = np.sqrt(3) * np.tan(psi)
+    eta[zero] = np.nan
     return zeta, eta
 
 
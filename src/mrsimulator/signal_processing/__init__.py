@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 """The Event class."""
 from sys import modules
+from typing import ClassVar
 from typing import List
 from typing import Union
 
 import csdmpy as cp
 from pydantic import BaseModel
+from pydantic import PrivateAttr
 
 from ._base import AbstractOperation
+from ._plan import Plan
+from .utils import _get_dimension_key
+from .utils import _get_fft_phase
 
 __author__ = "Maxwell C. Venetos"
 __email__ = "maxvenetos@gmail.com"
@@ -32,6 +37,7 @@ class SignalProcessor(BaseModel):
 
     processed_data: cp.CSDM = None
     operations: List[AbstractOperation] = []
+    _plan: tuple = PrivateAttr(default=None)
 
     class Config:
         validate_assignment = True
@@ -75,23 +81,146 @@ class SignalProcessor(BaseModel):
         op["operations"] = lst
         return op
 
-    def apply_operations(self, data, **kwargs):
+    def apply_operations(self, data, n_jobs: int = -1, **kwargs):
         """
         Function to apply all the operation functions in the operations member of a
         SignalProcessor object. Operations applied sequentially over the data member.
 
+        The components of all the dependent variables are stacked into one array, and
+        processed in one pass with the compiled plan of the operations, see the
+        ``compile`` method, such that the Fourier transforms of all the dependent
+        variables are evaluated in one multi-threaded call, and the apodizations are
+        applied as one broadcast multiplication. When an operation does not support
+        the compiled plan, or the dependent variables differ in shape, the operations
+        are applied to the CSDM object one at a time.
+
+        Args:
+            data: A CSDM object.
+            n_jobs: The number of threads used in the Fourier transforms. The default
+                is -1, that is, all cores.
+
         Returns:
             CSDM object: A copy of the data member with the operations applied to it.
         """
         if not isinstance(data, cp.CSDM):
             raise ValueError("The data must be a CSDM object.")
-        # copy_data = data.copy()
-        for filters in self.operations:
-            data = filters.operate(data)
+
+        components = [item.components for item in data.dependent_variables]
+        shapes = {item.shape for item in components}
+        try:
+            plan = self.compile(data) if len(shapes) == 1 else None
+        except NotImplementedError:
+            plan = None
+
+        if plan is None:
+            for filters in self.operations:
+                data = filters.operate(data)
+            self.processed_data = data
+            return data
+
+        components = plan.apply(components, n_jobs=n_jobs)
+        data = data.copy()
+        for i, dimension in enumerate(plan.dimensions):
+            data.dimensions[i] = dimension.copy()
+        for item, datum in zip(data.dependent_variables, components):
+            item.components = datum
         self.processed_data = data
 
         return data
 
+    def apply_operations_to_array(self, array, data):
+        """
+        Apply the operations to an ndarray of the stacked components of the dependent
+        variables of the CSDM object, `data`, without creating intermediate CSDM
+        objects, using the compiled plan of the operations, see the ``compile``
+        method. The plan is re-used over the calls with a CSDM object of the same
+        dimensions and the same operations, making the method suited for the repeated
+        processing within a least-squares fit. The `processed_data` attribute is not
+        updated.
+
+        Args:
+            array: An ndarray of shape (n_dv, n_components, ...), or a list of
+                ndarrays of the components of each dependent variable.
+            data: A CSDM object, whose dimensions describe the components.
+
+        Returns:
+            An ndarray of the processed components of the dependent variables.
+        """
+        return self.compile(data).apply(array)
+
+    def compile(self, data):
+        """
+        Compile the operations into an optimized plan for the dimensions of the CSDM
+        object, `data`. The plan applies the operations to an ndarray of the stacked
+        components of the dependent variables, where
+
+        - the consecutive multiplications, that is, the apodizations, the shears, the
+          scaling, and the phases of the Fourier transforms, are merged into a single
+          multiplication by a precomputed multiplier,
+        - the adjacent forward and inverse Fourier transforms along the same dimension
+          cancel,
+        - the Fourier transforms along different dimensions are merged into one
+          multi-dimensional transform, evaluated with the multi-threaded
+          ``scipy.fft`` module when available, and the real-input transform when the
+          components are real, and
+        - the multipliers are cached by the values of the fitted attributes, such as
+          the FWHM of an apodization.
+
+        The plan is re-used over the calls with a CSDM object of the same dimensions
+        and the same operations. A repeated application of the operations within a
+        least-squares fit then only costs the Fourier transforms and one multiplication
+        between the transforms. The result agrees with the ``apply_operations`` method
+        to within the floating-point rounding of the merged multipliers.
+
+        Args:
+            data: A CSDM object, whose dimensions describe the components.
+
+        Returns:
+            A Plan object. Call the ``apply`` method of the plan, with the ndarray of
+            the stacked components, to apply the operations.
+
+        Example:
+            >>> import csdmpy as cp
+            >>> dim = cp.LinearDimension(count=256, increment="10 Hz", complex_fft=True)
+            >>> data = cp.CSDM(
+            ...     dimensions=[dim],
+            ...     dependent_variables=[cp.as_dependent_variable(np.random.rand(256))],
+            ... )
+            >>> post_sim = sp.SignalProcessor(
+            ...     operations=[
+            ...         sp.IFFT(),
+            ...         apo.Gaussian(FWHM="50 Hz"),
+            ...         apo.Exponential(FWHM="20 Hz"),
+            ...         sp.FFT(),
+            ...         sp.Scale(factor=10),
+            ...     ]
+            ... )
+            >>> plan = post_sim.compile(data)
+            >>> plan.steps
+            [IFFT(axis=-1), Multiply(Gaussian, Exponential, Scale), FFT(axis=-1)]
+            >>> processed = plan.apply([data.y[0].components])
+        """
+        key = self._get_cache_key(data)
+        if not self._is_cached(self._plan, key):
+            plan = Plan.from_operations(self.operations, data)
+            self._plan = (key, list(self.operations), plan)
+        return self._plan[2]
+
+    def _get_cache_key(self, data):
+        """Return the key of the plan for the CSDM object `data`, that is, the
+        dimensions and the operations, excluding the attributes read at every
+        application."""
+        return (
+            [_get_dimension_key(item) for item in data.dimensions],
+            [repr(op.dict(exclude=op.array_attributes)) for op in self.operations],
+        )
+
+    def _is_cached(self, cache, key):
+        """Return True when the cache was evaluated for the key and the operations."""
+        if cache is None or cache[0] != key or len(cache[1]) != len(self.operations):
+            return False
+        return all(a is b for a, b in zip(cache[1], self.operations))
+
 
 class Scale(AbstractOperation):
     """
@@ -108,6 +237,7 @@ class Scale(AbstractOperation):
     """
 
     factor: float = 1
+    array_attributes: ClassVar = {"factor"}
 
     def operate(self, data):
         r"""Applies the operation for which the class is named for.
@@ -121,6 +251,15 @@ class Scale(AbstractOperation):
         data *= self.factor
         return data
 
+    def _operate_dimensions(self, data):
+        return data
+
+    def _get_array_vectors(self, data):
+        def vectors():
+            return [self.factor]
+
+        return vectors
+
 
 class IFFT(AbstractOperation):
     """
@@ -151,6 +290,20 @@ class IFFT(AbstractOperation):
             data = data.fft(axis=i)
         return data
 
+    def _get_array_transforms(self, data):
+        """Return a list of (axis, inverse, phase) tuples of the one-dimensional
+        Fourier transforms applied to the stacked components of the dependent variables
+        of the CSDM object `data`, where inverse is True for an inverse transform, and
+        phase is the broadcast phase vector of the transform. The phase multiplies the
+        components before an inverse transform, and after a forward transform."""
+        dim_index = self.dim_index
+        if isinstance(dim_index, int):
+            dim_index = [dim_index]
+
+        ndim = len(data.dimensions)
+        dims = data.dimensions
+        return [(-1 - i, *_get_fft_phase(dims[i], i, ndim)) for i in dim_index]
+
 
 class FFT(IFFT):
     """
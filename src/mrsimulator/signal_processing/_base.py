@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """The AbstractOperation class."""
+from typing import ClassVar
+
 import numpy as np
 from mrsimulator.utils.parseable import Parseable
 
@@ -10,6 +12,10 @@ __email__ = "maxvenetos@gmail.com"
 class AbstractOperation(Parseable):
     """A base class for signal processing operations."""
 
+    # the attributes read at every application of the compiled plan. A change in the
+    # remaining attributes requires a new plan.
+    array_attributes: ClassVar = set()
+
     @property
     def function(self):
         return self.__class__.__name__
@@ -21,6 +27,26 @@ class AbstractOperation(Parseable):
             my_dict["type"] = self.type
         return my_dict
 
+    def _get_array_vectors(self, data):
+        """Return a function evaluating the list of broadcast vectors, which multiply
+        the stacked components of the dependent variables of the CSDM object `data`,
+        at the current values of the attributes. The value is None when the operation
+        is not a multiplication.
+
+        Args:
+            data: A CSDM object.
+        """
+        return None
+
+    def _operate_dimensions(self, data):
+        """Apply the operation to the dimensions of the CSDM object `data`, which holds
+        no dependent variables. The default applies the operation.
+
+        Args:
+            data: A CSDM object.
+        """
+        return self.operate(data)
+
     @staticmethod
     def _get_dv_indexes(indexes, n):
         """Return a list of dependent variable indexes.
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""The compiled plan of the signal processing operations."""
+from typing import List
+
+import csdmpy as cp
+import numpy as np
+
+try:
+    import scipy.fft as _fft
+except ImportError:  # pragma: no cover
+    _fft = None
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+# the maximum number of multipliers cached by a multiply step.
+MAX_CACHE_SIZE = 32
+
+
+class _Multiply:
+    """A step multiplying the stacked components of the dependent variables by the
+    product of the vectors of one or more operations. The operations are given as a
+    list of (operation, vectors) tuples, where vectors is a function evaluating the
+    broadcast vectors of the operation. A constant step holds the precomputed
+    multiplier, for example, the phase of a Fourier transform."""
+
+    def __init__(self, members: list, n_dv: int, constant=None):
+        self.members = members
+        self.n_dv = n_dv
+        self.constant = constant
+        self.cache = {}
+
+    @classmethod
+    def from_constant(cls, vector, n_dv: int):
+        return cls([], n_dv, constant=vector)
+
+    @property
+    def is_scalar(self):
+        """True when every member scales all the dependent variables by a scalar."""
+        return self.constant is None and all(
+            getattr(op, "dv_index", None) is None and np.ndim(vec) == 0
+            for op, vectors in self.members
+            for vec in vectors()
+        )
+
+    def merge(self, other):
+        constant = self.constant
+        if other.constant is not None:
+            constant = other.constant if constant is None else constant * other.constant
+        return _Multiply(self.members + other.members, self.n_dv, constant)
+
+    def _key(self):
+        return tuple(
+            (
+                tuple(getattr(op, name) for name in sorted(op.array_attributes)),
+                repr(getattr(op, "dv_index", None)),
+            )
+            for op, _ in self.members
+        )
+
+    def multiplier(self):
+        """Return the product of the vectors at the current values of the operation
+        attributes. The products are cached by the attribute values."""
+        key = self._key()
+        if key in self.cache:
+            return self.cache[key]
+
+        multiplier = 1.0 if self.constant is None else self.constant
+        for op, vectors in self.members:
+            dv_index = getattr(op, "dv_index", None)
+            for vector in vectors():
+                if dv_index is None:
+                    multiplier = multiplier * vector
+                    continue
+
+                # the multiplier is expanded along the dependent variable axis.
+                dv_indexes = op._get_dv_indexes(dv_index, n=self.n_dv)
+                shape = np.broadcast(multiplier, vector[np.newaxis]).shape
+                shape = (self.n_dv, *shape[1:])
+                dtype = np.result_type(multiplier, vector)
+                multiplier = np.array(np.broadcast_to(multiplier, shape), dtype=dtype)
+                multiplier[dv_indexes] *= vector
+
+        if len(self.cache) >= MAX_CACHE_SIZE:
+            self.cache.pop(next(iter(self.cache)))
+        self.cache[key] = multiplier
+        return multiplier
+
+    def __call__(self, array, workers=None):
+        multiplier = self.multiplier()
+        if np.can_cast(np.result_type(array, multiplier), array.dtype):
+            array *= multiplier
+            return array
+        return array * multiplier
+
+    def __repr__(self):
+        names = [op.__class__.__name__ for op, _ in self.members]
+        if self.constant is not None:
+            names = ["phase"] + names
+        return f"Multiply({', '.join(names)})"
+
+
+class _Transform:
+    """A step applying a multi-dimensional Fourier transform along the axes of the
+    stacked components of the dependent variables, without the phase. The transforms
+    of all the dependent variables are evaluated in one call, using the multi-threaded
+    scipy.fft module when available, and the real-input transform for real arrays."""
+
+    def __init__(self, axes: tuple, inverse: bool):
+        self.axes = tuple(axes)
+        self.inverse = inverse
+
+    def commutes(self, step):
+        """True when the multiplier of the multiply step is constant along the axes of
+        the transform."""
+        shape = np.shape(step.multiplier())
+        return all(-axis > len(shape) or shape[axis] == 1 for axis in self.axes)
+
+    def __call__(self, array, workers=None):
+        axes = self.axes
+        if self.inverse:
+            return _fftn(np.fft.ifftshift(array, axes=axes), axes, True, workers)
+        return np.fft.fftshift(_fftn(array, axes, False, workers), axes=axes)
+
+    def __repr__(self):
+        name = "IFFT" if self.inverse else "FFT"
+        if len(self.axes) == 1:
+            return f"{name}(axis={self.axes[0]})"
+        return f"{name}(axes={self.axes})"
+
+
+def _fftn(array, axes: tuple, inverse: bool, workers=None):
+    """Return the multi-dimensional discrete Fourier transform of the array along the
+    axes. The transform of a real array is evaluated from the real-input transform,
+    and the half spectrum is completed from the Hermitian symmetry."""
+    kwargs = {} if _fft is None else {"workers": workers}
+    module = np.fft if _fft is None else _fft
+    if np.iscomplexobj(array):
+        function = module.ifftn if inverse else module.fftn
+        return function(array, axes=axes, **kwargs)
+
+    # the inverse transform of a real array is the conjugate of the forward transform.
+    half = module.rfftn(array, axes=axes, **kwargs)
+    n = array.shape[axes[-1]]
+    rest = np.take(half, np.arange(n - half.shape[axes[-1]], 0, -1), axis=axes[-1])
+    for axis in axes[:-1]:
+        rest = np.roll(np.flip(rest, axis=axis), 1, axis=axis)
+    spectrum = np.concatenate([half, rest.conj()], axis=axes[-1])
+    if not inverse:
+        return spectrum
+    size = np.prod([array.shape[axis] for axis in axes])
+    spectrum = spectrum.conj()
+    spectrum /= size
+    return spectrum
+
+
+class Plan:
+    """An optimized sequence of steps applying the operations of a SignalProcessor to
+    the stacked components of the dependent variables of CSDM objects with given
+    dimensions. See :meth:`~mrsimulator.signal_processing.SignalProcessor.compile`.
+
+    Attributes:
+        steps: The list of steps.
+        dimensions: The list of dimensions of the processed CSDM object.
+    """
+
+    def __init__(self, steps: List, to_complex: bool, dimensions: List = None):
+        self.steps = steps
+        self.to_complex = to_complex
+        self.dimensions = dimensions
+
+    @classmethod
+    def from_operations(cls, operations: list, data):
+        """Create the plan of the operations for the CSDM object `data`."""
+        n_dv = len(data.dependent_variables)
+        template = _get_template(data)
+        steps, to_complex = [], False
+        for operation in operations:
+            transforms = getattr(operation, "_get_array_transforms", None)
+            vectors = operation._get_array_vectors(template)
+            if transforms is not None:
+                to_complex = True
+                for axis, inverse, phase in transforms(template):
+                    phase = _Multiply.from_constant(phase, n_dv)
+                    transform = _Transform((axis,), inverse)
+                    steps += [phase, transform] if inverse else [transform, phase]
+            elif vectors is not None:
+                steps.append(_Multiply([(operation, vectors)], n_dv))
+            else:
+                raise NotImplementedError(
+                    f"The {operation.__class__.__name__} operation does not support "
+                    "ndarray data."
+                )
+            template = operation._operate_dimensions(template)
+        return cls(_optimize(steps), to_complex, template.dimensions)
+
+    def apply(self, array, n_jobs: int = -1):
+        """Apply the plan to an ndarray of the stacked components of the dependent
+        variables. The input array is not modified.
+
+        Args:
+            array: An ndarray of shape (n_dv, n_components, ...), or a list of
+                ndarrays of the components of each dependent variable.
+            n_jobs: The number of threads used in the Fourier transforms. A negative
+                value is counted backwards from the number of available cores, that
+                is, -1 uses all cores. The default is -1.
+
+        Returns:
+            An ndarray of the processed components of the dependent variables.
+        """
+        array = np.array(array)
+        for step in self.steps:
+            array = step(array, n_jobs)
+        if self.to_complex and not np.iscomplexobj(array):
+            array = array.astype(np.complex128)
+        return array
+
+    __call__ = apply
+
+    def __repr__(self):
+        return f"Plan({' -> '.join(repr(step) for step in self.steps)})"
+
+
+def _get_template(data):
+    """Return a CSDM object with a copy of the dimensions of `data`, and without the
+    dependent variables, used in the evaluation of the coordinates of the steps."""
+    return cp.CSDM(dimensions=[item.copy() for item in data.dimensions])
+
+
+def _optimize(steps: list) -> list:
+    """Optimize the steps. The scalar multiplications, which commute with the Fourier
+    transforms, are set aside, the adjacent multiplications are merged into one step,
+    the adjacent forward and inverse Fourier transforms along the same axes are
+    cancelled, and the transforms in the same direction along different axes are
+    merged into one multi-dimensional transform, until no further change. The scalar
+    multiplications are then folded into the first multiplication step."""
+    scalars = [item for item in steps if _is_scalar(item)]
+    steps = [item for item in steps if not _is_scalar(item)]
+
+    size = None
+    while size != len(steps):
+        size = len(steps)
+        steps = _cancel_transforms(_merge_multiplications(steps))
+        steps = _merge_transforms(steps)
+
+    if scalars != []:
+        scalar = scalars[0]
+        for item in scalars[1:]:
+            scalar = scalar.merge(item)
+        index = [i for i, item in enumerate(steps) if isinstance(item, _Multiply)]
+        if index == []:
+            steps.append(scalar)
+        else:
+            steps[index[0]] = steps[index[0]].merge(scalar)
+    return steps
+
+
+def _is_scalar(step):
+    return isinstance(step, _Multiply) and step.is_scalar
+
+
+def _merge_multiplications(steps: list) -> list:
+    """Merge the adjacent multiplications, and remove the constant multiplications of
+    unit value, such as the phases of the cancelled Fourier transforms."""
+    merged = []
+    for step in steps:
+        if isinstance(step, _Multiply) and merged and isinstance(merged[-1], _Multiply):
+            step = merged.pop().merge(step)
+        if isinstance(step, _Multiply) and step.constant is not None:
+            if np.allclose(step.constant, 1, rtol=0, atol=1e-12):
+                step = _Multiply(step.members, step.n_dv)
+        if isinstance(step, _Multiply) and step.constant is None and not step.members:
+            continue
+        merged.append(step)
+    return merged
+
+
+def _cancel_transforms(steps: list) -> list:
+    """Remove the adjacent forward and inverse transforms along the same axes."""
+    cancelled = []
+    for step in steps:
+        previous = cancelled[-1] if cancelled else None
+        if all(isinstance(item, _Transform) for item in [previous, step]):
+            same_axes = set(previous.axes) == set(step.axes)
+            if same_axes and previous.inverse != step.inverse:
+                cancelled.pop()
+                continue
+        cancelled.append(step)
+    return cancelled
+
+
+def _merge_transforms(steps: list) -> list:
+    """Merge the adjacent transforms in the same direction along different axes. A
+    multiplication between the transforms, constant along the axes of one of the
+    transforms, such as the phase of the second transform of a two-dimensional
+    Fourier transform, is moved past that transform."""
+    merged = []
+    for step in steps:
+        if isinstance(step, _Transform) and merged:
+            middle = None
+            if isinstance(merged[-1], _Multiply) and len(merged) > 1:
+                middle, previous = merged[-1], merged[-2]
+            else:
+                previous = merged[-1]
+
+            mergeable = isinstance(previous, _Transform)
+            mergeable = mergeable and previous.inverse == step.inverse
+            if mergeable and set(previous.axes).isdisjoint(step.axes):
+                transform = _Transform(previous.axes + step.axes, step.inverse)
+                if middle is None:
+                    merged[-1] = transform
+                    continue
+                if previous.commutes(middle):
+                    merged[-2:] = [middle, transform]
+                    continue
+                if step.commutes(middle):
+                    merged[-2:] = [transform, middle]
+                    continue
+        merged.append(step)
+    return merged
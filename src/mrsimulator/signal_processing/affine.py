@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """The Event class."""
 from sys import modules
+from typing import ClassVar
 from typing import Dict
 from typing import Union
 
@@ -97,6 +98,7 @@ class Shear(AbstractAffineTransformation):
     factor: Union[float, str] = 0
     parallel: int = 1
     property_units: Dict = {"factor": const}
+    array_attributes: ClassVar = {"factor"}
 
     @validator("factor")
     def str_to_quantity(cls, v, values):
@@ -141,6 +143,29 @@ class Shear(AbstractAffineTransformation):
 
         return data
 
+    def _operate_dimensions(self, data):
+        # the shear does not change the dimensions.
+        return data
+
+    def _get_array_vectors(self, data):
+        dims = data.dimensions
+        n_dim = len(dims)
+
+        x = dims[self.dim_index]
+        y = dims[self.parallel]
+
+        vector_x = _get_broadcast_shape(get_coordinates(x).value, self.dim_index, n_dim)
+        vector_y = _get_broadcast_shape(get_coordinates(y).value, self.parallel, n_dim)
+        xy = vector_x * vector_y
+        increment_unit = x.increment.unit * y.increment.unit
+
+        def vectors():
+            unit = 1 / self.property_units["factor"]
+            multiplier = unit.to(increment_unit).value
+            return [np.exp(-2j * np.pi * xy * self.factor * multiplier)]
+
+        return vectors
+
 
 class Scale(AbstractAffineTransformation):
     r"""Scale the dimension along the specified dimension index.
@@ -175,6 +200,13 @@ class Scale(AbstractAffineTransformation):
         data.dimensions[self.dim_index].reciprocal.coordinates_offset /= self.factor
         return data
 
+    def _get_array_vectors(self, data):
+        # only the coordinates of the dimension are scaled.
+        def vectors():
+            return []
+
+        return vectors
+
 
 # class Translate(AbstractAffineTransformation):
 #     r"""Apodize a dependent variable of the CSDM object with a Gaussian function.
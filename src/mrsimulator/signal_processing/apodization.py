@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """The Event class."""
 from sys import modules
+from typing import ClassVar
 from typing import Dict
 from typing import Union
 
@@ -66,6 +67,39 @@ class AbstractApodization(AbstractOperation):
                 data.dependent_variables[i].components *= apodization_vactor
         return data
 
+    def _operate_dimensions(self, data):
+        # the apodization does not change the dimensions.
+        return data
+
+    def _get_vector_function(self, data, fn, prop_name):
+        """Return a function evaluating the list of broadcast apodization vectors of
+        the CSDM object `data` at the current value of the argument. The coordinates
+        are converted once.
+
+        Args:
+            data: A CSDM object.
+            fn: The apodization function.
+            prop_name: The argument name for the function fn.
+        """
+        dims = data.dimensions
+        ndim = len(dims)
+
+        dim_index = self.dim_index
+        if isinstance(dim_index, int):
+            dim_index = [dim_index]
+
+        unit = 1 / self.property_units[prop_name]
+        coordinates = [(i, dims[i].coordinates.to(unit).value) for i in dim_index]
+
+        def vectors():
+            value = getattr(self, prop_name)
+            return [
+                _get_broadcast_shape(fn(x_value, value), i, ndim)
+                for i, x_value in coordinates
+            ]
+
+        return vectors
+
 
 class Gaussian(AbstractApodization):
     r"""Apodize a dependent variable of the CSDM object with a Gaussian function.
@@ -102,6 +136,7 @@ class Gaussian(AbstractApodization):
 
     FWHM: Union[float, str] = 0
     property_units: Dict = {"FWHM": ""}
+    array_attributes: ClassVar = {"FWHM"}
 
     @validator("FWHM")
     def str_to_quantity(cls, v, values):
@@ -120,6 +155,18 @@ class Gaussian(AbstractApodization):
         return amp.real / (sigma * np.sqrt(2 * np.pi))
         # return np.exp(-2 * ((x * sigma * np.pi) ** 2))
 
+    @staticmethod
+    def fn_derivative(x, arg):
+        # derivative of fn with respect to arg, the FWHM.
+        sigma = arg / 2.354820045030949
+        xinv = np.fft.ifftshift(np.arange(x.size, dtype=np.float64) - int(x.size / 2))
+        xinv /= x[-1] - x[0]
+        norm = sigma * np.sqrt(2 * np.pi)
+        gauss = np.exp(-0.5 * (xinv / sigma) ** 2)
+        amp = np.fft.ifftshift(np.fft.ifft(gauss)).real / norm
+        d_amp = np.fft.ifftshift(np.fft.ifft(gauss * xinv ** 2 / sigma ** 3)).real
+        return (d_amp / norm - amp / sigma) / 2.354820045030949
+
     def operate(self, data):
         """
         Applies the operation for which the class is named for.
@@ -130,6 +177,19 @@ class Gaussian(AbstractApodization):
 
         return self._operate(data, fn=self.fn, prop_name="FWHM", prop_value=self.FWHM)
 
+    def derivative(self, data):
+        """
+        Applies the derivative of the operation with respect to the FWHM.
+
+        data: CSDM object
+        """
+        return self._operate(
+            data, fn=self.fn_derivative, prop_name="FWHM", prop_value=self.FWHM
+        )
+
+    def _get_array_vectors(self, data):
+        return self._get_vector_function(data, fn=self.fn, prop_name="FWHM")
+
 
 class Exponential(AbstractApodization):
     r"""Apodize a dependent variable of the CSDM object by an exponential function.
@@ -165,6 +225,7 @@ class Exponential(AbstractApodization):
 
     FWHM: Union[float, str] = 0
     property_units: Dict = {"FWHM": ""}
+    array_attributes: ClassVar = {"FWHM"}
 
     @validator("FWHM")
     def str_to_quantity(cls, v, values):
@@ -177,6 +238,11 @@ class Exponential(AbstractApodization):
     def fn(x, arg):
         return np.exp(-arg * np.pi * np.abs(x))
 
+    @staticmethod
+    def fn_derivative(x, arg):
+        # derivative of fn with respect to arg, the FWHM.
+        return -np.pi * np.abs(x) * np.exp(-arg * np.pi * np.abs(x))
+
     def operate(self, data):
         """
         Applies the operation for which the class is named for.
@@ -187,6 +253,19 @@ class Exponential(AbstractApodization):
 
         return self._operate(data, fn=self.fn, prop_name="FWHM", prop_value=self.FWHM)
 
+    def derivative(self, data):
+        """
+        Applies the derivative of the operation with respect to the FWHM.
+
+        data: CSDM object
+        """
+        return self._operate(
+            data, fn=self.fn_derivative, prop_name="FWHM", prop_value=self.FWHM
+        )
+
+    def _get_array_vectors(self, data):
+        return self._get_vector_function(data, fn=self.fn, prop_name="FWHM")
+
 
 # class ExponentialAbs(AbstractApodization):
 #     r"""Apodize a dependent variable of the simulation data object by an exponential
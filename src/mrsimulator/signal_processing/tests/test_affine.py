@@ -24,6 +24,13 @@ csdm_object = cp.CSDM(
 csdm_object2 = csdm_object.copy()
 
 
+def operate(processor, data):
+    """Apply the operations to the CSDM object one at a time."""
+    for operation in processor.operations:
+        data = operation.operate(data)
+    return data
+
+
 def test_shear_01():
     processor = sp.SignalProcessor(
         operations=[
@@ -114,3 +121,44 @@ def test_scale():
 
     assert s_inc == 2 * c_inc
     assert s_off == 2 * c_off
+
+
+def test_shear_to_array():
+    processor = sp.SignalProcessor(
+        operations=[
+            sp.IFFT(dim_index=1),
+            af.Shear(factor="-1 K/s", dim_index=1, parallel=0),
+            sp.FFT(dim_index=1),
+            af.Scale(factor=2, dim_index=0),
+        ]
+    )
+    data = csdm_object2.copy()
+    components = [item.components for item in data.y]
+    for factor in [-1, -0.5]:
+        processor.operations[1].factor = factor
+        array = processor.apply_operations_to_array(components, data)
+        ref = operate(processor, data.copy())
+        np.testing.assert_allclose(
+            array, [item.components for item in ref.y], atol=1e-12
+        )
+
+
+def test_shear_compile():
+    processor = sp.SignalProcessor(
+        operations=[
+            sp.IFFT(dim_index=1),
+            af.Shear(factor="-1 K/s", dim_index=1, parallel=0),
+            af.Scale(factor=2, dim_index=0),
+            sp.FFT(dim_index=1),
+        ]
+    )
+    data = csdm_object2.copy()
+    plan = processor.compile(data)
+    assert repr(plan) == "Plan(IFFT(axis=-2) -> Multiply(Shear, Scale) -> FFT(axis=-2))"
+
+    components = [item.components for item in data.y]
+    for factor in [-1, -0.5]:
+        processor.operations[1].factor = factor
+        array = plan.apply(components)
+        ref = processor.apply_operations(data=data.copy())
+        np.testing.assert_allclose(array, [item.components for item in ref.y])
@@ -9,6 +9,13 @@ __author__ = "Maxwell C. Venetos"
 __email__ = "maxvenetos@gmail.com"
 
 
+def operate(processor, data):
+    """Apply the operations to the CSDM object one at a time."""
+    for operation in processor.operations:
+        data = operation.operate(data)
+    return data
+
+
 def test_01():
     post_sim = sp.SignalProcessor()
     operations = [
@@ -46,3 +53,177 @@ def test_01():
     post_sim_2 = sp.SignalProcessor.parse_dict_with_units(dict_)
 
     assert post_sim.operations == post_sim_2.operations
+
+
+def test_apply_operations_to_array():
+    dimension = cp.LinearDimension(
+        count=256, increment="10 Hz", coordinates_offset="-1 kHz", complex_fft=True
+    )
+    data = cp.CSDM(
+        dimensions=[dimension],
+        dependent_variables=[
+            cp.as_dependent_variable(item) for item in np.random.rand(3, 256)
+        ],
+    )
+    processor = sp.SignalProcessor(
+        operations=[
+            sp.Scale(factor=2),
+            sp.IFFT(),
+            apo.Gaussian(FWHM="50 Hz", dv_index=[0, 2]),
+            apo.Exponential(FWHM="20 Hz"),
+            sp.FFT(),
+        ]
+    )
+    components = [item.components for item in data.y]
+    for fwhm in [50, 70, 70]:
+        processor.operations[2].FWHM = fwhm
+        array = processor.apply_operations_to_array(components, data)
+        ref = operate(processor, data.copy())
+        np.testing.assert_allclose(array, [item.components for item in ref.y])
+        np.testing.assert_equal(array, processor.compile(data).apply(components))
+
+    # the input components are not modified.
+    assert np.array_equal(components, [item.components for item in data.y])
+
+    # the plan is re-compiled for the new operations.
+    plan = processor.compile(data)
+    processor.operations.insert(1, sp.IFFT())
+    processor.operations.insert(2, sp.FFT())
+    array = processor.apply_operations_to_array(components, data)
+    assert processor.compile(data) is not plan
+    ref = operate(processor, data.copy())
+    np.testing.assert_allclose(array, [item.components for item in ref.y])
+
+    with pytest.raises(NotImplementedError, match=".*does not support ndarray.*"):
+        sp.SignalProcessor(
+            operations=[sp.complex_conjugate()]
+        ).apply_operations_to_array(components, data)
+
+
+def test_compile():
+    dimension = cp.LinearDimension(
+        count=256, increment="10 Hz", coordinates_offset="-1 kHz", complex_fft=True
+    )
+    data = cp.CSDM(
+        dimensions=[dimension],
+        dependent_variables=[
+            cp.as_dependent_variable(item) for item in np.random.rand(3, 256)
+        ],
+    )
+    processor = sp.SignalProcessor(
+        operations=[
+            sp.IFFT(),
+            apo.Gaussian(FWHM="50 Hz", dv_index=[0, 2]),
+            apo.Exponential(FWHM="20 Hz"),
+            sp.FFT(),
+            sp.Scale(factor=2),
+        ]
+    )
+    plan = processor.compile(data)
+    steps = "IFFT(axis=-1) -> Multiply(Gaussian, Exponential, Scale) -> FFT(axis=-1)"
+    assert repr(plan) == f"Plan({steps})"
+
+    components = [item.components for item in data.y]
+    for fwhm, factor in [(50, 2), (70, 2), (70, 3), (50, 2)]:
+        processor.operations[1].FWHM = fwhm
+        processor.operations[4].factor = factor
+        assert processor.compile(data) is plan
+        array = plan.apply(components)
+        ref = processor.apply_operations(data.copy())
+        np.testing.assert_allclose(array, [item.components for item in ref.y])
+    assert len(plan.steps[1].cache) == 3
+
+    # the input components are not modified.
+    assert np.array_equal(components, [item.components for item in data.y])
+
+    # the adjacent transforms cancel.
+    processor.operations.insert(1, sp.FFT())
+    processor.operations.insert(2, sp.IFFT())
+    new_plan = processor.compile(data)
+    assert new_plan is not plan
+    assert repr(new_plan) == f"Plan({steps})"
+    array = new_plan.apply(components)
+    ref = processor.apply_operations(data.copy())
+    np.testing.assert_allclose(array, [item.components for item in ref.y])
+
+    # a new plan for the new dimensions.
+    new_data = data.copy()
+    assert processor.compile(new_data) is new_plan
+    new_data.dimensions[0].coordinates_offset = "-2 kHz"
+    assert processor.compile(new_data) is not new_plan
+
+    # a pair of transforms reduces to a complex cast.
+    plan = sp.SignalProcessor(operations=[sp.IFFT(), sp.FFT()]).compile(data)
+    assert plan.steps == []
+    assert plan.apply(components).dtype == np.complex128
+    np.testing.assert_allclose(plan.apply(components), components)
+
+    with pytest.raises(NotImplementedError, match=".*does not support ndarray.*"):
+        sp.SignalProcessor(operations=[sp.complex_conjugate()]).compile(data)
+
+
+def test_apply_operations_batched():
+    dimensions = [
+        cp.LinearDimension(
+            count=n, increment="10 Hz", coordinates_offset="-1 kHz", complex_fft=True
+        )
+        for n in [33, 16]
+    ]
+    data = cp.CSDM(
+        dimensions=dimensions,
+        dependent_variables=[
+            cp.as_dependent_variable(item, name=f"{i}")
+            for i, item in enumerate(np.random.rand(50, 16, 33))
+        ],
+    )
+    data.dimensions[1].reciprocal.coordinates_offset = "1 ms"
+    processor = sp.SignalProcessor(
+        operations=[
+            sp.IFFT(dim_index=[0, 1]),
+            apo.Gaussian(FWHM="50 Hz", dim_index=[0, 1], dv_index=[1, 4]),
+            apo.Exponential(FWHM="20 Hz", dim_index=0),
+            sp.FFT(dim_index=[1, 0]),
+        ]
+    )
+
+    # the transforms along the two dimensions are merged.
+    steps = [repr(step) for step in processor.compile(data).steps]
+    transforms = [step for step in steps if "FFT" in step]
+    assert transforms == ["IFFT(axes=(-1, -2))", "FFT(axes=(-2, -1))"]
+
+    processed = processor.apply_operations(data.copy())
+    assert processor.processed_data is processed
+    ref = operate(processor, data.copy())
+    np.testing.assert_allclose(
+        [item.components for item in processed.y],
+        [item.components for item in ref.y],
+        atol=1e-12,
+    )
+    assert [item.name for item in processed.y] == [item.name for item in ref.y]
+    assert processed.dimensions == ref.dimensions
+
+    # the real-input and the complex transforms agree.
+    for operations in [[sp.IFFT(dim_index=[0, 1])], [sp.IFFT(dim_index=0)]]:
+        processor = sp.SignalProcessor(operations=operations)
+        plan = processor.compile(data)
+        components = np.array([item.components for item in data.y])
+        array = plan.apply(components)
+        assert array.dtype == np.complex128
+        np.testing.assert_allclose(array, plan.apply(components.astype(complex)))
+
+    # the dependent variables of different shapes are processed one at a time.
+    data = cp.CSDM(
+        dimensions=[dimensions[0]],
+        dependent_variables=[
+            cp.as_dependent_variable(np.random.rand(33)),
+            cp.DependentVariable(
+                type="internal",
+                quantity_type="vector_2",
+                components=np.random.rand(2, 33),
+            ),
+        ],
+    )
+    processor = sp.SignalProcessor(operations=[sp.IFFT(), apo.Gaussian(FWHM="50 Hz")])
+    processed = processor.apply_operations(data.copy())
+    ref = operate(processor, data.copy())
+    assert np.array_equal(processed.y[1].components, ref.y[1].components)
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import csdmpy as cp
 import numpy as np
 from csdmpy.units import string_to_quantity
 
@@ -20,6 +21,51 @@ def _get_broadcast_shape(array, dim, ndim):
     return array[tuple(none)]
 
 
+def _get_fft_phase(dimension, dim, ndim):
+    """Return the direction and the broadcast phase vector of the Fourier transform of
+    the linear dimension `dimension` at index `dim`, for `ndim` total dimensions. The
+    phase follows the CSDM fft method. When the direction is True, the transform is
+    an inverse FFT, otherwise a forward FFT."""
+    if not isinstance(dimension, cp.LinearDimension):
+        dimension = dimension.subtype
+    if not isinstance(dimension, cp.LinearDimension):
+        raise NotImplementedError("FFT is only supported for linear dimensions.")
+
+    unit_in = dimension._unit
+    unit_out = (1 / unit_in).unit
+    if dimension._complex_fft:
+        coordinates = dimension._coordinates.to(unit_in).value
+        offset = dimension.reciprocal._coordinates_offset.to(unit_out).value
+        phase = np.exp(2j * np.pi * offset * coordinates)
+    else:
+        coordinates = dimension._reciprocal_coordinates().to(unit_out).value
+        offset = dimension._coordinates_offset.to(unit_in).value
+        phase = np.exp(-2j * np.pi * offset * coordinates)
+    return dimension._complex_fft, _get_broadcast_shape(phase, dim, ndim)
+
+
+def _get_dimension_key(dimension) -> list:
+    """Return a key of the attributes of the CSDM dimension. The physical quantities
+    are compared by their values and unit objects, avoiding the string formatting of
+    the units within the dimension to_dict method. The coordinates, derived from the
+    remaining attributes, and the equivalencies, derived from the equivalent unit and
+    the origin offset, are not included."""
+    key = [type(dimension).__name__]
+    for cls in type(dimension).__mro__:
+        for name in getattr(cls, "__slots__", ()):
+            if name in ["_coordinates", "_equivalencies"]:
+                continue
+            value = getattr(dimension, name, None)
+            if name == "reciprocal":
+                value = _get_dimension_key(value)
+            elif hasattr(value, "unit"):
+                value = (np.asarray(value.value).tobytes(), value.unit)
+            elif isinstance(value, np.ndarray):
+                value = value.tobytes()
+            key.append(value)
+    return key
+
+
 def _str_to_quantity(v, values, prop_name):
     if isinstance(v, str):
         quantity = string_to_quantity(v)
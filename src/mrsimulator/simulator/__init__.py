@@ -1,20 +1,31 @@
 # -*- coding: utf-8 -*-
 """Base Simulator class."""
 import json
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from itertools import chain
+from operator import attrgetter
 from typing import List
+from typing import Union
 
 import csdmpy as cp
 import numpy as np
 from mrsimulator import __version__
 from mrsimulator import SpinSystem
+from mrsimulator import SpinSystemArray
 from mrsimulator.base_model import one_d_spectrum
+from mrsimulator.base_model import SimulationEngine
+from mrsimulator.base_model import SiteBasisCache
 from mrsimulator.method import Method
 from mrsimulator.utils.extra import _reduce_dict
 from mrsimulator.utils.importer import import_json
 from pydantic import BaseModel
+from pydantic import PrivateAttr
 
+from .config import __runtime_settings__
 from .config import ConfigSimulator
+from .parallel import get_n_jobs
+from .parallel import simulate_in_pool
 
 # from IPython.display import JSON
 
@@ -31,7 +42,9 @@ class Simulator(BaseModel):
 
     spin_systems: A list of :ref:`spin_sys_api` or equivalent dict objects (optional).
         The value is a list of NMR spin systems present within the sample, where each
-        spin system is an isolated system. The default value is an empty list.
+        spin system is an isolated system. The default value is an empty list. For
+        large ensembles of single-site spin systems, the value may also be a
+        :class:`~mrsimulator.SpinSystemArray` object.
 
         Example
         -------
@@ -126,10 +139,14 @@ class Simulator(BaseModel):
     name: str = None
     label: str = None
     description: str = None
-    spin_systems: List[SpinSystem] = []
+    spin_systems: Union[SpinSystemArray, List[SpinSystem]] = []
     methods: List[Method] = []
     config: ConfigSimulator = ConfigSimulator()
     indexes = []
+    _engines: dict = PrivateAttr(default_factory=dict)
+    _isotope_index: dict = PrivateAttr(default=None)
+    _isotope_index_key: tuple = PrivateAttr(default=None)
+    _contributions: dict = PrivateAttr(default_factory=dict)
 
     class Config:
         validate_assignment = True
@@ -244,6 +261,8 @@ class Simulator(BaseModel):
         {'27Al'}
         """
         st = set()
+        if isinstance(self.spin_systems, SpinSystemArray):
+            return set(self.spin_systems.get_isotopes(spin_I))
         for spin_system in self.spin_systems:
             st.update(spin_system.get_isotopes(spin_I))
         return st
@@ -321,7 +340,7 @@ class Simulator(BaseModel):
             if len(method) != 0:
                 sim["methods"] = method
 
-        sim["config"] = self.config.dict()
+        sim["config"] = self.config.dict(exclude=__runtime_settings__)
         # sim["indexes"] = self.indexes
         if include_version:
             sim["version"] = __version__
@@ -336,7 +355,10 @@ class Simulator(BaseModel):
             list exclude: A list of keys to exclude from the dictionary.
         Return: A dict.
         """
-        return _reduce_dict(self.dict(), exclude)
+        py_dict = self.dict(exclude={"config": __runtime_settings__})
+        if isinstance(self.spin_systems, SpinSystemArray):
+            py_dict["spin_systems"] = [item.dict() for item in self.spin_systems]
+        return _reduce_dict(py_dict, exclude)
 
     # def pretty(self):
     #     return JSON(self.json(include_methods=True, include_version=True))
@@ -389,7 +411,15 @@ class Simulator(BaseModel):
                 allow_nan=False,
             )
 
-    def run(self, method_index=None, pack_as_csdm=True, **kwargs):
+    def run(
+        self,
+        method_index=None,
+        pack_as_csdm=True,
+        n_jobs=1,
+        incremental=False,
+        executor="process",
+        **kwargs,
+    ):
         """Run the simulation and compute spectrum.
 
         Args:
@@ -405,38 +435,210 @@ class Simulator(BaseModel):
                 The simulations are stored as the value of the
                 :attr:`~mrsimulator.Method.simulation` attribute of the corresponding
                 method.
+            int n_jobs: The number of processes, or threads, used in the simulation.
+                A negative value is counted backwards from the number of available
+                cores, `i.e.`, -1 uses all cores. The default is 1.
+            bool incremental: If true, the spectrum of every spin system is held
+                within the simulator, and only the spin systems modified since the
+                previous incremental run are re-simulated. The simulation is updated
+                by subtracting the previous and adding the new spectra of the modified
+                spin systems. A modified abundance only rescales the held spectrum.
+                The option is useful when a few spin system parameters change between
+                runs, as in least-squares fitting. All spin systems are re-simulated
+                when the method or the config changes. The CSDM object of the
+                simulation is also held, and the new simulation is written into its
+                components in place. The option has no effect for a process executor
+                with n_jobs > 1, or a SpinSystemArray. The default is False.
+            str executor: The executor used when n_jobs > 1, either ``process`` or
+                ``thread``. With ``process``, the methods and the chunks of spin
+                systems are simulated over a pool of processes, where the processes
+                write the spectra to a shared memory. With ``thread``, the methods are
+                simulated concurrently over a pool of threads within the current
+                process, sharing the simulation engines, the site bases, and the
+                incremental spectra of the simulator. The default is ``process``.
+
+        The simulation releases the GIL, and independent Simulator objects may be run
+        concurrently from multiple threads, for example, using a
+        ``concurrent.futures.ThreadPoolExecutor``.
 
         Example
         -------
 
         >>> sim.run() # doctest:+SKIP
+        >>> sim.run(n_jobs=-1) # doctest:+SKIP
         """
 
         if method_index is None:
             method_index = np.arange(len(self.methods))
         if isinstance(method_index, int):
             method_index = [method_index]
-        for index in method_index:
-            method = self.methods[index]
-            amp, indexes = one_d_spectrum(
-                method=method,
-                spin_systems=self.spin_systems,
-                **self.config.get_int_dict(),
-                **kwargs,
+
+        if executor not in ["process", "thread"]:
+            raise ValueError(
+                f"Expecting executor to be 'process' or 'thread', found {executor}."
             )
 
+        n_jobs = get_n_jobs(n_jobs)
+        if n_jobs == 1 or executor == "thread":
+            results = self._simulate_methods(
+                method_index, n_jobs, incremental, **kwargs
+            )
+        else:
+            results = simulate_in_pool(self, method_index, n_jobs, **kwargs)
+
+        for index, (amp, indexes) in zip(method_index, results):
+            method = self.methods[index]
             self.indexes.append(indexes)
+            _set_origin_offset(method)
 
             if isinstance(amp, list):
                 simulated_data = amp
             else:
                 simulated_data = [amp]
 
-            if pack_as_csdm:
+            if pack_as_csdm and incremental and index in self._contributions:
+                method.simulation = self._update_csdm_object(simulated_data, index)
+            elif pack_as_csdm:
                 method.simulation = self._as_csdm_object(simulated_data, method)
             else:
                 method.simulation = np.asarray(simulated_data)
 
+    def _simulate_methods(self, method_index, n_jobs, incremental, **kwargs):
+        """Simulate the methods at the given indexes within the current process,
+        serially, or concurrently over a pool of n_jobs threads."""
+        self._update_isotope_index()
+        # the rotated site bases are shared among the methods with a common channel,
+        # for example, the same spin systems at multiple magnetic flux densities.
+        channels = [self.methods[i].channels[0].symbol for i in method_index]
+        cache = None
+        if len(set(channels)) < len(channels):
+            cache = SiteBasisCache()
+        simulate = self._simulate
+        if incremental and not isinstance(self.spin_systems, SpinSystemArray):
+            simulate = self._simulate_incremental
+
+        def simulate_method(index):
+            return simulate(index, basis_cache=cache, **kwargs)
+
+        if n_jobs == 1:
+            return map(simulate_method, method_index)
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            return list(pool.map(simulate_method, method_index))
+
+    def _update_isotope_index(self):
+        """Index the spin systems by the isotopes of their sites. The spin systems
+        with a site from the channel of a method are then selected from the index,
+        without a scan over the spin systems for every method. The index is rebuilt
+        only when the sites of the spin systems, or the isotope of a site, change."""
+        if isinstance(self.spin_systems, SpinSystemArray):
+            self._isotope_index = None
+            self._isotope_index_key = None
+            return
+
+        # the key holds the sites and the isotopes, which are replaced on assignment,
+        # and is compared by identity before equality.
+        sites = tuple(map(tuple, map(attrgetter("sites"), self.spin_systems)))
+        isotopes = tuple(map(attrgetter("isotope"), chain.from_iterable(sites)))
+        key = (sites, isotopes)
+        if self._isotope_index is not None and key == self._isotope_index_key:
+            return
+
+        isotope_index = {}
+        for i, spin_system in enumerate(self.spin_systems):
+            for isotope in {site.isotope.symbol for site in spin_system.sites}:
+                isotope_index.setdefault(isotope, []).append(i)
+        self._isotope_index = isotope_index
+        self._isotope_index_key = key
+
+    def _simulate(self, index, **kwargs):
+        """Simulate the method at the given index within the current process."""
+        if index not in self._engines:
+            self._engines[index] = SimulationEngine()
+        if self._isotope_index is not None:
+            channel = self.methods[index].channels[0].symbol
+            kwargs["spin_system_index"] = self._isotope_index.get(channel, [])
+        return one_d_spectrum(
+            method=self.methods[index],
+            spin_systems=self.spin_systems,
+            engine=self._engines[index],
+            **self.config.get_int_dict(),
+            **kwargs,
+        )
+
+    def _simulate_incremental(self, index, basis_cache=None, **kwargs):
+        """Simulate the method at the given index by re-simulating only the spin
+        systems modified since the previous incremental run of the method."""
+        method = self.methods[index]
+        config = {**self.config.get_int_dict(), **kwargs}
+        decompose = config.pop("decompose_spectrum") == 1
+        # the origin offsets are not used in the simulation, and are updated by run.
+        exclude = {"origin_offset"}
+        dims = [item.dict(exclude=exclude) for item in method.spectral_dimensions]
+        key = (
+            repr(method.channels),
+            repr(dims),
+            repr(method.affine_matrix),
+            sorted(config.items()),
+        )
+        revisions = [item._get_revision() for item in self.spin_systems]
+
+        channel = method.channels[0].symbol
+        indexes = self._isotope_index.get(channel, [])
+        entry = self._contributions.get(index, None)
+        if entry is None or entry["key"] != key:
+            entry = {"key": key, "revisions": [], "spectra": {}, "abundances": {}}
+            entry["sum"] = np.zeros(method.shape())
+            self._contributions[index] = entry
+
+        # the spin systems with more than two sites are not simulated. The spectra of
+        # the spin systems no longer within the channel are removed.
+        previous = entry["revisions"]
+        spectra, abundances = entry["spectra"], entry["abundances"]
+        selected = {i for i in indexes if len(self.spin_systems[i].sites) <= 2}
+        modified = {
+            i for i in selected if i >= len(previous) or previous[i] != revisions[i]
+        }
+        modified = sorted(modified.union(set(spectra.keys()) - selected))
+
+        # the spectra are held at unit abundance, and are scaled by the abundance of
+        # the respective spin system.
+        simulated = [i for i in modified if i in selected]
+        if len(simulated) != 0:
+            if index not in self._engines:
+                self._engines[index] = SimulationEngine()
+            amp, _ = one_d_spectrum(
+                method=method,
+                spin_systems=[
+                    self.spin_systems[i].copy(update={"abundance": 1.0})
+                    for i in simulated
+                ],
+                engine=self._engines[index],
+                basis_cache=basis_cache,
+                decompose_spectrum=1,
+                **config,
+            )
+
+        # update the sum of the spectra by the difference of the modified spectra.
+        for i in modified:
+            if i in spectra:
+                entry["sum"] -= abundances.pop(i) * spectra.pop(i)
+        if len(simulated) != 0:
+            for i, item in zip(simulated, amp):
+                spectra[i] = item
+                abundances[i] = self.spin_systems[i].abundance
+                entry["sum"] += abundances[i] * item
+        for i in spectra.keys():
+            abundance = self.spin_systems[i].abundance
+            if abundance != abundances[i]:
+                entry["sum"] += (abundance - abundances[i]) * spectra[i]
+                abundances[i] = abundance
+        entry["revisions"] = revisions
+
+        if not decompose:
+            return entry["sum"].copy(), indexes
+        amp = [abundances[i] * spectra[i] for i in indexes if i in spectra]
+        return (amp if len(amp) != 0 else np.zeros(method.shape())), indexes
+
     # """The frequency is in the units of Hz."""
     # gamma = method.isotope.gyromagnetic_ratio
     # B0 = method.spectral_dimensions[0].events[0].magnetic_flux_density
@@ -541,6 +743,28 @@ class Simulator(BaseModel):
             new.dependent_variables[-1].encoding = "base64"
         return new
 
+    def _update_csdm_object(self, data: list, index: int) -> cp.CSDM:
+        """Write the simulation data of the method at `index` into the components of
+        the CSDM object from the previous incremental run, when the object is still
+        the simulation of the method, with the same number of dependent variables.
+        Otherwise, a new CSDM object is created.
+
+        Return:
+            A CSDM object.
+        """
+        method = self.methods[index]
+        entry = self._contributions[index]
+        csdm = entry.get("csdm", None)
+        data_ = [datum for datum in data if len(datum) != 0]
+        reusable = csdm is not None and csdm is method.simulation
+        if not reusable or len(csdm.dependent_variables) != len(data_):
+            entry["csdm"] = self._as_csdm_object(data, method)
+            return entry["csdm"]
+
+        for dv, datum in zip(csdm.dependent_variables, data_):
+            dv.components[0] = datum
+        return csdm
+
     def _update_name_description_application(self, obj, index):
         """Update the name and description of the dependent variable attributes
         using fields from the spin system."""
@@ -561,3 +785,12 @@ class Simulator(BaseModel):
                 "spin_systems": [self.spin_systems[index].json()]
             }
         }
+
+
+def _set_origin_offset(method):
+    """Set the origin offset of every spectral dimension of the method to the larmor
+    frequency of the observed channel at the first event."""
+    B0 = method.spectral_dimensions[0].events[0].magnetic_flux_density
+    gamma = method.channels[0].gyromagnetic_ratio
+    for seq in method.spectral_dimensions:
+        seq.origin_offset = np.abs(B0 * gamma * 1e6)
@@ -15,6 +15,15 @@ __decompose_spectrum_enum__ = {"none": 0, "spin_system": 1}
 __integration_volume_enum__ = {"octant": 0, "hemisphere": 1}
 __integration_volume_octants__ = [1, 4]
 
+# fftw planner flags
+__fftw_planner_enum__ = {"estimate": 1 << 6, "measure": 0, "patient": 1 << 5}
+
+# floating point precision of the sideband computation
+__precision_enum__ = {"double": 0, "single": 1}
+
+# machine-specific runtime settings, which are not serialized
+__runtime_settings__ = {"n_threads", "fftw_planner", "fftw_threads", "precision"}
+
 
 class ConfigSimulator(BaseModel):
     r"""
@@ -57,6 +66,44 @@ class ConfigSimulator(BaseModel):
           is an array of spectra, where each spectrum arises from a spin system within
           the Simulator object.
 
+    n_threads: int (optional).
+        The value is the number of threads used in distributing the simulation of the
+        spin systems. Every thread holds a private copy of the scratch buffers and the
+        spectrum, which are summed in a fixed order at the end of the simulation.
+        The value cannot be zero or negative. The default value is 1.
+
+    fftw_planner: enum (optional).
+        The rigor of the fftw planner used in planning the sideband fft. The valid
+        literals of this enumeration are
+
+        - ``estimate`` (default): A heuristic plan with no planning overhead.
+        - ``measure``: The plan is selected by timing several fft algorithms.
+        - ``patient``: Same as ``measure`` over a wider range of algorithms.
+
+        The rigorous plans are faster at the expense of a one-time planning overhead.
+        The wisdom of the rigorous planners is cached on disk in a single file, such
+        that the subsequent simulations, including those from a new session, re-use
+        the plans.
+
+    fftw_threads: int (optional).
+        The number of threads used within the sideband fft plans. The option is only
+        available when mrsimulator is compiled with the fftw threads library, and is
+        useful when the simulation is not distributed over multiple threads, that is,
+        when `n_threads` is 1. The default value is 1.
+
+    precision: enum (optional).
+        The floating point precision of the sideband amplitude computation. The valid
+        literals of this enumeration are
+
+        - ``double`` (default): The sideband amplitudes are evaluated in float64.
+        - ``single``: The sideband phases, their exponential, and the sideband fft
+          are evaluated in float32. The spectrum is accumulated in float64.
+
+        The single precision mode halves the size of the sideband buffers and is
+        faster when the simulation is dominated by the sideband computation, that is,
+        at large integration densities and number of sidebands. The option has no
+        effect on the static simulations.
+
     Example
     -------
 
@@ -65,12 +112,19 @@ class ConfigSimulator(BaseModel):
     >>> a.config.integration_density = 96
     >>> a.config.integration_volume = 'hemisphere'
     >>> a.config.decompose_spectrum = 'spin_system'
+    >>> a.config.n_threads = 4
+    >>> a.config.fftw_planner = 'measure'
+    >>> a.config.precision = 'single'
     """
 
     number_of_sidebands: int = Field(default=64, gt=0)
     integration_volume: Literal["octant", "hemisphere"] = "octant"
     integration_density: int = Field(default=70, gt=0)
     decompose_spectrum: Literal["none", "spin_system"] = "none"
+    n_threads: int = Field(default=1, gt=0)
+    fftw_planner: Literal["estimate", "measure", "patient"] = "estimate"
+    fftw_threads: int = Field(default=1, gt=0)
+    precision: Literal["double", "single"] = "double"
 
     class Config:
         validate_assignment = True
@@ -83,6 +137,8 @@ class ConfigSimulator(BaseModel):
         py_dict["decompose_spectrum"] = __decompose_spectrum_enum__[
             self.decompose_spectrum
         ]
+        py_dict["fftw_planner"] = __fftw_planner_enum__[self.fftw_planner]
+        py_dict["precision"] = __precision_enum__[self.precision]
         return py_dict
 
     # averaging scheme. This contains the c pointer used in frequency evaluation
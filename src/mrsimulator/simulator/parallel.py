@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""Process-pool execution of the simulation over methods and spin system chunks."""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from mrsimulator.base_model import one_d_spectrum
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def get_n_jobs(n_jobs: int) -> int:
+    """Return the number of jobs. A negative value of `n_jobs` is counted backwards
+    from the number of available cores, that is, -1 uses all cores."""
+    if n_jobs < 0:
+        n_jobs = os.cpu_count() + 1 + n_jobs
+    return max(n_jobs, 1)
+
+
+def _simulate_chunk(task):
+    """Simulate a chunk of spin systems from a method within a worker process and
+    write the spectrum into the shared memory buffer. Only the spin system indexes are
+    returned to the parent process."""
+    from multiprocessing import shared_memory
+
+    method, spin_systems, start, slot, shm_name, shape, kwargs = task
+    amp, indexes = one_d_spectrum(method=method, spin_systems=spin_systems, **kwargs)
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    buffer = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+    # a decomposed simulation contains an empty list for the spin systems without sites.
+    empty = []
+    n_spectra = 0
+    if isinstance(amp, list):
+        n_spectra = len(amp)
+        for i, item in enumerate(amp):
+            if len(item) == 0:
+                empty.append(i)
+            else:
+                buffer[slot + i] = item
+    elif kwargs["decompose_spectrum"] == 0:
+        buffer[slot] = amp
+
+    del buffer
+    shm.close()
+    return [start + i for i in indexes], n_spectra, empty
+
+
+def simulate_in_pool(simulator, method_index: list, n_jobs: int, **kwargs) -> list:
+    """Simulate the methods at the given indexes using a pool of `n_jobs` processes.
+
+    The spin systems are split into `n_jobs` chunks, and every (method, chunk) pair is
+    simulated as an independent task. The workers write the spectra into a
+    ``multiprocessing.shared_memory`` buffer, one per method, such that no spectrum is
+    pickled back to the parent process. Without decomposition, every chunk writes into
+    its own slot of the buffer and the slots are co-added in the order of the chunks.
+
+    Args:
+        simulator: The Simulator object.
+        method_index: A list of method indexes.
+        n_jobs: The number of processes.
+        kwargs: Additional keyword arguments passed to ``one_d_spectrum``.
+
+    Returns:
+        A list of (amplitude, indexes) tuple, one for each method index.
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:  # pragma: no cover
+        raise ImportError("Simulations with n_jobs > 1 require python 3.8 or later.")
+
+    config = {**simulator.config.get_int_dict(), **kwargs}
+    decompose = config["decompose_spectrum"] == 1
+    spin_systems = simulator.spin_systems
+    n_sys = len(spin_systems)
+    bounds = np.linspace(0, n_sys, min(n_jobs, max(n_sys, 1)) + 1).astype(int)
+    chunks = [(a, b) for a, b in zip(bounds[:-1], bounds[1:])]
+
+    buffers, tasks = [], []
+    for index in method_index:
+        method = simulator.methods[index]
+        shape = (n_sys if decompose else len(chunks), *method.shape())
+        size = max(int(np.prod(shape)) * 8, 8)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        buffers.append((shm, shape))
+
+        # the previous simulation and the experiment are not required by the workers.
+        method_copy = method.copy(update={"simulation": None, "experiment": None})
+        for i, (a, b) in enumerate(chunks):
+            slot = a if decompose else i
+            task = (method_copy, spin_systems[a:b], a, slot, shm.name, shape)
+            tasks.append((*task, config))
+
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_simulate_chunk, tasks))
+
+        output = []
+        for j, index in enumerate(method_index):
+            shm, shape = buffers[j]
+            buffer = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            start, end = j * len(chunks), (j + 1) * len(chunks)
+            chunk_results = results[start:end]
+
+            indexes = []
+            for item in chunk_results:
+                indexes += item[0]
+
+            if decompose:
+                amp = []
+                for (a, _), (_, n_spectra, empty) in zip(chunks, chunk_results):
+                    amp += [
+                        [] if i in empty else buffer[a + i].copy()
+                        for i in range(n_spectra)
+                    ]
+                if len(amp) == 0:
+                    amp = np.zeros(shape[1:])
+            else:
+                amp = buffer[0].copy()
+                for i in range(1, len(chunks)):
+                    amp += buffer[i]
+
+            del buffer
+            output.append((amp, indexes))
+    finally:
+        for shm, _ in buffers:
+            shm.close()
+            shm.unlink()
+
+    return output
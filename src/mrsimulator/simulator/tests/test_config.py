@@ -2,6 +2,7 @@
 """Test for the base ConfigSimulator class."""
 import pytest
 from mrsimulator import Simulator
+from mrsimulator.simulator.config import ConfigSimulator
 
 __author__ = "Deepansh Srivastava"
 __email__ = "srivastava.89@osu.edu"
@@ -70,6 +71,10 @@ def test_config():
         "number_of_sidebands": 10,
         "integration_volume": "hemisphere",
         "integration_density": 20,
+        "n_threads": 1,
+        "fftw_planner": "estimate",
+        "fftw_threads": 1,
+        "precision": "double",
     }
 
     assert a.config.get_int_dict() == {
@@ -77,9 +82,24 @@ def test_config():
         "number_of_sidebands": 10,
         "integration_volume": 1,
         "integration_density": 20,
+        "n_threads": 1,
+        "fftw_planner": 64,
+        "fftw_threads": 1,
+        "precision": 0,
     }
 
     assert b != a
 
+    # the runtime settings are not serialized.
+    a.config.n_threads = 4
+    a.config.precision = "single"
+    assert "n_threads" not in a.json()["config"]
+    assert "precision" not in a.reduced_dict()["config"]
+    assert a.config.get_int_dict()["n_threads"] == 4
+
+    # the runtime settings still take part in the comparison.
+    assert ConfigSimulator(precision="single") != ConfigSimulator()
+    assert ConfigSimulator(n_threads=8) != ConfigSimulator()
+
     # get orientation count
     assert a.config.get_orientations_count() == 4 * 21 * 22 / 2
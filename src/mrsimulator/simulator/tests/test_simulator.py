@@ -1,13 +1,21 @@
 # -*- coding: utf-8 -*-
 """Test for the base Simulator class."""
+from concurrent.futures import ThreadPoolExecutor
 from random import randint
 
+import numpy as np
 import pytest
+from mrsimulator import base_model
 from mrsimulator import Simulator
 from mrsimulator import Site
 from mrsimulator import SpinSystem
 from mrsimulator.method.frequency_contrib import freq_default
+from mrsimulator.methods import BlochDecayCentralTransitionSpectrum
 from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.methods import Method1D
+from mrsimulator.methods import Method2D
+from mrsimulator.methods import ThreeQ_VAS
+from mrsimulator.utils.collection import single_site_system_generator
 
 __author__ = "Deepansh Srivastava"
 __email__ = "srivastava.89@osu.edu"
@@ -152,3 +160,610 @@ def test_simulator_1():
     sim.save("test_sim_save_no_unit.temp", with_units=False)
     sim_load = sim.load("test_sim_save_no_unit.temp", parse_units=False)
     assert sim_load == sim
+
+
+def test_engine_reuse():
+    site = Site(
+        isotope="27Al",
+        isotropic_chemical_shift=10,
+        shielding_symmetric={"zeta": 20, "eta": 0.3},
+        quadrupolar={"Cq": 3.1e6, "eta": 0.2},
+    )
+    sys = SpinSystem(sites=[site])
+    method = BlochDecaySpectrum(
+        channels=["27Al"],
+        rotor_frequency=5000,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 1e5}],
+    )
+    sim = Simulator(spin_systems=[sys], methods=[method])
+    sim.run()
+    first = sim.methods[0].simulation.y[0].components[0].copy()
+
+    # repeated runs re-use the engine and give identical results.
+    sim.run()
+    assert np.array_equal(sim.methods[0].simulation.y[0].components[0], first)
+
+    def fresh_run(sim):
+        sim_new = Simulator(
+            spin_systems=sim.spin_systems, methods=sim.methods, config=sim.config
+        )
+        sim_new.run()
+        return sim_new.methods[0].simulation.y[0].components[0]
+
+    # changing the config, method, or magnetic flux density invalidates the engine.
+    sim.config.integration_density = 50
+    sim.run()
+    data = sim.methods[0].simulation.y[0].components[0]
+    np.testing.assert_allclose(data, fresh_run(sim))
+
+    sim.methods[0].spectral_dimensions[0].events[0].rotor_frequency = 1000
+    sim.methods[0].spectral_dimensions[0].reference_offset = 1000
+    sim.run()
+    data = sim.methods[0].simulation.y[0].components[0]
+    np.testing.assert_allclose(data, fresh_run(sim))
+
+    sim.methods[0].spectral_dimensions[0].events[0].magnetic_flux_density = 4.7
+    sim.run()
+    data = sim.methods[0].simulation.y[0].components[0]
+    np.testing.assert_allclose(data, fresh_run(sim))
+
+
+def test_n_threads():
+    method = BlochDecaySpectrum(
+        channels=["27Al"],
+        rotor_frequency=2000,
+        spectral_dimensions=[{"count": 512, "spectral_width": 5e4}],
+    )
+    spin_systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="27Al",
+                    isotropic_chemical_shift=randint(-20, 20),
+                    quadrupolar={
+                        "Cq": randint(1, 30) * 1e5,
+                        "eta": 0.1 * randint(0, 9),
+                    },
+                )
+            ],
+            abundance=randint(1, 100),
+        )
+        for _ in range(13)
+    ]
+    spin_systems += [SpinSystem(sites=[Site(isotope="1H")])]
+
+    def simulate(n_threads, decompose="none"):
+        sim = Simulator(spin_systems=spin_systems, methods=[method])
+        sim.config.n_threads = n_threads
+        sim.config.decompose_spectrum = decompose
+        sim.run()
+        return np.asarray([item.components[0] for item in sim.methods[0].simulation.y])
+
+    serial = simulate(1)
+    np.testing.assert_allclose(simulate(4), serial, atol=1e-12 * serial.max())
+    assert np.array_equal(simulate(4), simulate(4))
+
+    serial = simulate(1, "spin_system")
+    assert serial.shape == (13, 512)
+    assert np.array_equal(simulate(3, "spin_system"), serial)
+
+
+def test_n_jobs():
+    spin_systems = [
+        SpinSystem(
+            sites=[
+                Site(
+                    isotope="27Al",
+                    isotropic_chemical_shift=randint(-20, 20),
+                    quadrupolar={
+                        "Cq": randint(1, 30) * 1e5,
+                        "eta": 0.1 * randint(0, 9),
+                    },
+                )
+            ],
+            abundance=randint(1, 100),
+        )
+        for _ in range(9)
+    ]
+    spin_systems.insert(3, SpinSystem(sites=[Site(isotope="1H")]))
+    methods = [
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=freq,
+            spectral_dimensions=[{"count": 512, "spectral_width": 5e4}],
+        )
+        for freq in [0, 2000]
+    ]
+    sim = Simulator(spin_systems=spin_systems, methods=methods)
+
+    for decompose in ["none", "spin_system"]:
+        sim.config.decompose_spectrum = decompose
+        sim.run()
+        serial = [method.simulation.copy() for method in sim.methods]
+        for executor in ["process", "thread"]:
+            sim.indexes = []
+            sim.run(n_jobs=3, executor=executor)
+            assert sim.indexes[0] == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+            for csdm_serial, method in zip(serial, sim.methods):
+                assert len(csdm_serial.y) == len(method.simulation.y)
+                for dv_serial, dv in zip(csdm_serial.y, method.simulation.y):
+                    np.testing.assert_allclose(dv.components, dv_serial.components)
+
+    error = "Expecting executor to be 'process' or 'thread'"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        sim.run(n_jobs=2, executor="mpi")
+
+
+def test_fftw_planner(tmp_path, monkeypatch):
+    monkeypatch.setattr(base_model, "FFTW_WISDOM_DIR", str(tmp_path))
+    site = Site(isotope="27Al", quadrupolar={"Cq": 3.1e6, "eta": 0.2})
+    method = BlochDecaySpectrum(
+        channels=["27Al"],
+        rotor_frequency=5000,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 1e5}],
+    )
+    sim = Simulator(spin_systems=[SpinSystem(sites=[site])], methods=[method])
+    sim.config.number_of_sidebands = 16
+    sim.config.integration_density = 20
+    sim.run()
+    estimate = sim.methods[0].simulation.y[0].components[0]
+
+    for planner in ["measure", "patient"]:
+        sim.config.fftw_planner = planner
+        sim.run()
+        data = sim.methods[0].simulation.y[0].components[0]
+        np.testing.assert_allclose(data, estimate, atol=1e-10 * estimate.max())
+
+    sim.config.fftw_threads = 2
+    sim.run()
+    data = sim.methods[0].simulation.y[0].components[0]
+    np.testing.assert_allclose(data, estimate, atol=1e-10 * estimate.max())
+
+    # the wisdom of the rigorous planners is cached in a single file.
+    filename = str(tmp_path / "mrsimulator.wisdom")
+    assert base_model.export_fftw_wisdom() == [filename]
+    assert base_model.export_fftw_wisdom() == []
+    assert base_model.import_fftw_wisdom()
+    assert not base_model.import_fftw_wisdom(str(tmp_path / "empty"))
+
+
+def test_single_precision(tmp_path, monkeypatch):
+    monkeypatch.setattr(base_model, "FFTW_WISDOM_DIR", str(tmp_path))
+    site = Site(
+        isotope="27Al",
+        shielding_symmetric={"zeta": 50, "eta": 0.5},
+        quadrupolar={"Cq": 3.1e6, "eta": 0.2},
+    )
+    method = BlochDecaySpectrum(
+        channels=["27Al"],
+        rotor_frequency=5000,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 1e5}],
+    )
+    sim = Simulator(spin_systems=[SpinSystem(sites=[site])], methods=[method])
+    sim.config.number_of_sidebands = 16
+    sim.config.integration_density = 20
+    sim.config.decompose_spectrum = "spin_system"
+    sim.run()
+    double = sim.methods[0].simulation.y[0].components[0]
+
+    sim.config.precision = "single"
+    sim.config.fftw_planner = "measure"
+    sim.run()
+    single = sim.methods[0].simulation.y[0].components[0]
+    assert single.dtype == np.float64
+    np.testing.assert_allclose(single, double, atol=1e-5 * double.max())
+
+    # the single precision wisdom is cached in a separate file.
+    filename = str(tmp_path / "mrsimulator_single.wisdom")
+    assert filename in base_model.export_fftw_wisdom()
+    assert base_model.import_fftw_wisdom(single_precision=True)
+
+
+def test_isotropic_shift_groups():
+    # spin systems differing only in the isotropic chemical shift are simulated from a
+    # single evaluation of the anisotropic frequencies and amplitudes.
+    spin_systems = single_site_system_generator(
+        isotopes="87Rb",
+        isotropic_chemical_shifts=np.random.normal(-10, 15, 12),
+        shielding_symmetric={"zeta": 20, "eta": 0.3},
+        quadrupolar={"Cq": [2e6] * 6 + [3e6] * 6, "eta": 0.4, "beta": 0.5},
+        abundance=np.random.rand(12),
+        rtol=0,
+    )
+    spin_systems += [
+        SpinSystem(
+            sites=[Site(isotope="87Rb", isotropic_chemical_shift=2 * i)],
+            abundance=i + 1,
+        )
+        for i in range(3)
+    ]
+    methods = [
+        BlochDecaySpectrum(
+            channels=["87Rb"],
+            rotor_frequency=5000,
+            spectral_dimensions=[{"count": 1024, "spectral_width": 2e5}],
+        ),
+        ThreeQ_VAS(
+            channels=["87Rb"],
+            spectral_dimensions=[
+                {"count": 64, "spectral_width": 5e3},
+                {"count": 128, "spectral_width": 2e4},
+            ],
+        ),
+    ]
+
+    def simulate(systems, decompose="none", n_threads=1):
+        sim = Simulator(spin_systems=systems, methods=methods)
+        sim.config.decompose_spectrum = decompose
+        sim.config.n_threads = n_threads
+        sim.config.integration_density = 20
+        sim.run()
+        return [
+            np.asarray([dv.components[0] for dv in method.simulation.y])
+            for method in sim.methods
+        ]
+
+    # the reference is simulated one spin system at a time.
+    reference = [simulate([sys], "spin_system") for sys in spin_systems]
+    reference = [np.concatenate(item) for item in zip(*reference)]
+
+    for n_threads in [1, 4]:
+        grouped = simulate(spin_systems, "spin_system", n_threads)
+        for data, ref in zip(grouped, reference):
+            np.testing.assert_allclose(data, ref, atol=1e-12 * ref.max())
+
+        grouped = simulate(spin_systems, n_threads=n_threads)
+        for data, ref in zip(grouped, reference):
+            ref = ref.sum(axis=0)
+            np.testing.assert_allclose(data[0], ref, atol=1e-12 * ref.max())
+
+
+def test_thread_pool():
+    def get_sim(i):
+        site = Site(isotope="27Al", isotropic_chemical_shift=i, quadrupolar={"Cq": 3e6})
+        method = BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=1000 * (i + 1),
+            spectral_dimensions=[{"count": 512, "spectral_width": 5e4}],
+        )
+        sim = Simulator(spin_systems=[SpinSystem(sites=[site])], methods=[method])
+        sim.config.integration_density = 30
+        return sim
+
+    def simulate(sim):
+        sim.run()
+        return sim.methods[0].simulation.y[0].components[0]
+
+    # one_d_spectrum does not modify the method.
+    sim = get_sim(0)
+    base_model.one_d_spectrum(sim.methods[0], sim.spin_systems)
+    assert sim.methods[0].spectral_dimensions[0].origin_offset is None
+
+    serial = [simulate(get_sim(i)) for i in range(6)]
+    sims = [get_sim(i) for i in range(6)]
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        threaded = list(executor.map(simulate, sims))
+
+    for data, ref in zip(threaded, serial):
+        np.testing.assert_allclose(data, ref)
+
+    larmor = sims[0].methods[0].spectral_dimensions[0].origin_offset
+    np.testing.assert_almost_equal(larmor, 9.4 * 11.10308e6, decimal=-2)
+
+
+def test_spectral_window_culling():
+    # the octants outside the spectral window are skipped. A narrow window on the
+    # grid of a wide window must reproduce the respective region of the wide spectrum,
+    # except for a few points at the edges from the sidebands centered outside.
+    site = Site(
+        isotope="27Al",
+        isotropic_chemical_shift=10,
+        shielding_symmetric={"zeta": 40, "eta": 0.3},
+        quadrupolar={"Cq": 3e6, "eta": 0.4},
+    )
+
+    def simulate(method):
+        sim = Simulator(spin_systems=[SpinSystem(sites=[site])], methods=[method])
+        sim.config.integration_density = 40
+        sim.run()
+        return sim.methods[0].simulation.y[0].components[0].real
+
+    def dimension(count, offset, increment):
+        return {
+            "count": count,
+            "spectral_width": count * increment,
+            "reference_offset": offset * increment,
+        }
+
+    wide = simulate(
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=2000,
+            spectral_dimensions=[dimension(1024, 0, 100)],
+        )
+    )
+    narrow = simulate(
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            rotor_frequency=2000,
+            spectral_dimensions=[dimension(128, 64, 100)],
+        )
+    )
+    start, end = 512, 512 + 128
+    ref = wide[start:end]
+    np.testing.assert_allclose(narrow[8:-8], ref[8:-8], atol=1e-12 * ref.max())
+
+    wide = simulate(
+        ThreeQ_VAS(
+            channels=["27Al"],
+            spectral_dimensions=[dimension(256, 0, 50), dimension(256, 0, 50)],
+        )
+    )
+    narrow = simulate(
+        ThreeQ_VAS(
+            channels=["27Al"],
+            spectral_dimensions=[dimension(64, 8, 50), dimension(64, -16, 50)],
+        )
+    )
+    ref = wide[104:168, 80:144]
+    assert ref.max() > 0
+    np.testing.assert_allclose(narrow, ref, atol=1e-12 * ref.max())
+
+    # the sideband pairs outside the window of a sheared spinning 2D spectrum.
+    site = Site(
+        isotope="13C",
+        isotropic_chemical_shift=10,
+        shielding_symmetric={"zeta": 80, "eta": 0.3},
+    )
+    query = {"P": {"channel-1": [[-1]]}}
+    events = [{"fraction": 1, "rotor_frequency": 1000, "transition_query": query}]
+
+    def sheared(dim0, dim1):
+        return Method2D(
+            channels=["13C"],
+            spectral_dimensions=[
+                {**dim0, "events": events},
+                {**dim1, "events": events},
+            ],
+            affine_matrix=[1, -0.5, 0.3, 1],
+        )
+
+    wide = simulate(sheared(dimension(256, 0, 100), dimension(256, 0, 100)))
+    narrow = simulate(sheared(dimension(64, 8, 100), dimension(64, -16, 100)))
+    ref = wide[104:168, 80:144]
+    assert ref.max() > 0
+    np.testing.assert_allclose(narrow, ref, atol=1e-12 * ref.max())
+
+
+def test_transition_basis():
+    # the frequencies of the transitions from a single-site spin system are evaluated
+    # from the rotated site bases. The reference is a two-site spin system with an
+    # uncoupled 1H site, simulated with a rotation per transition. The 1H site doubles
+    # the number of transition pathways per event.
+    site = Site(
+        isotope="93Nb",
+        isotropic_chemical_shift=-20,
+        shielding_symmetric={"zeta": 50, "eta": 0.2, "alpha": 0.5, "beta": 1.0},
+        quadrupolar={"Cq": 2e6, "eta": 0.4, "beta": 0.5, "gamma": 0.3},
+    )
+    dim = {"count": 1024, "spectral_width": 4e5}
+    events = [
+        {"fraction": 0.5, "freq_contrib": ["Shielding1_2", "Quad2_4"]},
+        {"fraction": 0.5, "magnetic_flux_density": 21.1, "rotor_angle": 0.3},
+    ]
+    methods = [
+        BlochDecaySpectrum(channels=["93Nb"], spectral_dimensions=[dim]),
+        BlochDecaySpectrum(
+            channels=["93Nb"], rotor_frequency=1e4, spectral_dimensions=[dim]
+        ),
+        Method1D(channels=["93Nb"], spectral_dimensions=[{**dim, "events": events}]),
+        ThreeQ_VAS(
+            channels=["93Nb"],
+            spectral_dimensions=[
+                {"count": 128, "spectral_width": 2e4},
+                {"count": 128, "spectral_width": 4e4},
+            ],
+        ),
+    ]
+
+    def simulate(sys):
+        sim = Simulator(spin_systems=[sys], methods=methods)
+        sim.config.integration_density = 30
+        sim.run()
+        return [mth.simulation.y[0].components[0].real for mth in sim.methods]
+
+    data = simulate(SpinSystem(sites=[site]))
+    ref = simulate(SpinSystem(sites=[site, Site(isotope="1H")]))
+    for item, ref_item, n_events in zip(data, ref, [1, 1, 2, 2]):
+        ref_item /= 2 ** n_events
+        np.testing.assert_allclose(item, ref_item, atol=1e-12 * ref_item.max())
+
+
+def test_site_basis_cache():
+    # the rotated site bases are shared among the methods at different fields.
+    spin_systems = single_site_system_generator(
+        isotopes="27Al",
+        isotropic_chemical_shifts=[10, 20, 30],
+        shielding_symmetric={"zeta": 30, "eta": 0.3},
+        quadrupolar={"Cq": [3e6, 3e6, 4e6], "eta": 0.4, "beta": 0.5},
+        rtol=0,
+    )
+    methods = [
+        BlochDecayCentralTransitionSpectrum(
+            channels=["27Al"],
+            magnetic_flux_density=B0,
+            spectral_dimensions=[{"count": 512, "spectral_width": 1e5}],
+        )
+        for B0 in [9.4, 14.1]
+    ] + [
+        BlochDecaySpectrum(
+            channels=["27Al"],
+            magnetic_flux_density=21.1,
+            rotor_frequency=1e4,
+            spectral_dimensions=[{"count": 512, "spectral_width": 4e5}],
+        )
+    ]
+    kwargs = {"integration_density": 30}
+    reference = [
+        base_model.one_d_spectrum(mth, spin_systems, **kwargs)[0] for mth in methods
+    ]
+
+    cache = base_model.SiteBasisCache()
+    for mth, ref in zip(methods, reference):
+        data, _ = base_model.one_d_spectrum(
+            mth, spin_systems, basis_cache=cache, **kwargs
+        )
+        np.testing.assert_allclose(data, ref, atol=1e-12 * ref.max())
+        # the first two spin systems differ in the isotropic shift and share a basis.
+        assert len(cache) == 2
+
+    # no bases are stored beyond the memory budget.
+    cache = base_model.SiteBasisCache(max_bytes=0)
+    data, _ = base_model.one_d_spectrum(
+        methods[0], spin_systems, basis_cache=cache, **kwargs
+    )
+    assert len(cache) == 0
+    np.testing.assert_allclose(data, reference[0])
+
+    # the simulator shares a cache among the methods with a common channel.
+    sim = Simulator(spin_systems=spin_systems, methods=methods)
+    sim.config.integration_density = 30
+    reference = []
+    for i in range(3):
+        sim.run(method_index=i)
+        reference.append(sim.methods[i].simulation.y[0].components[0])
+    sim.run()
+    for mth, ref in zip(sim.methods, reference):
+        data = mth.simulation.y[0].components[0]
+        np.testing.assert_allclose(data, ref, atol=1e-12 * ref.max())
+
+
+def test_pathway_table_and_isotope_index():
+    # the transition pathways are shared among the spin systems with the same ordered
+    # isotopes, and the spin systems are selected from the isotope index.
+    site_C = Site(isotope="13C", shielding_symmetric={"zeta": 50, "eta": 0.2})
+    site_H = Site(isotope="1H", isotropic_chemical_shift=3)
+    spin_systems = [
+        SpinSystem(sites=[site_C]),
+        SpinSystem(sites=[site_H]),
+        SpinSystem(sites=[site_C, site_H]),
+        SpinSystem(sites=[site_H, site_C]),
+        SpinSystem(sites=[site_C, site_H]),
+    ]
+    methods = [
+        BlochDecaySpectrum(
+            channels=[isotope],
+            spectral_dimensions=[{"count": 256, "spectral_width": 2e4}],
+        )
+        for isotope in ["13C", "1H", "29Si"]
+    ]
+    sim = Simulator(spin_systems=spin_systems, methods=methods)
+    sim.config.decompose_spectrum = "spin_system"
+    sim.config.integration_density = 20
+    sim.run()
+
+    assert sim._isotope_index == {"13C": [0, 2, 3, 4], "1H": [1, 2, 3, 4]}
+    assert sim.indexes == [[0, 2, 3, 4], [1, 2, 3, 4], []]
+    assert set(sim.methods[0]._pathway_table.keys()) == {
+        ("13C",),
+        ("13C", "1H"),
+        ("1H", "13C"),
+    }
+
+    # the uncoupled 1H site contributes two pathways of equal frequencies.
+    spectra = [item.components[0] for item in sim.methods[0].simulation.y]
+    for data in spectra[1:]:
+        np.testing.assert_allclose(data, 2 * spectra[0], atol=1e-12 * data.max())
+
+    # the index is rebuilt only when the sites, or the isotope of a site, change.
+    index = sim._isotope_index
+    sim.spin_systems[0].sites[0].isotropic_chemical_shift = 5
+    sim._update_isotope_index()
+    assert sim._isotope_index is index
+    sim.spin_systems[1].sites = [Site(isotope="29Si")]
+    sim._update_isotope_index()
+    assert sim._isotope_index == {"13C": [0, 2, 3, 4], "1H": [2, 3, 4], "29Si": [1]}
+    sim.spin_systems[1].sites[0].isotope = "1H"
+    sim.spin_systems.append(SpinSystem(sites=[Site(isotope="29Si")]))
+    sim._update_isotope_index()
+    assert sim._isotope_index == {"13C": [0, 2, 3, 4], "1H": [1, 2, 3, 4], "29Si": [5]}
+
+
+def test_incremental_run():
+    spin_systems = single_site_system_generator(
+        isotopes=["27Al"] * 5 + ["17O"],
+        isotropic_chemical_shifts=np.arange(6),
+        quadrupolar={"Cq": np.linspace(2e6, 4e6, 6), "eta": 0.3},
+        rtol=0,
+    )
+    method = BlochDecayCentralTransitionSpectrum(
+        channels=["27Al"],
+        rotor_frequency=1e4,
+        spectral_dimensions=[{"count": 512, "spectral_width": 5e4}],
+    )
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_density = 20
+
+    def check(decompose="none"):
+        sim.config.decompose_spectrum = decompose
+        sim.run(incremental=True)
+        data = [item.components[0] for item in sim.methods[0].simulation.y]
+        sim.run()
+        ref = [item.components[0] for item in sim.methods[0].simulation.y]
+        assert len(data) == len(ref)
+        for item, ref_item in zip(data, ref):
+            np.testing.assert_allclose(item, ref_item, atol=1e-12 * ref_item.max())
+
+    check()
+    spectra = dict(sim._contributions[0]["spectra"])
+    assert sorted(spectra.keys()) == [0, 1, 2, 3, 4]
+
+    # only the modified spin systems are re-simulated. The abundances only rescale the
+    # spectra held at unit abundance.
+    sim.spin_systems[1].sites[0].quadrupolar.Cq = 3.3e6
+    sim.spin_systems[2].sites[0].isotropic_chemical_shift = 2  # unchanged value
+    sim.spin_systems[3].abundance = 50
+    sim.spin_systems[4].abundance = 0
+    check()
+    new_spectra = sim._contributions[0]["spectra"]
+    assert [new_spectra[i] is spectra[i] for i in range(5)] == [
+        True,
+        False,
+        True,
+        True,
+        True,
+    ]
+    sim.spin_systems[4].abundance = 20
+    check()
+
+    # spin systems moved out of or into the channel.
+    sim.spin_systems[0].sites[0].isotope = "17O"
+    sim.spin_systems[5].sites[0].isotope = "27Al"
+    check()
+    assert sorted(sim._contributions[0]["spectra"].keys()) == [1, 2, 3, 4, 5]
+
+    # spin systems replaced by the copies with updated values.
+    site = sim.spin_systems[1].sites[0]
+    sim.spin_systems[1] = sim.spin_systems[1].copy(
+        update={"sites": [site.copy(update={"isotropic_chemical_shift": 30})]}
+    )
+    sim.spin_systems[2] = sim.spin_systems[2].copy(update={"abundance": 40})
+    check()
+
+    # removed spin systems and a modified method.
+    sim.spin_systems = sim.spin_systems[2:]
+    check("spin_system")
+    sim.methods[0].spectral_dimensions[0].spectral_width = 4e4
+    check()
+
+    # the CSDM object of the simulation is updated in place.
+    sim.run(incremental=True)
+    csdm = sim.methods[0].simulation
+    sim.spin_systems[0].abundance = 20
+    sim.run(incremental=True)
+    assert sim.methods[0].simulation is csdm
+    data = csdm.y[0].components[0].copy()
+    sim.run()
+    assert sim.methods[0].simulation is not csdm
+    ref = sim.methods[0].simulation.y[0].components[0]
+    np.testing.assert_allclose(data, ref, atol=1e-12 * ref.max())
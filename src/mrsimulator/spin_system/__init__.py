@@ -15,6 +15,7 @@ from pydantic import Field
 
 from .isotope import ISOTOPE_DATA
 from .site import Site
+from .spin_system_array import SpinSystemArray  # noqa: F401
 from .zeeman_state import ZeemanState
 
 __author__ = "Deepansh Srivastava"
@@ -138,6 +139,11 @@ class SpinSystem(Parseable):
     property_default_units: ClassVar = {"abundance": "pct"}
     property_units: Dict = {"abundance": "pct"}
 
+    # the abundance scales the spectrum, and is applied by the incremental simulation
+    # without re-simulating the spin system.
+    track_revision: ClassVar = True
+    untracked_attributes: ClassVar = {"abundance"}
+
     class Config:
         validate_assignment = True
 
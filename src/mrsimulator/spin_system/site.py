@@ -163,6 +163,8 @@ class Site(Parseable):
     property_default_units: ClassVar = {"isotropic_chemical_shift": "ppm"}
     property_units: Dict = {"isotropic_chemical_shift": "ppm"}
 
+    track_revision: ClassVar = True
+
     @validator("quadrupolar")
     def spin_must_be_at_least_one(cls, v, values):
         if v is None:
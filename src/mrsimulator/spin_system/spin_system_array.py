@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""Base SpinSystemArray class."""
+import numpy as np
+
+from .isotope import Isotope
+from .site import Site
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+__shielding_keys__ = ["zeta", "eta", "alpha", "beta", "gamma"]
+__quadrupolar_keys__ = ["Cq", "eta", "alpha", "beta", "gamma"]
+
+# row index of the respective parameter within the SpinSystemArray data array.
+__columns__ = {
+    "isotropic_chemical_shift": 0,
+    **{f"shielding_symmetric.{k}": i + 1 for i, k in enumerate(__shielding_keys__)},
+    **{f"quadrupolar.{k}": i + 6 for i, k in enumerate(__quadrupolar_keys__)},
+    "abundance": 11,
+}
+
+
+class SpinSystemArray:
+    r"""A columnar container of single-site spin systems.
+
+    The SpinSystemArray is a light-weight alternative to a list of single-site
+    :ref:`spin_sys_api` objects, where the site parameters of all spin systems are
+    held as contiguous float64 columns. The simulator reads the columns directly,
+    without creating any python object per spin system, making it the preferred
+    container for simulating large ensembles of spin systems, such as the models of
+    amorphous materials.
+
+    Args:
+
+        isotopes:
+            A string or a list of isotopes.
+        isotropic_chemical_shifts:
+            A float or a list/ndarray of values in ppm. The default value is 0.
+        shielding_symmetric:
+            A shielding symmetric like dict object, where the keyword value can either
+            be a float or a list/ndarray of floats. The default value is None. The
+            allowed keywords are ``zeta``, ``eta``, ``alpha``, ``beta``, and ``gamma``.
+        quadrupolar:
+            A quadrupolar like dict object, where the keyword value can either be a
+            float or a list/ndarray of floats. The default value is None. The allowed
+            keywords are ``Cq``, ``eta``, ``alpha``, ``beta``, and ``gamma``.
+        abundance:
+            A float or a list/ndarray of floats describing the abundance of each spin
+            system. The default value is 100.
+
+    The values follow the units of the respective :ref:`site_api` attributes, that is,
+    ppm for the isotropic chemical shift and the shielding anisotropy, Hz for the
+    quadrupolar coupling constant, and radians for the Euler angles. Parameters that
+    are not provided are set to zero. As with the ``single_site_system_generator``,
+    the list/ndarray parameters must be of equal length, and the scalar parameters are
+    assigned to every spin system.
+
+    Example
+    -------
+
+    >>> from mrsimulator import SpinSystemArray
+    >>> sys_array = SpinSystemArray(
+    ...     isotopes='27Al',
+    ...     isotropic_chemical_shifts=np.arange(5),
+    ...     quadrupolar={'Cq': 3.1e6, 'eta': np.linspace(0, 1, 5)},
+    ... )
+    >>> len(sys_array)
+    5
+    >>> sys_array.column('quadrupolar.eta')
+    array([0.  , 0.25, 0.5 , 0.75, 1.  ])
+
+    The SpinSystemArray is assigned to the simulator in place of a list of spin
+    systems.
+
+    >>> sim = Simulator()
+    >>> sim.spin_systems = sys_array
+
+    .. note::
+        Indexing the SpinSystemArray with an integer returns a new
+        :ref:`spin_sys_api` object, and any changes made to the object are not
+        reflected within the array. Slicing returns a new SpinSystemArray.
+    """
+
+    def __init__(
+        self,
+        isotopes,
+        isotropic_chemical_shifts=0,
+        shielding_symmetric=None,
+        quadrupolar=None,
+        abundance=100,
+    ):
+        shielding_symmetric = {} if shielding_symmetric is None else shielding_symmetric
+        quadrupolar = {} if quadrupolar is None else quadrupolar
+        _check_keys(shielding_symmetric, __shielding_keys__, "shielding_symmetric")
+        _check_keys(quadrupolar, __quadrupolar_keys__, "quadrupolar")
+
+        items = [
+            isotopes,
+            isotropic_chemical_shifts,
+            *[shielding_symmetric.get(k, 0) for k in __shielding_keys__],
+            *[quadrupolar.get(k, 0) for k in __quadrupolar_keys__],
+            abundance,
+        ]
+        n = _check_size([np.asarray(item).size for item in items if _is_list(item)])
+        items = [np.broadcast_to(np.asarray(item).ravel(), (n,)) for item in items]
+
+        self.isotopes, self.isotope_index = np.unique(items[0], return_inverse=True)
+        self.isotopes = [Isotope(symbol=item).symbol for item in self.isotopes]
+        self.isotope_index = np.asarray(self.isotope_index, dtype=np.int32)
+        self.data = np.asarray(items[1:], dtype=np.float64, order="C")
+        self.has_shielding_symmetric = shielding_symmetric != {}
+        self.has_quadrupolar = quadrupolar != {}
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, v):
+        if not isinstance(v, cls):
+            raise TypeError("value is not a valid SpinSystemArray")
+        return v
+
+    @classmethod
+    def from_spin_systems(cls, spin_systems: list):
+        """Create a SpinSystemArray from a list of single-site spin systems.
+
+        Args:
+            spin_systems: A list of SpinSystem objects, each with exactly one site.
+
+        Returns:
+            A SpinSystemArray object.
+        """
+        for i, sys in enumerate(spin_systems):
+            if len(sys.sites) != 1:
+                raise ValueError(
+                    f"SpinSystemArray only supports single-site spin systems. Spin "
+                    f"system at index {i} has {len(sys.sites)} sites."
+                )
+
+        sites = [sys.sites[0] for sys in spin_systems]
+
+        def get(tensor, key):
+            lst = [getattr(getattr(s, tensor), key, None) for s in sites]
+            return [0 if item is None else item for item in lst]
+
+        has_shielding = any(s.shielding_symmetric is not None for s in sites)
+        has_quad = any(s.quadrupolar is not None for s in sites)
+        shielding = {k: get("shielding_symmetric", k) for k in __shielding_keys__}
+        quad = {k: get("quadrupolar", k) for k in __quadrupolar_keys__}
+        iso = [s.isotropic_chemical_shift for s in sites]
+        return cls(
+            isotopes=[s.isotope.symbol for s in sites],
+            isotropic_chemical_shifts=[0 if item is None else item for item in iso],
+            shielding_symmetric=shielding if has_shielding else None,
+            quadrupolar=quad if has_quad else None,
+            abundance=[sys.abundance for sys in spin_systems],
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        """Return the column corresponding to the parameter `name` as a read-only
+        view. The valid names are ``isotropic_chemical_shift``, ``abundance``,
+        ``shielding_symmetric.<key>``, and ``quadrupolar.<key>``."""
+        if name not in __columns__:
+            raise KeyError(f"{name} is not a valid column.")
+        view = self.data[__columns__[name]]
+        view.flags.writeable = False
+        return view
+
+    def get_isotopes(self, spin_I: float = None) -> list:
+        """List of unique isotopes within the array, optionally filtered by the spin
+        quantum number `spin_I`."""
+        isotopes = [Isotope(symbol=item) for item in self.isotopes]
+        return [
+            item.symbol for item in isotopes if spin_I is None or item.spin == spin_I
+        ]
+
+    def __len__(self):
+        return self.isotope_index.size
+
+    def __getitem__(self, index):
+        from . import SpinSystem
+
+        if isinstance(index, slice):
+            new = object.__new__(SpinSystemArray)
+            new.__dict__.update(self.__dict__)
+            used, inverse = np.unique(self.isotope_index[index], return_inverse=True)
+            new.isotopes = [self.isotopes[i] for i in used]
+            new.isotope_index = np.asarray(inverse, dtype=np.int32)
+            new.data = self.data[:, index].copy()
+            return new
+
+        index = range(len(self))[index]
+        symbol = self.isotopes[self.isotope_index[index]]
+        row = self.data[:, index]
+        site = Site(isotope=symbol, isotropic_chemical_shift=row[0])
+        if self.has_shielding_symmetric:
+            site.shielding_symmetric = dict(zip(__shielding_keys__, row[1:6]))
+        if self.has_quadrupolar and site.isotope.spin > 0.5:
+            site.quadrupolar = dict(zip(__quadrupolar_keys__, row[6:11]))
+        return SpinSystem(sites=[site], abundance=row[11])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __eq__(self, other):
+        if not isinstance(other, SpinSystemArray):
+            return False
+        check = [
+            self.isotopes == other.isotopes,
+            np.array_equal(self.isotope_index, other.isotope_index),
+            np.array_equal(self.data, other.data),
+            self.has_shielding_symmetric == other.has_shielding_symmetric,
+            self.has_quadrupolar == other.has_quadrupolar,
+        ]
+        return all(check)
+
+    def __repr__(self):
+        return f"SpinSystemArray(n_spin_systems={len(self)}, isotopes={self.isotopes})"
+
+
+def _is_list(item):
+    return isinstance(item, (list, tuple, np.ndarray))
+
+
+def _check_keys(py_dict, keys, name):
+    unknown = set(py_dict.keys()) - set(keys)
+    if unknown != set():
+        raise ValueError(
+            f"Invalid keyword(s) {sorted(unknown)} for {name}. The allowed keywords "
+            f"are {keys}."
+        )
+
+
+def _check_size(sizes):
+    if sizes == []:
+        return 1
+    if all(item == sizes[0] for item in sizes):
+        return sizes[0]
+    raise ValueError(
+        "Each entry can either be a single item or a list of items. If an entry is a "
+        "list, it's length must be equal to the length of other lists present in the "
+        "system."
+    )
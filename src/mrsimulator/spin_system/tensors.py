@@ -112,6 +112,8 @@ class SymmetricTensor(Parseable):
         "gamma": "rad",
     }
 
+    track_revision: ClassVar = True
+
     def to_freq_dict(self, larmor_frequency: float) -> dict:
         """
         Serialize the SymmetricTensor object to a JSON compliant python dictionary
@@ -157,6 +159,8 @@ class AntisymmetricTensor(Parseable):
     property_default_units: ClassVar = {"zeta": "ppm", "alpha": "rad", "beta": "rad"}
     property_units: Dict = {"zeta": "ppm", "alpha": "rad", "beta": "rad"}
 
+    track_revision: ClassVar = True
+
     def to_freq_dict(self, larmor_frequency: float) -> dict:
         """
         Serialize the AntisymmetricTensor object to a JSON compliant python dictionary
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Test for the SpinSystemArray class."""
+import numpy as np
+import pytest
+from mrsimulator import Simulator
+from mrsimulator import Site
+from mrsimulator import SpinSystem
+from mrsimulator import SpinSystemArray
+from mrsimulator.methods import BlochDecaySpectrum
+from mrsimulator.utils.collection import single_site_system_generator
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def test_spin_system_array():
+    array = SpinSystemArray(
+        isotopes=["27Al", "1H", "27Al"],
+        isotropic_chemical_shifts=[10, 1, -5],
+        shielding_symmetric={"zeta": 5, "eta": [0.1, 0.2, 0.3]},
+        quadrupolar={"Cq": 3e6},
+        abundance=[10, 20, 30],
+    )
+    assert len(array) == 3
+    assert array.isotopes == ["1H", "27Al"]
+    assert np.array_equal(array.isotope_index, [1, 0, 1])
+    assert array.data.flags["C_CONTIGUOUS"]
+    assert np.allclose(array.column("shielding_symmetric.eta"), [0.1, 0.2, 0.3])
+    assert np.allclose(array.column("quadrupolar.Cq"), 3e6)
+    assert np.allclose(array.column("abundance"), [10, 20, 30])
+    assert array.get_isotopes() == ["1H", "27Al"]
+    assert array.get_isotopes(spin_I=2.5) == ["27Al"]
+
+    with pytest.raises(KeyError, match=".*is not a valid column.*"):
+        array.column("Cq")
+
+    # items are materialized as SpinSystem objects.
+    sys = array[-1]
+    assert sys.abundance == 30
+    assert sys.sites[0].isotope.symbol == "27Al"
+    assert sys.sites[0].isotropic_chemical_shift == -5
+    assert sys.sites[0].shielding_symmetric.eta == 0.3
+    assert sys.sites[0].quadrupolar.Cq == 3e6
+
+    # spin 1/2 sites are not assigned a quadrupolar tensor.
+    assert array[1].sites[0].quadrupolar is None
+    assert array[:2] == SpinSystemArray(
+        isotopes=["27Al", "1H"],
+        isotropic_chemical_shifts=[10, 1],
+        shielding_symmetric={"zeta": 5, "eta": [0.1, 0.2]},
+        quadrupolar={"Cq": 3e6},
+        abundance=[10, 20],
+    )
+    assert len(list(array)) == 3
+
+    # round trip
+    new_array = SpinSystemArray.from_spin_systems(list(array))
+    assert np.array_equal(new_array.data[:6], array.data[:6])
+    assert np.array_equal(new_array.column("quadrupolar.Cq"), [3e6, 0, 3e6])
+    assert new_array == SpinSystemArray.from_spin_systems(list(new_array))
+    assert array != list(array)
+
+
+def test_spin_system_array_errors():
+    error = "Each entry can either be a single item or a list of items"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        SpinSystemArray(isotopes="13C", isotropic_chemical_shifts=[1, 2], abundance=[1])
+
+    error = "Invalid keyword"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        SpinSystemArray(isotopes="13C", shielding_symmetric={"Cq": 1})
+
+    error = "only supports single-site spin systems"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        SpinSystemArray.from_spin_systems(
+            [SpinSystem(sites=[Site(isotope="1H"), Site(isotope="1H")])]
+        )
+
+    error = "value is not a valid list"
+    with pytest.raises(ValueError, match=f".*{error}.*"):
+        Simulator(spin_systems="SpinSystemArray")
+
+
+def simulate(spin_systems, decompose="none"):
+    method = BlochDecaySpectrum(
+        channels=["27Al"],
+        rotor_frequency=5000,
+        spectral_dimensions=[{"count": 1024, "spectral_width": 1e5}],
+    )
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.decompose_spectrum = decompose
+    sim.run()
+    return sim
+
+
+def test_simulation_with_spin_system_array():
+    n = 20
+    kwargs = dict(
+        isotopes=["27Al"] * (n - 2) + ["17O", "17O"],
+        isotropic_chemical_shifts=np.random.normal(0, 10, n),
+        shielding_symmetric={"zeta": np.random.normal(0, 20, n), "eta": 0.2},
+        quadrupolar={
+            "Cq": np.random.normal(3e6, 5e5, n),
+            "eta": np.random.rand(n),
+            "beta": np.random.rand(n),
+        },
+        abundance=np.random.rand(n),
+    )
+    spin_systems = single_site_system_generator(**kwargs, rtol=0)
+    array = SpinSystemArray(**kwargs)
+    assert array == SpinSystemArray.from_spin_systems(spin_systems)
+
+    sim_list = simulate(spin_systems)
+    sim_array = simulate(array)
+    assert sim_array.get_isotopes() == sim_list.get_isotopes()
+    np.testing.assert_allclose(
+        sim_array.methods[0].simulation.y[0].components[0],
+        sim_list.methods[0].simulation.y[0].components[0],
+    )
+
+    sim_list = simulate(spin_systems, "spin_system")
+    sim_array = simulate(array, "spin_system")
+    assert len(sim_array.methods[0].simulation.y) == n - 2
+    for dv_array, dv_list in zip(
+        sim_array.methods[0].simulation.y, sim_list.methods[0].simulation.y
+    ):
+        np.testing.assert_allclose(dv_array.components, dv_list.components)
+
+
+def test_spin_system_array_serialization(tmp_path):
+    array = SpinSystemArray(
+        isotopes=["27Al", "17O"],
+        isotropic_chemical_shifts=[10, -5],
+        quadrupolar={"Cq": [3e6, 4e6], "eta": [0.2, 0.5]},
+        abundance=[40, 60],
+    )
+    sim = Simulator(spin_systems=array)
+    assert sim.reduced_dict()["spin_systems"] == [
+        item.reduced_dict() for item in array
+    ]
+
+    filename = str(tmp_path / "sim.mrsim")
+    sim.save(filename, with_units=False)
+    sim_load = Simulator.load(filename, parse_units=False)
+    assert sim_load.spin_systems == list(array)
+
+    sim.save(filename)
+    sim_load = Simulator.load(filename)
+    assert sim_load.spin_systems == list(array)
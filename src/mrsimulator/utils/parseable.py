@@ -2,11 +2,13 @@
 """Base Parseable class."""
 from copy import deepcopy
 from enum import Enum
+from itertools import count
 from typing import ClassVar
 from typing import Dict
 
 from csdmpy.units import string_to_quantity
 from pydantic import BaseModel
+from pydantic import PrivateAttr
 
 from .extra import _reduce_dict
 
@@ -15,6 +17,11 @@ from .extra import _reduce_dict
 __author__ = "Shyam Dwaraknath"
 __email__ = "shyamd@lbl.gov"
 
+# every Parseable object is stamped with a new revision on creation and on copy. The
+# objects of the models with track_revision enabled are stamped again on every
+# assignment that changes the value of an attribute.
+_revision_counter = count()
+
 
 class Parseable(BaseModel):
     """
@@ -29,6 +36,50 @@ class Parseable(BaseModel):
 
     property_units: Dict = {}
 
+    # the revision is tracked only for the models whose revision is read, that is, the
+    # spin system and its sites and tensors. The assignments to the other models, for
+    # example, the simulation and experiment of a Method, are not compared.
+    track_revision: ClassVar = False
+
+    # attributes whose assignment does not change the revision of the object.
+    untracked_attributes: ClassVar = set()
+
+    _revision: int = PrivateAttr(default_factory=_revision_counter.__next__)
+
+    def __setattr__(self, name, value):
+        if not self.track_revision:
+            return super().__setattr__(name, value)
+        previous = self.__dict__.get(name, None)
+        super().__setattr__(name, value)
+        if name not in self.__fields__ or name in self.untracked_attributes:
+            return
+        if _is_changed(previous, self.__dict__[name]):
+            object.__setattr__(self, "_revision", next(_revision_counter))
+
+    def _assign(self, name, value):
+        """Assign the value to the attribute `name` without validation. Used in the
+        hot loops, such as the least-squares minimization, where the values are
+        already known to be valid."""
+        if not self.track_revision:
+            self.__dict__[name] = value
+        elif _is_changed(self.__dict__[name], value):
+            self.__dict__[name] = value
+            if name not in self.untracked_attributes:
+                object.__setattr__(self, "_revision", next(_revision_counter))
+
+    def _copy_and_set_values(self, *args, **kwargs):
+        # a copy, possibly with updated values, is a new object with a new revision.
+        obj = super()._copy_and_set_values(*args, **kwargs)
+        object.__setattr__(obj, "_revision", next(_revision_counter))
+        return obj
+
+    def _get_revision(self) -> tuple:
+        """Return the revision of the object along with the revisions of the nested
+        objects. For the models with `track_revision` enabled, the revision changes
+        when an attribute of the object, or of any nested object, is assigned a
+        different value, except for the attributes listed in `untracked_attributes`."""
+        return (self._revision, *[_get_revision(v) for v in self.__dict__.values()])
+
     @classmethod
     def parse_dict_with_units(cls, json_dict):
         """Parse the physical quantity from a dictionary representation of the class
@@ -123,6 +174,28 @@ class Parseable(BaseModel):
         return temp_dict
 
 
+def _is_changed(previous, value) -> bool:
+    if previous is value:
+        return False
+    try:
+        return bool(previous != value)
+    except (ValueError, TypeError):
+        return True
+
+
+def _get_revision(value, in_list=False):
+    """Revision of a nested attribute value. The scalar attributes are tracked by the
+    revision of the parent object, except within lists, which may be modified in
+    place."""
+    if isinstance(value, Parseable):
+        return value._get_revision()
+    if isinstance(value, list):
+        return tuple(_get_revision(item, True) for item in value)
+    if isinstance(value, BaseModel) or in_list:
+        return repr(value)
+    return None
+
+
 def enforce_units(value: str, required_type: str, default_unit: str, throw_error=True):
     """ Enforces a required type and default unit on the value. """
     try:
@@ -1,7 +1,16 @@
 # -*- coding: utf-8 -*-
+import copy
+import re
+from concurrent.futures import ThreadPoolExecutor
+
 import mrsimulator.signal_processing as sp
+import mrsimulator.signal_processing.apodization as apo
+import numpy as np
 from lmfit import Parameters
 from mrsimulator import Simulator
+from mrsimulator import SpinSystemArray
+from mrsimulator.simulator.parallel import get_n_jobs
+from scipy.optimize import nnls
 
 
 __author__ = ["Maxwell C Venetos", "Deepansh Srivastava"]
@@ -188,13 +197,14 @@ def _traverse_dictionaries(dictionary, parent="spin_systems"):
     return name_list
 
 
-def _post_sim_LMFIT_params(post_sim):
+def _post_sim_LMFIT_params(post_sim, prefix=""):
     """
     Creates an LMFIT Parameters object for SignalProcessor operations
     involved in spectrum fitting.
 
     Args:
         post_sim: SignalProcessor object
+        prefix: A string prefixed to the parameter names.
 
     Returns:
         Parameters object
@@ -205,7 +215,7 @@ def _post_sim_LMFIT_params(post_sim):
         name = operation.__class__.__name__
         if name in POST_SIM_DICT:
             attr = POST_SIM_DICT[name]
-            key = f"operation_{i}_{name}_{attr}"
+            key = f"{prefix}operation_{i}_{name}_{attr}"
             val = operation.__getattribute__(attr)
             params.add(name=key, value=val)
 
@@ -233,12 +243,23 @@ def _update_post_sim_from_LMFIT_params(params, post_sim):
             post_sim.operations[opIndex].__setattr__(POST_SIM_DICT[split_name[2]], val)
 
 
-def make_LMFIT_parameters(sim, post_sim=None, exclude_key=None):
+def _get_post_sim_target(name, post_sim):
+    """Return the operation and the attribute name corresponding to the SignalProcessor
+    parameter `name`. The parameters of a list of SignalProcessor objects are prefixed
+    with ``SP_j_``, where j is the index of the SignalProcessor within the list."""
+    split_name = name.split("_")
+    if split_name[0] == "SP":
+        post_sim = post_sim[int(split_name[1])]
+        split_name = split_name[2:]
+    return post_sim.operations[int(split_name[1])], POST_SIM_DICT[split_name[2]]
+
+
+def make_LMFIT_parameters(sim, post_sim=None, exclude_key=None, linear_abundance=False):
     """An alias of `make_LMFIT_params` function."""
-    return make_LMFIT_params(sim, post_sim, exclude_key)
+    return make_LMFIT_params(sim, post_sim, exclude_key, linear_abundance)
 
 
-def make_LMFIT_params(sim, post_sim=None, exclude_key=None):
+def make_LMFIT_params(sim, post_sim=None, exclude_key=None, linear_abundance=False):
     """
     Parses the Simulator and PostSimulator objects for a list of LMFIT parameters.
     The parameter name is generated using the following syntax:
@@ -249,7 +270,15 @@ def make_LMFIT_params(sim, post_sim=None, exclude_key=None):
 
     Args:
         sim: a Simulator object.
-        post_sim: a SignalProcessor object
+        post_sim: a SignalProcessor object, or a list of SignalProcessor objects, one
+            for each method of the simulator. For a list, the names of the
+            SignalProcessor parameters are prefixed with ``SP_j_``, where j is the
+            index of the method.
+        bool linear_abundance: If true, the spin system abundances and the factor of
+            the Scale operation are excluded from the parameters. These are instead
+            solved by linear least-squares within the
+            :func:`~mrsimulator.utils.spectral_fitting.LMFIT_min_function` with
+            ``linear_abundance=True``. The default is False.
 
     Returns:
         LMFIT Parameters object.
@@ -270,6 +299,9 @@ def make_LMFIT_params(sim, post_sim=None, exclude_key=None):
     expression = "100" if expression == "" else f"100-{expression}"
     for items in temp_list:
         value = _get_simulator_object_value(sim, items)
+        if linear_abundance and "abundance" in items:
+            continue
+
         if "_eta" in items:
             params.add(name=items, value=value, min=0, max=1)
 
@@ -285,19 +317,122 @@ def make_LMFIT_params(sim, post_sim=None, exclude_key=None):
     if post_sim is None:
         return params
 
-    if not isinstance(post_sim, sp.SignalProcessor):
-        raise ValueError(
-            f"Expecting a `SignalProcessor` object, found {type(post_sim).__name__}."
-        )
-    temp_params = _post_sim_LMFIT_params(post_sim)
-    for item in temp_params:
-        params.add(name=item, value=temp_params[item].value)
+    processors = post_sim if isinstance(post_sim, list) else [post_sim]
+    for j, processor in enumerate(processors):
+        if not isinstance(processor, sp.SignalProcessor):
+            raise ValueError(
+                "Expecting a `SignalProcessor` object, found "
+                f"{type(processor).__name__}."
+            )
+        prefix = f"SP_{j}_" if isinstance(post_sim, list) else ""
+        temp_params = _post_sim_LMFIT_params(processor, prefix)
+        for item in temp_params:
+            operation, _ = _get_post_sim_target(item, post_sim)
+            if linear_abundance and isinstance(operation, sp.Scale):
+                continue
+            params.add(name=item, value=temp_params[item].value)
     # params.add_many(temp_params)
 
     return params
 
 
-def LMFIT_min_function(params, sim, post_sim=None):
+class ParameterBinding:
+    """A binding of the LMFIT parameters to the attributes of the Simulator and the
+    SignalProcessor objects.
+
+    The parameter names are parsed once, and every parameter is bound to the object
+    and the attribute it represents. The parameter values are then assigned directly,
+    without parsing the names or validating the values, making the binding suited for
+    the repeated updates within a least-squares minimization. The binding is no
+    longer valid when any of the bound spin systems, sites, tensors, or operations is
+    replaced.
+
+    Args:
+        params: LMFIT Parameters object.
+        sim: Simulator object.
+        post_sim: SignalProcessor object, or a list of SignalProcessor objects. The
+            default is None.
+        bool linear_abundance: If true, the abundance parameters are not bound. The
+            default is False.
+
+    Example:
+        >>> binding = ParameterBinding(params, sim, processor) # doctest: +SKIP
+        >>> binding.update(params) # doctest: +SKIP
+    """
+
+    def __init__(self, params, sim, post_sim=None, linear_abundance=False):
+        self.sim = sim
+        self.post_sim = post_sim
+        self.linear_abundance = linear_abundance
+        self.names = tuple(params.keys())
+
+        self.targets = []
+        for name in self.names:
+            if "operation_" in name and post_sim is None:
+                continue
+            if linear_abundance and "abundance" in name:
+                continue
+            obj, attr = _get_target(name, sim, post_sim)
+            self.targets.append((name, obj, attr))
+
+    def is_valid(self, params, sim, post_sim=None, linear_abundance=False) -> bool:
+        """Return True if the binding applies to the given arguments, that is, every
+        bound object is still found at the path given by the parameter name."""
+        check = [
+            self.sim is sim,
+            self.post_sim is post_sim,
+            self.linear_abundance == linear_abundance,
+            self.names == tuple(params.keys()),
+        ]
+        if not all(check):
+            return False
+        try:
+            return all(
+                _get_target(name, sim, post_sim)[0] is obj
+                for name, obj, _ in self.targets
+            )
+        except (AttributeError, IndexError, TypeError):
+            return False
+
+    def update(self, params):
+        """Assign the values of the parameters to the bound attributes.
+
+        Args:
+            params: LMFIT Parameters object with the parameters of the binding.
+        """
+        for name, obj, attr in self.targets:
+            obj._assign(attr, params[name].value)
+
+
+def _get_target(name, sim, post_sim):
+    """Return the object and the attribute name corresponding to the parameter
+    `name`."""
+    if "operation_" in name:
+        return _get_post_sim_target(name, post_sim)
+    path = _str_decode(name)
+    obj = sim
+    for attr in path[:-1]:
+        obj = obj[int(attr)] if attr.isnumeric() else getattr(obj, attr)
+    return obj, path[-1]
+
+
+def _get_operations(post_sim):
+    if post_sim is None:
+        return []
+    processors = post_sim if isinstance(post_sim, list) else [post_sim]
+    return [item.operations for item in processors]
+
+
+def LMFIT_min_function(
+    params,
+    sim,
+    post_sim=None,
+    linear_abundance=False,
+    binding=None,
+    weights=None,
+    n_jobs=None,
+    incremental=False,
+):
     """
     The simulation routine to calculate the vector difference between simulation and
     experiment based on the parameters update.
@@ -307,10 +442,38 @@ def LMFIT_min_function(params, sim, post_sim=None):
         sim: Simulator object used in the simulation. Initialized with guess fitting
             parameters.
         post_sim: PostSimulator object used in the simulation. Initialized with guess
-            fitting parameters.
+            fitting parameters. When a list of SignalProcessor objects is given, one
+            for each method of the simulator, the methods are fitted jointly to
+            their respective experiments.
+        bool linear_abundance: If true, the abundances of the spin systems are solved
+            by a non-negative linear least-squares fit of the processed spectra of
+            the individual spin systems to the experiment, for every update of the
+            remaining parameters (variable projection). The solved abundances are
+            not assigned to the spin systems within the minimization. Use
+            :func:`~mrsimulator.utils.spectral_fitting.set_linear_abundance` with the
+            fitted parameters to assign them once the minimization ends. Use with
+            the parameters from ``make_LMFIT_params`` with ``linear_abundance=True``.
+            The default is False.
+        binding: A ParameterBinding object for the given arguments, owned by the
+            caller. Pass the binding with the ``fcn_kws`` argument of the LMFIT
+            Minimizer to re-use it across the function evaluations of a minimization.
+            The default is None, in which case, a new binding is created for every
+            call.
+        weights: A list of weights, one for each method of a joint fit. The residual
+            of every method is multiplied by the respective weight. The default is
+            None, `i.e.`, unit weights.
+        int n_jobs: The number of threads over which the methods of a joint fit are
+            simulated concurrently. The default is None, `i.e.`, one thread per
+            method.
+        bool incremental: If true, the simulator is run incrementally, where only
+            the spin systems modified by the parameters are re-simulated. See the
+            `incremental` argument of the Simulator run method. The simulator is
+            always run incrementally with ``linear_abundance=True``. The default is
+            False.
 
     Returns:
         Array of the differences between the simulation and the experimental data.
+        For a joint fit, the weighted differences of the methods are concatenated.
     """
     # if not isinstance(params, Parameters):
     #     raise ValueError(
@@ -324,31 +487,505 @@ def LMFIT_min_function(params, sim, post_sim=None):
     # if not isinstance(sim, Simulator):
     #  raise ValueError(f"Expecting a `Simulator` object, found {type(sim).__name__}.")
 
-    values = params.valuesdict()
-    for items in values:
-        if "operation_" not in items:
-            _set_simulator_object_value(sim, items, values[items])
-        elif "operation_" in items and post_sim is not None:
-            _update_post_sim_from_LMFIT_params(params, post_sim)
+    if isinstance(post_sim, list):
+        if linear_abundance:
+            raise ValueError(
+                "The linear_abundance option is only supported for a single method."
+            )
+        if len(post_sim) != len(sim.methods):
+            raise ValueError(
+                f"Expecting {len(sim.methods)} SignalProcessor objects, one for each "
+                f"method, found {len(post_sim)}."
+            )
+
+    if binding is None:
+        binding = ParameterBinding(params, sim, post_sim, linear_abundance)
+    binding.update(params)
+
+    if isinstance(post_sim, list):
+        n_jobs = len(post_sim) if n_jobs is None else n_jobs
+        weights = np.ones(len(post_sim)) if weights is None else weights
+
+        # the methods share the engines and the spin system spectra of the simulator.
+        sim.run(incremental=incremental, n_jobs=n_jobs, executor="thread")
+        residuals = [
+            weight * _method_residual(method, processor).ravel()
+            for method, processor, weight in zip(sim.methods, post_sim, weights)
+        ]
+        return np.concatenate(residuals)
+
+    if linear_abundance:
+        return _linear_abundance_residual(sim, post_sim)
+
+    sim.run(incremental=incremental)
+    return _method_residual(sim.methods[0], post_sim)
+
+
+def _method_residual(method, post_sim):
+    """Return the difference between the experiment and the processed simulation of
+    the method. A decomposed simulation is summed over the spin systems. The
+    simulation is processed as an ndarray, and the residual is evaluated in place."""
+    datum = _process_array(method.simulation, post_sim)
+    experiment = method.experiment.y[0].components[0]
+    if np.iscomplexobj(experiment):
+        return experiment - datum
+    return np.subtract(experiment, datum, out=datum)
+
+
+def _process_array(simulation, post_sim, components=None):
+    """Process the components of the simulation, or the given `components` with the
+    dimensions of the simulation, and return the real part of the sum over the
+    dependent variables."""
+    if components is None:
+        components = [item.components for item in simulation.dependent_variables]
+    processed = post_sim.compile(simulation).apply(components)
+    datum = 0
+    for item in processed:
+        datum += item[0].real
+    return datum
 
-    sim.run()
-    processed_data = post_sim.apply_operations(data=sim.methods[0].simulation)
 
-    datum = 0
-    if sim.config.decompose_spectrum == "spin_system":
-        for decomposed_datum in processed_data.y:
-            datum += decomposed_datum.components[0].real
+def _linear_abundance_residual(sim, post_sim):
+    """Solve the abundances of the spin systems by non-negative least-squares and
+    return the residual between the experiment and the best linear combination of the
+    processed spin system spectra."""
+    experiment, _, _, model = _solve_linear_abundance(sim, post_sim)
+    return experiment - model
+
+
+def _solve_linear_abundance(sim, post_sim):
+    """Return the experiment, the indexes of the simulated spin systems, the
+    non-negative least-squares weights of their processed spectra at an abundance of
+    one percent, and the best linear combination of the processed spectra. The spin
+    systems and the post_sim are not modified."""
+    if isinstance(sim.spin_systems, SpinSystemArray):
+        raise ValueError(
+            "The linear_abundance option is not supported for a SpinSystemArray."
+        )
+
+    # the spectra of the spin systems are held by the incremental simulation at an
+    # abundance of one percent, independent of the abundances of the spin systems.
+    sim.run(method_index=0, incremental=True)
+    method = sim.methods[0]
+    entry = sim._contributions[0]
+    indexes = sorted(entry["spectra"].keys())
+
+    experiment = method.experiment.y[0].components[0].real
+    if indexes == []:
+        return experiment, indexes, np.zeros(0), np.zeros(experiment.shape)
+
+    components = [entry["spectra"][i][np.newaxis] for i in indexes]
+    processed = post_sim.compile(method.simulation).apply(components)
+    basis = np.asarray([item[0].real.ravel() for item in processed])
+    weights = nnls(basis.T, experiment.ravel())[0]
+    model = (weights @ basis).reshape(experiment.shape)
+    return experiment, indexes, weights, model
+
+
+def set_linear_abundance(params, sim, post_sim):
+    """
+    Assign the abundances solved by the non-negative linear least-squares at the
+    given parameters to the spin systems. Call once the minimization with
+    ``linear_abundance=True`` ends, with the fitted parameters.
+
+    The solved abundances are normalized to a sum of 100 percent over the spin
+    systems of the fitted method, and the overall intensity is assigned to the
+    factor of the last Scale operation of the `post_sim`, when present. The
+    operations of the `post_sim` are not modified otherwise.
+
+    Args:
+        params: LMFIT Parameters object with the fitted parameters.
+        sim: Simulator object.
+        post_sim: SignalProcessor object.
+
+    Returns:
+        The factor of a Scale operation, appended to the operations of the
+        `post_sim` with no Scale operation, that yields the fitted intensity.
+
+    Example:
+        >>> result = minner.minimize() # doctest: +SKIP
+        >>> set_linear_abundance(
+        ...     result.params, sim, processor
+        ... ) # doctest: +SKIP
+    """
+    ParameterBinding(params, sim, post_sim, True).update(params)
+    _, indexes, weights, _ = _solve_linear_abundance(sim, post_sim)
+
+    scale = [op for op in post_sim.operations if isinstance(op, sp.Scale)]
+    factor = scale[-1].factor if scale != [] else 1.0
+
+    total = weights.sum()
+    if total <= 0:
+        return factor
+    for i, weight in zip(indexes, weights):
+        sim.spin_systems[i].abundance = 100 * weight / total
+    factor *= total / 100
+    if scale != []:
+        scale[-1].factor = factor
+    return factor
+
+
+# the relative step of the forward finite-difference, as in MINPACK.
+FD_STEP = np.sqrt(np.finfo(np.float64).eps)
+
+
+def LMFIT_jacobian(
+    params,
+    sim,
+    post_sim=None,
+    linear_abundance=False,
+    binding=None,
+    weights=None,
+    n_jobs=None,
+    workers=None,
+    incremental=False,
+):
+    """
+    The Jacobian of the residual from the
+    :func:`~mrsimulator.utils.spectral_fitting.LMFIT_min_function` with respect to
+    the varying parameters, for use as the ``Dfun`` argument of the LMFIT
+    Levenberg-Marquardt (leastsq) minimization. The arguments are the same as for the
+    LMFIT_min_function.
+
+    The derivatives are evaluated in closed form, where possible, from the spectra of
+    the spin systems held by the incremental simulation, as follows,
+
+    - the abundance of a spin system, as the processed spectrum of the spin system,
+    - the isotropic chemical shift of a single-site spin system, as the spectral
+      derivative of the processed spectrum of the spin system, for the methods with a
+      single spectral dimension and a single event of p = -1 transitions,
+    - the FWHM of the Gaussian and Exponential apodizations, and the factor of the
+      Scale operation, by the derivative of the respective operation.
+
+    A parameter referenced by the expression of other parameters, such as the
+    abundance of the last spin system, is differentiated by the chain rule. The
+    remaining derivatives, and all derivatives with ``linear_abundance=True``, are
+    evaluated by forward finite-difference, where the columns are evaluated
+    concurrently over a pool of threads. Each thread holds a copy of the Simulator
+    and the SignalProcessor objects. When the copies are kept in between the calls,
+    see the `workers` argument, only the spin systems modified by a parameter are
+    re-simulated.
+
+    Args:
+        int n_jobs: The number of threads over which the finite-difference columns are
+            evaluated. A negative value is counted backwards from the number of
+            available cores. The default is None, `i.e.`, all cores.
+        list workers: A list, owned by the caller, which holds the copies of the
+            thread workers in between the calls. Pass the same list to every call of
+            a minimization, or use the function from
+            :func:`~mrsimulator.utils.spectral_fitting.make_LMFIT_jacobian`, which
+            holds its own list. The default is None, in which case, the copies are
+            made for every call.
+        bool incremental: Accepted for the same arguments as the
+            LMFIT_min_function. The simulator is always run incrementally for the
+            closed-form derivatives.
+
+    Returns:
+        A two-dimensional array of shape (number of residuals, number of varying
+        parameters), where the columns follow the order of the varying parameters.
+
+    Example:
+        >>> minner = Minimizer(
+        ...     LMFIT_min_function, params, fcn_args=(sim, processor)
+        ... ) # doctest: +SKIP
+        >>> result = minner.minimize(
+        ...     method="leastsq", Dfun=make_LMFIT_jacobian()
+        ... ) # doctest: +SKIP
+    """
+    names = [key for key, param in params.items() if param.vary and param.expr is None]
+
+    # the simulator is updated to the parameters, for the spectra of the spin systems.
+    residual = LMFIT_min_function(
+        params, sim, post_sim, linear_abundance, binding, weights, n_jobs, True
+    )
+    residual = np.asarray(residual).ravel()
+    jacobian = np.zeros((residual.size, len(names)), dtype=residual.dtype)
+
+    numeric = list(range(len(names)))
+    if not linear_abundance:
+        numeric = []
+        chain = _get_expression_coefficients(params, names)
+        cache = {}
+        for j, name in enumerate(names):
+            column = _get_analytic_column(
+                name, chain[name], sim, post_sim, weights, cache
+            )
+            if column is None:
+                numeric.append(j)
+            else:
+                jacobian[:, j] = column
+
+    if numeric == []:
+        return jacobian
+
+    n_jobs = get_n_jobs(-1 if n_jobs is None else n_jobs)
+    n_jobs = min(n_jobs, len(numeric))
+    workers = [] if workers is None else workers
+    _update_jacobian_workers(workers, params, sim, post_sim, linear_abundance, n_jobs)
+    chunks = [numeric[i::n_jobs] for i in range(n_jobs)]
+
+    def evaluate(i):
+        chunk_names = [names[j] for j in chunks[i]]
+        return workers[i].columns(params, chunk_names, weights)
+
+    if n_jobs == 1:
+        results = [evaluate(0)]
     else:
-        datum = processed_data.y[0].components[0].real
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(evaluate, range(n_jobs)))
+
+    for chunk, columns in zip(chunks, results):
+        for j, column in zip(chunk, columns):
+            jacobian[:, j] = column
+    return jacobian
+
+
+def _get_expression_coefficients(params, names):
+    """Return the derivatives of the constrained parameters with respect to each of
+    the varying parameters, as a dict of {constrained parameter name: derivative}."""
+    constrained = [name for name, param in params.items() if param.expr is not None]
+    chain = {name: {} for name in names}
+    if constrained == []:
+        return chain
+
+    params = copy.deepcopy(params)
+    before = {key: params[key].value for key in constrained}
+    for name in names:
+        param = params[name]
+        if not any(
+            re.search(rf"\b{name}\b", params[key].expr) is not None
+            for key in constrained
+        ):
+            continue
+        value = param.value
+        step = FD_STEP * max(abs(value), 1)
+        step = -step if value + step > param.max else step
+        param.value = value + step
+        params.update_constraints()
+        for key in constrained:
+            derivative = (params[key].value - before[key]) / step
+            if derivative != 0:
+                chain[name][key] = derivative
+        param.value = value
+        params.update_constraints()
+    return chain
+
+
+def _get_analytic_column(name, chain, sim, post_sim, weights, cache):
+    """Return the Jacobian column of the parameter `name` from the closed-form
+    derivatives of the processed simulations, or None, if not available. The
+    derivatives are held in the `cache` dict, keyed by the parameter name."""
+    processors = post_sim if isinstance(post_sim, list) else [post_sim]
+    weights = np.ones(len(processors)) if weights is None else weights
+
+    column = 0
+    for key, coefficient in [(name, 1), *chain.items()]:
+        if key not in cache:
+            cache[key] = _get_analytic_derivative(key, sim, post_sim)
+        derivatives = cache[key]
+        if derivatives is None:
+            return None
+        column += coefficient * np.concatenate(
+            [-weight * item.ravel() for weight, item in zip(weights, derivatives)]
+        )
+    return column
+
+
+def _get_analytic_derivative(name, sim, post_sim):
+    """Return the derivatives of the processed simulation of every fitted method with
+    respect to the parameter `name`, or None, if not available in closed form."""
+    processors = post_sim if isinstance(post_sim, list) else [post_sim]
+    methods = sim.methods[: len(processors)]
+
+    if "operation_" in name:
+        operation, _ = _get_post_sim_target(name, post_sim)
+        if not isinstance(operation, (sp.Scale, apo.Gaussian, apo.Exponential)):
+            return None
+        return [
+            _process(method.simulation, processor, derivative=operation)
+            if any(operation is item for item in processor.operations)
+            else np.zeros(method.shape())
+            for method, processor in zip(methods, processors)
+        ]
+
+    if isinstance(sim.spin_systems, SpinSystemArray) or any(
+        getattr(item, "dv_index", None) is not None
+        for processor in processors
+        for item in processor.operations
+    ):
+        return None
+
+    path = _str_decode(name)
+    index = int(path[1])
+    if path[2:] == ["abundance"]:
+        derivative = _spin_system_spectrum
+    elif path[2:] == ["sites", "0", "isotropic_chemical_shift"]:
+        if len(sim.spin_systems[index].sites) != 1:
+            return None
+        derivative = _spin_system_shift_derivative
+    else:
+        return None
+
+    derivatives = []
+    for i, (method, processor) in enumerate(zip(methods, processors)):
+        entry = sim._contributions.get(i, None)
+        if entry is None:
+            return None
+        if index not in entry["spectra"]:
+            derivatives.append(np.zeros(method.shape()))
+            continue
+        spectrum = derivative(method, entry, index)
+        if spectrum is None:
+            return None
+        components = [spectrum[np.newaxis]]
+        derivatives.append(_process_array(method.simulation, processor, components))
+    return derivatives
+
+
+def _spin_system_spectrum(method, entry, index):
+    """The derivative of the simulation with respect to the abundance of the spin
+    system at `index`, that is, the spectrum of the spin system at unit abundance."""
+    return entry["spectra"][index]
+
+
+def _spin_system_shift_derivative(method, entry, index):
+    """The derivative of the simulation with respect to the isotropic chemical shift
+    of the single-site spin system at `index`, evaluated as the spectral derivative
+    of the spectrum of the spin system along the frequency dimension."""
+    if len(method.spectral_dimensions) != 1 or method.affine_matrix is not None:
+        return None
+    dimension = method.spectral_dimensions[0]
+    if len(dimension.events) != 1:
+        return None
+    event = dimension.events[0]
+    query = event.transition_query
+    shielding = "Shielding1_0" in [item.value for item in event.freq_contrib]
+    single_quantum = query.transitions is None and query.P == {"channel-1": [[-1]]}
+    if event.fraction != 1 or not shielding or not single_quantum:
+        return None
+
+    # the frequency shift in Hz per ppm of the isotropic chemical shift.
+    gamma = method.channels[0].gyromagnetic_ratio
+    shift = np.abs(event.magnetic_flux_density * gamma)
+
+    spectrum = entry["abundances"][index] * entry["spectra"][index]
+    increment = dimension.spectral_width / dimension.count
+    frequency = np.fft.fftfreq(dimension.count, d=increment)
+    if dimension.count % 2 == 0:
+        frequency[dimension.count // 2] = 0
+    gradient = np.fft.ifft(2j * np.pi * frequency * np.fft.fft(spectrum)).real
+    return -shift * gradient
+
+
+def _process(data, processor, derivative=None):
+    """Apply the operations of the processor to a copy of the CSDM data and return
+    the real part of the sum over the dependent variables. When `derivative` is an
+    operation of the processor, the operation is replaced by its derivative."""
+    data = data.copy()
+    for operation in processor.operations:
+        if operation is not derivative:
+            data = operation.operate(data)
+        elif not isinstance(operation, sp.Scale):
+            data = operation.derivative(data)
 
-    return sim.methods[0].experiment.y[0].components[0] - datum
+    datum = 0
+    for item in data.y:
+        datum += item.components[0].real
+    return datum
 
-    # MULTIPLE EXPERIMENTS
-    # for i, method in enumerate(sim.methods):
-    #     y_factored = method.apodize().real
-    #     residual = np.append(
-    #         residual,
-    #         method.experiment.dependent_variables[0].components[0].real - y_factored,
-    #     )
 
-    # return residual
+class _JacobianWorker:
+    """A copy of the Simulator and the SignalProcessor objects, over which a subset of
+    the finite-difference columns of the Jacobian is evaluated."""
+
+    def __init__(self, params, sim, post_sim, linear_abundance):
+        self.sources = _get_jacobian_sources(params, sim, post_sim, linear_abundance)
+        self.sim = Simulator(
+            spin_systems=copy.deepcopy(sim.spin_systems),
+            methods=copy.deepcopy(sim.methods),
+            config=sim.config.copy(),
+        )
+        self.post_sim = copy.deepcopy(post_sim)
+        self.linear_abundance = linear_abundance
+        self.binding = ParameterBinding(
+            params, self.sim, self.post_sim, linear_abundance
+        )
+
+    def is_valid(self, params, sim, post_sim, linear_abundance) -> bool:
+        """Return True if the worker is a copy of the given arguments."""
+        names, sources = _get_jacobian_sources(params, sim, post_sim, linear_abundance)
+        if names != self.sources[0] or len(sources) != len(self.sources[1]):
+            return False
+        return all(a is b for a, b in zip(sources, self.sources[1]))
+
+    def columns(self, params, names, weights):
+        """Return the forward finite-difference columns of the parameters `names`."""
+        params = copy.deepcopy(params)
+        kwargs = dict(
+            sim=self.sim,
+            post_sim=self.post_sim,
+            linear_abundance=self.linear_abundance,
+            binding=self.binding,
+            weights=weights,
+            n_jobs=1,
+            incremental=True,
+        )
+        residual = np.asarray(LMFIT_min_function(params, **kwargs)).ravel()
+
+        columns = []
+        for name in names:
+            param = params[name]
+            value = param.value
+            step = FD_STEP * abs(value) if value != 0 else FD_STEP
+            step = -step if value + step > param.max else step
+            param.value = value + step
+            params.update_constraints()
+            new_residual = np.asarray(LMFIT_min_function(params, **kwargs)).ravel()
+            columns.append((new_residual - residual) / step)
+            param.value = value
+            params.update_constraints()
+        return columns
+
+
+def _get_jacobian_sources(params, sim, post_sim, linear_abundance):
+    """The parameter names and the objects from which the workers were copied."""
+    methods = list(sim.methods)
+    return (tuple(params.keys()), linear_abundance), [
+        sim,
+        sim.spin_systems,
+        *methods,
+        *[method.experiment for method in methods],
+        post_sim,
+        *_get_operations(post_sim),
+    ]
+
+
+def _update_jacobian_workers(workers, params, sim, post_sim, linear_abundance, n_jobs):
+    """Update the list of workers, in place, to at least n_jobs valid workers."""
+    if workers != [] and not workers[0].is_valid(
+        params, sim, post_sim, linear_abundance
+    ):
+        workers.clear()
+    while len(workers) < n_jobs:
+        workers.append(_JacobianWorker(params, sim, post_sim, linear_abundance))
+
+
+def make_LMFIT_jacobian():
+    """
+    Return a function that evaluates the
+    :func:`~mrsimulator.utils.spectral_fitting.LMFIT_jacobian`, for use as the
+    ``Dfun`` argument of the LMFIT leastsq minimization. The function holds its own
+    thread workers, which are kept in between the calls of a minimization. Make a new
+    function for every minimization.
+
+    Example:
+        >>> result = minner.minimize(
+        ...     method="leastsq", Dfun=make_LMFIT_jacobian()
+        ... ) # doctest: +SKIP
+    """
+    workers = []
+
+    def jacobian(params, *args, **kwargs):
+        return LMFIT_jacobian(params, *args, workers=workers, **kwargs)
+
+    return jacobian
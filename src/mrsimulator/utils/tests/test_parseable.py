@@ -66,3 +66,38 @@ def test_parse_json():
         str(err.value) == "Error enforcing units for foo: 300 Hz\n"
         "A angle value is required but got a frequency instead"
     )
+
+
+class TrackedTestClass(ParseableTestClass):
+    track_revision: ClassVar = True
+
+
+class Unequal:
+    def __eq__(self, other):
+        raise AssertionError("The assignment compared the values.")
+
+
+def test_revision():
+    # the revision changes on the assignment of a different value.
+    pr = TrackedTestClass()
+    revision = pr._get_revision()
+    pr.foo = 0
+    assert pr._get_revision() == revision
+    pr.foo = 1
+    assert pr._get_revision() != revision
+
+    # the assignments to the models without tracking are not compared.
+    pr = ParseableTestClass()
+    revision = pr._get_revision()
+    pr.foo = 1
+    assert pr._get_revision() == revision
+    pr.__dict__["bar"] = Unequal()
+    pr._assign("bar", 2)
+    assert pr.bar == 2
+
+    # a copy is stamped with a new revision.
+    pr = TrackedTestClass()
+    revision = pr._get_revision()
+    assert pr.copy()._get_revision() != revision
+    assert pr.copy(update={"foo": 1})._get_revision() != revision
+    assert pr._get_revision() == revision
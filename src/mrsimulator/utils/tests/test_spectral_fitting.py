@@ -5,6 +5,7 @@ import mrsimulator.signal_processing.apodization as apo
 import mrsimulator.utils.spectral_fitting as sf
 import numpy as np
 import pytest
+from lmfit import Minimizer
 from mrsimulator import Simulator
 from mrsimulator import Site
 from mrsimulator import SpinSystem
@@ -252,3 +253,375 @@ def test_6():
     params = sf.make_LMFIT_params(sim, processor)
     a = sf.LMFIT_min_function(params, sim, processor)
     np.testing.assert_almost_equal(-a.sum(), data.sum().real, decimal=8)
+
+    # the incremental runs are opt-in, with the same residual.
+    assert sim._contributions == {}
+    b = sf.LMFIT_min_function(params, sim, processor, incremental=True)
+    assert sim._contributions != {}
+    np.testing.assert_allclose(b, a, atol=1e-12)
+
+
+def test_linear_abundance():
+    sites = [
+        Site(isotope="27Al", isotropic_chemical_shift=iso, quadrupolar={"Cq": Cq})
+        for iso, Cq in zip([10, 40, 60], [3e6, 4e6, 5e6])
+    ]
+    spin_systems = [
+        SpinSystem(sites=[site], abundance=abundance)
+        for site, abundance in zip(sites, [20, 30, 50])
+    ]
+    spin_systems.append(SpinSystem(sites=[Site(isotope="1H")], abundance=42))
+    method = BlochDecayCentralTransitionSpectrum(
+        channels=["27Al"],
+        spectral_dimensions=[{"count": 512, "spectral_width": 4e4}],
+    )
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_density = 20
+
+    operations = [
+        sp.IFFT(),
+        apo.Gaussian(FWHM="200 Hz"),
+        sp.FFT(),
+    ]
+    processor = sp.SignalProcessor(operations=[*operations, sp.Scale(factor=20)])
+    sim.run()
+    data = processor.apply_operations(data=sim.methods[0].simulation)
+    sim.methods[0].experiment = data.real
+
+    # the abundances and the scale are excluded from the parameters.
+    processor = sp.SignalProcessor(operations=operations)
+    for i in range(3):
+        sim.spin_systems[i].abundance = 33
+    params = sf.make_LMFIT_params(sim, processor, linear_abundance=True)
+    assert "sys_0_abundance" not in params
+    assert "operation_1_Gaussian_FWHM" in params
+    processor.operations.append(sp.Scale(factor=5))
+    params_ = sf.make_LMFIT_params(sim, processor, linear_abundance=True)
+    assert params_.valuesdict() == params.valuesdict()
+
+    # the residual evaluations modify neither the abundances nor the scale.
+    for _ in range(2):
+        residual = sf.LMFIT_min_function(
+            params, sim, processor, linear_abundance=True
+        )
+        np.testing.assert_allclose(residual, 0, atol=1e-10 * data.max().real)
+        abundance = [item.abundance for item in sim.spin_systems]
+        np.testing.assert_allclose(abundance, [33, 33, 33, 42])
+        assert processor.operations[-1].factor == 5
+        assert len(processor.operations) == 4
+
+    # the solved abundances and scale are assigned once.
+    factor = sf.set_linear_abundance(params, sim, processor)
+    abundance = [item.abundance for item in sim.spin_systems]
+    np.testing.assert_allclose(abundance, [20, 30, 50, 42])
+    np.testing.assert_allclose(processor.operations[-1].factor, 20)
+    np.testing.assert_allclose(factor, 20)
+
+    # with no Scale operation, the factor is returned, and no operation is appended.
+    processor.operations.pop(-1)
+    for i in range(3):
+        sim.spin_systems[i].abundance = 33
+    residual = sf.LMFIT_min_function(params, sim, processor, linear_abundance=True)
+    np.testing.assert_allclose(residual, 0, atol=1e-10 * data.max().real)
+    factor = sf.set_linear_abundance(params, sim, processor)
+    np.testing.assert_allclose(factor, 20)
+    assert len(processor.operations) == 3
+    abundance = [item.abundance for item in sim.spin_systems]
+    np.testing.assert_allclose(abundance, [20, 30, 50, 42])
+
+    # only the non-linear parameters are varied by the minimizer.
+    params["sys_1_site_0_isotropic_chemical_shift"].value = 42
+    minner = Minimizer(
+        sf.LMFIT_min_function,
+        params,
+        fcn_args=(sim, processor),
+        fcn_kws={"linear_abundance": True},
+    )
+    result = minner.minimize()
+    assert np.isclose(result.params["sys_1_site_0_isotropic_chemical_shift"], 40)
+    sf.set_linear_abundance(result.params, sim, processor)
+    np.testing.assert_allclose(
+        [item.abundance for item in sim.spin_systems], [20, 30, 50, 42], rtol=1e-4
+    )
+
+
+def test_parameter_binding():
+    site = Site(
+        isotope="27Al",
+        isotropic_chemical_shift=10,
+        quadrupolar={"Cq": 3e6, "eta": 0.3},
+    )
+    sim = Simulator(spin_systems=[SpinSystem(sites=[site])])
+    sim.methods = [BlochDecayCentralTransitionSpectrum(channels=["27Al"])]
+    sim.methods[0].experiment = cp.as_csdm(np.zeros(1024))
+    processor = sp.SignalProcessor(
+        operations=[sp.IFFT(), apo.Exponential(FWHM="50 Hz"), sp.FFT(), sp.Scale()]
+    )
+    params = sf.make_LMFIT_params(sim, processor)
+    binding = sf.ParameterBinding(params, sim, processor)
+    assert [item[0] for item in binding.targets] == list(params.keys())
+
+    params["sys_0_site_0_quadrupolar_eta"].value = 0.5
+    params["operation_1_Exponential_FWHM"].value = 0.2
+    params["operation_3_Scale_factor"].value = 4
+    revision = sim.spin_systems[0]._get_revision()
+    binding.update(params)
+    assert sim.spin_systems[0].sites[0].quadrupolar.eta == 0.5
+    assert processor.operations[1].FWHM == 0.2
+    assert processor.operations[3].factor == 4
+    assert sim.spin_systems[0]._get_revision() != revision
+
+    # re-assigning the same values does not modify the spin system.
+    revision = sim.spin_systems[0]._get_revision()
+    binding.update(params)
+    assert sim.spin_systems[0]._get_revision() == revision
+
+    # the residual matches the residual from the validated assignments.
+    assert binding.is_valid(params, sim, processor)
+    residual = sf.LMFIT_min_function(params, sim, processor, binding=binding)
+    sim_copy = sim.copy(deep=True)
+    for name, value in params.valuesdict().items():
+        if "operation_" not in name:
+            sf._set_simulator_object_value(sim_copy, name, value)
+    sim_copy.run()
+    data = processor.apply_operations(data=sim_copy.methods[0].simulation)
+    np.testing.assert_allclose(residual, -data.y[0].components[0].real)
+
+    # the binding is invalid when any bound object is replaced.
+    sim.spin_systems[0].sites[0].quadrupolar = {"Cq": 3e6, "eta": 0.5}
+    assert not binding.is_valid(params, sim, processor)
+    binding = sf.ParameterBinding(params, sim, processor)
+    processor.operations[1] = apo.Exponential(FWHM="50 Hz")
+    assert not binding.is_valid(params, sim, processor)
+    binding = sf.ParameterBinding(params, sim, processor)
+    assert binding.is_valid(params, sim, processor)
+    sim.spin_systems[0].sites = [site]
+    assert not binding.is_valid(params, sim, processor)
+
+    # the binding is invalid for the replaced spin systems.
+    sim.spin_systems = [SpinSystem(sites=[site])]
+    assert not binding.is_valid(params, sim, processor)
+    assert not binding.is_valid(params, sim_copy, processor)
+
+    # a binding passed by the caller is used, without creating a new one.
+    binding = sf.ParameterBinding(params, sim, processor)
+    sf.LMFIT_min_function(params, sim, processor, binding=binding)
+    assert binding.is_valid(params, sim, processor)
+    assert sim.spin_systems[0].sites[0].quadrupolar.eta == 0.5
+
+
+def test_joint_fit():
+    sites = [
+        Site(isotope="27Al", isotropic_chemical_shift=iso, quadrupolar={"Cq": Cq})
+        for iso, Cq in zip([10, 40], [3e6, 5e6])
+    ]
+    methods = [
+        BlochDecayCentralTransitionSpectrum(
+            channels=["27Al"],
+            magnetic_flux_density=B0,
+            spectral_dimensions=[{"count": 256, "spectral_width": 4e4}],
+        )
+        for B0 in [9.4, 14.1]
+    ]
+    sim = Simulator(spin_systems=[SpinSystem(sites=[s]) for s in sites])
+    sim.methods = methods
+    sim.config.integration_density = 20
+    processors = [
+        sp.SignalProcessor(
+            operations=[sp.IFFT(), apo.Gaussian(FWHM=fwhm), sp.FFT(), sp.Scale()]
+        )
+        for fwhm in ["200 Hz", "300 Hz"]
+    ]
+    sim.run()
+    for method, processor in zip(sim.methods, processors):
+        data = processor.apply_operations(data=method.simulation)
+        method.experiment = data.real
+
+    params = sf.make_LMFIT_params(sim, processors)
+    assert "SP_0_operation_1_Gaussian_FWHM" in params
+    assert params["SP_1_operation_1_Gaussian_FWHM"].value == 300
+
+    e = "Expecting 2 SignalProcessor objects"
+    with pytest.raises(ValueError, match=f".*{e}.*"):
+        sf.LMFIT_min_function(params, sim, processors[:1])
+
+    e = "only supported for a single method"
+    with pytest.raises(ValueError, match=f".*{e}.*"):
+        sf.LMFIT_min_function(params, sim, processors, linear_abundance=True)
+
+    # a concatenated and weighted residual.
+    params["sys_1_site_0_isotropic_chemical_shift"].value = 42
+    params["SP_1_operation_3_Scale_factor"].value = 2
+    residual = sf.LMFIT_min_function(params, sim, processors, weights=[1, 3])
+    assert sim.spin_systems[1].sites[0].isotropic_chemical_shift == 42
+    assert processors[1].operations[3].factor == 2
+    assert processors[0].operations[3].factor == 1
+
+    serial = []
+    for method, processor in zip(sim.methods, processors):
+        sim_copy = sim.copy(update={"methods": [method.copy()]}, deep=True)
+        sim_copy.run()
+        data = processor.apply_operations(data=sim_copy.methods[0].simulation)
+        serial.append(method.experiment.y[0].components[0] - data.y[0].components[0])
+    ref = np.concatenate([serial[0], 3 * serial[1]]).real
+    np.testing.assert_allclose(residual, ref, atol=1e-12 * np.abs(ref).max())
+
+    kwargs = {"weights": [1, 3], "n_jobs": 1}
+    residual_1 = sf.LMFIT_min_function(params, sim, processors, **kwargs)
+    np.testing.assert_allclose(residual_1, residual)
+
+
+def numeric_jacobian(params, step, *args, **kwargs):
+    """Central finite-difference Jacobian of the LMFIT_min_function."""
+    columns = []
+    for name, param in params.items():
+        if not param.vary or param.expr is not None:
+            continue
+        value = param.value
+        residual = []
+        for sign in [1, -1]:
+            param.value = value + sign * step[name]
+            params.update_constraints()
+            residual.append(sf.LMFIT_min_function(params, *args, **kwargs).ravel())
+        param.value = value
+        params.update_constraints()
+        columns.append((residual[0] - residual[1]) / (2 * step[name]))
+    sf.LMFIT_min_function(params, *args, **kwargs)
+    return np.asarray(columns).T
+
+
+def test_jacobian():
+    sites = [
+        Site(
+            isotope="27Al",
+            isotropic_chemical_shift=iso,
+            quadrupolar={"Cq": Cq, "eta": 0.3},
+        )
+        for iso, Cq in zip([10, 40, 60], [3e6, 4e6, 5e6])
+    ]
+    spin_systems = [
+        SpinSystem(sites=[site], abundance=abundance)
+        for site, abundance in zip(sites, [20, 30, 50])
+    ]
+    method = BlochDecayCentralTransitionSpectrum(
+        channels=["27Al"],
+        spectral_dimensions=[{"count": 512, "spectral_width": 4e4}],
+    )
+    sim = Simulator(spin_systems=spin_systems, methods=[method])
+    sim.config.integration_density = 30
+    processor = sp.SignalProcessor(
+        operations=[
+            sp.IFFT(),
+            apo.Exponential(FWHM="100 Hz"),
+            apo.Gaussian(FWHM="200 Hz"),
+            sp.FFT(),
+            sp.Scale(factor=3),
+        ]
+    )
+    sim.run()
+    data = processor.apply_operations(data=sim.methods[0].simulation)
+    sim.methods[0].experiment = data.real
+
+    params = sf.make_LMFIT_params(sim, processor)
+    params["sys_1_site_0_isotropic_chemical_shift"].value = 41
+    params["operation_2_Gaussian_FWHM"].value = 250
+
+    jacobian = sf.LMFIT_jacobian(params, sim, processor, n_jobs=2)
+    names = [key for key, par in params.items() if par.vary and par.expr is None]
+    assert jacobian.shape == (512, len(names))
+
+    # the isotropic shifts are compared at a step of about one spectral bin, as the
+    # spectral derivative is smooth between the bins, unlike the simulation.
+    step = {key: 1e-4 * max(abs(params[key].value), 1) for key in names}
+    step.update({key: 0.5 for key in names if "isotropic" in key})
+    reference = numeric_jacobian(params, step, sim, processor)
+    for j, name in enumerate(names):
+        error = np.linalg.norm(jacobian[:, j] - reference[:, j])
+        error /= np.linalg.norm(reference[:, j])
+        assert error < (0.15 if "isotropic" in name else 1e-3), name
+
+    # with the linear abundance, all derivatives are from the finite-difference.
+    kwargs = {"linear_abundance": True}
+    params_ = sf.make_LMFIT_params(sim, processor, **kwargs)
+    workers = []
+    jacobian = sf.LMFIT_jacobian(
+        params_, sim, processor, n_jobs=1, workers=workers, **kwargs
+    )
+    # the thread workers are held by the caller, and re-used while valid.
+    assert len(workers) == 1
+    worker = workers[0]
+    sf.LMFIT_jacobian(params_, sim, processor, n_jobs=1, workers=workers, **kwargs)
+    assert workers == [worker]
+    names = [key for key, par in params_.items() if par.vary and par.expr is None]
+    step = {key: 1e-4 * max(abs(params_[key].value), 1) for key in names}
+    reference = numeric_jacobian(params_, step, sim, processor, **kwargs)
+    np.testing.assert_allclose(jacobian, reference, atol=1e-3 * np.abs(reference).max())
+
+    # the Jacobian as the Dfun of the Levenberg-Marquardt minimization.
+    processor.operations[-1].factor = 3
+    params = sf.make_LMFIT_params(sim, processor)
+    params["sys_1_site_0_isotropic_chemical_shift"].value = 42
+    params["sys_0_site_0_quadrupolar_Cq"].value = 3.2e6
+    params["operation_2_Gaussian_FWHM"].value = 250
+    params["sys_0_abundance"].value = 25
+    minner = Minimizer(sf.LMFIT_min_function, params, fcn_args=(sim, processor))
+    result = minner.minimize(method="leastsq", Dfun=sf.make_LMFIT_jacobian())
+    assert result.nfev < 20
+    expected = {
+        "sys_1_site_0_isotropic_chemical_shift": 40,
+        "sys_0_site_0_quadrupolar_Cq": 3e6,
+        "operation_2_Gaussian_FWHM": 200,
+        "sys_0_abundance": 20,
+    }
+    for key, value in expected.items():
+        np.testing.assert_allclose(result.params[key].value, value, rtol=1e-5)
+
+
+def test_jacobian_joint_fit():
+    sites = [
+        Site(isotope="27Al", isotropic_chemical_shift=iso, quadrupolar={"Cq": Cq})
+        for iso, Cq in zip([10, 40], [3e6, 5e6])
+    ]
+    methods = [
+        BlochDecayCentralTransitionSpectrum(
+            channels=["27Al"],
+            magnetic_flux_density=B0,
+            spectral_dimensions=[{"count": 256, "spectral_width": 4e4}],
+        )
+        for B0 in [9.4, 14.1]
+    ]
+    sim = Simulator(spin_systems=[SpinSystem(sites=[s]) for s in sites])
+    sim.methods = methods
+    sim.config.integration_density = 20
+    processors = [
+        sp.SignalProcessor(
+            operations=[sp.IFFT(), apo.Gaussian(FWHM=fwhm), sp.FFT(), sp.Scale()]
+        )
+        for fwhm in ["200 Hz", "300 Hz"]
+    ]
+    sim.run()
+    for method, processor in zip(sim.methods, processors):
+        data = processor.apply_operations(data=method.simulation)
+        method.experiment = data.real
+
+    params = sf.make_LMFIT_params(sim, processors)
+    params["sys_0_site_0_quadrupolar_Cq"].value = 3.1e6
+    kwargs = {"weights": [1, 3]}
+    jacobian = sf.LMFIT_jacobian(params, sim, processors, **kwargs)
+    names = [key for key, par in params.items() if par.vary and par.expr is None]
+    assert jacobian.shape == (512, len(names))
+
+    # the operations of a SignalProcessor only affect the respective method.
+    j = names.index("SP_0_operation_1_Gaussian_FWHM")
+    assert np.all(jacobian[256:, j] == 0)
+    j = names.index("SP_1_operation_3_Scale_factor")
+    assert np.all(jacobian[:256, j] == 0)
+
+    names = [key for key in names if "isotropic" not in key]
+    step = {key: 1e-4 * max(abs(params[key].value), 1) for key in names}
+    for key in params:
+        if "isotropic" in key:
+            params[key].vary = False
+    reference = numeric_jacobian(params, step, sim, processors, **kwargs)
+    jacobian = sf.LMFIT_jacobian(params, sim, processors, **kwargs)
+    np.testing.assert_allclose(jacobian, reference, atol=1e-3 * np.abs(reference).max())
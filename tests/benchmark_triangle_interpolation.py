@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Micro-benchmarks for the batch triangle interpolation.
+
+Run as ``python tests/benchmark_triangle_interpolation.py`` to compare the batch
+interpolation against the interpolation of one triangle at a time. The triangles are
+narrow (static-like, a few bins wide) or wide (spanning tens of bins).
+"""
+from timeit import repeat
+
+import mrsimulator.tests.tests as clib
+import numpy as np
+
+__author__ = "Deepansh Srivastava"
+__email__ = "srivastava.89@osu.edu"
+
+
+def get_triangles(n, width, size):
+    """Return n random triangles of the given width over a grid of the given size."""
+    f0 = np.random.uniform(0, size, n)
+    return f0 + np.random.uniform(0, width, (3, n)), np.random.rand(n)
+
+
+def benchmark_1d(n=200_000, width=2.0, size=4096, number=5):
+    freq, amp = get_triangles(n, width, size)
+    spec = np.zeros(size)
+    timing = {}
+    for batch in [False, True]:
+        timing[batch] = min(
+            repeat(
+                lambda: clib.triangle_interpolation_batch(freq, amp, spec, batch),
+                number=number,
+                repeat=3,
+            )
+        )
+    return timing
+
+
+def benchmark_2d(n=50_000, width=2.0, size=256, number=5):
+    freq1, amp = get_triangles(n, width, size)
+    freq2, _ = get_triangles(n, width, size)
+    spec = np.zeros((size, size))
+    timing = {}
+    for batch in [False, True]:
+        timing[batch] = min(
+            repeat(
+                lambda: clib.triangle_interpolation2D_batch(
+                    freq1, freq2, amp, spec, batch
+                ),
+                number=number,
+                repeat=3,
+            )
+        )
+    return timing
+
+
+def main():
+    print(f"{'case':<16}{'scalar (s)':>12}{'batch (s)':>12}{'speedup':>10}")
+    for name, func, width in [
+        ("1D narrow", benchmark_1d, 2.0),
+        ("1D wide", benchmark_1d, 40.0),
+        ("2D narrow", benchmark_2d, 2.0),
+        ("2D wide", benchmark_2d, 10.0),
+    ]:
+        timing = func(width=width)
+        speedup = timing[False] / timing[True]
+        print(f"{name:<16}{timing[False]:>12.4f}{timing[True]:>12.4f}{speedup:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
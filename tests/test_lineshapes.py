@@ -101,7 +101,7 @@ def get_data(filename):
     return data_object, data_source
 
 
-def c_setup(data_object, data_source, integration_volume="octant"):
+def c_setup(data_object, data_source, integration_volume="octant", precision="double"):
     # mrsimulator
     methods = [Method.parse_dict_with_units(_) for _ in data_object["methods"]]
 
@@ -116,6 +116,7 @@ def c_setup(data_object, data_source, integration_volume="octant"):
     s1.config.integration_density = 120
     s1.config.number_of_sidebands = 90
     s1.config.integration_volume = integration_volume
+    s1.config.precision = precision
     s1.run()
     data_mrsimulator = np.asarray(s1.methods[0].simulation.to_list()[1:])
     data_mrsimulator = data_mrsimulator.sum(axis=0)
@@ -270,3 +271,32 @@ def test_csa_plus_quadrupolar_simpson_lineshapes():
         np.testing.assert_almost_equal(
             data_mrsimulator, data_source, decimal=1, err_msg=message
         )
+
+
+# --------------------------------------------------------------------------- #
+# Test the single precision sideband computation against simpson calculations
+# and the double precision simulation. The single precision lineshapes are within
+# 1e-5 of the double precision lineshapes, normalized to the maximum.
+
+
+def test_single_precision_simpson_sidebands():
+    path_ = path.join("tests", "simpson_simulated_lineshapes")
+    tests = [
+        ("shielding_sidebands", 8, "octant", 2),
+        ("quad_sidebands", 2, "hemisphere", 1),
+    ]
+    for folder, n, integration_volume, decimal in tests:
+        for i in range(n):
+            message = f"failed to compare single precision lineshape from {folder}/{i}"
+            filename = path.join(path_, folder, f"test{i:02d}", f"test{i:02d}.json")
+            data_object, data_source = get_data(filename)
+            data_single, _ = c_setup(
+                data_object, data_source, integration_volume, precision="single"
+            )
+            data_double, _ = c_setup(data_object, data_source, integration_volume)
+            np.testing.assert_almost_equal(
+                data_single, data_source, decimal=decimal, err_msg=message
+            )
+            np.testing.assert_allclose(
+                data_single, data_double, atol=1e-5, err_msg=message
+            )
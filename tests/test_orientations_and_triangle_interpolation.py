@@ -102,3 +102,60 @@ def test_triangle_rasterization():
         clib.triangle_interpolation(lst1, amp2)
 
         assert np.allclose(amp2, amp1.sum(axis=1), atol=1e-15)
+
+
+def random_triangles(n, low, high):
+    freq = np.random.uniform(low, high, (3, n))
+    # degenerate triangles, within TOL and within a bin.
+    eighth, quarter = n // 8, n // 4
+    freq[1:, :eighth] = freq[0, :eighth]
+    freq[:, eighth:quarter] = np.floor(freq[0, eighth:quarter]) + np.random.rand(
+        3, quarter - eighth
+    )
+    return freq
+
+
+def test_triangle_interpolation_batch():
+    n = 1000
+    amp = np.random.rand(n)
+
+    # triangles within and outside the 1D grid.
+    freq = random_triangles(n, -20, 120)
+    spec_batch, spec_scalar = np.zeros(100), np.zeros(100)
+    clib.triangle_interpolation_batch(freq, amp, spec_batch)
+    clib.triangle_interpolation_batch(freq, amp, spec_scalar, batch=False)
+    np.testing.assert_allclose(spec_batch, spec_scalar, rtol=1e-13, atol=1e-13)
+
+    # triangles within and outside the 2D grid.
+    freq1 = random_triangles(n, -5, 25)
+    freq2 = random_triangles(n, -5, 25)
+    spec_batch, spec_scalar = np.zeros((20, 20)), np.zeros((20, 20))
+    clib.triangle_interpolation2D_batch(freq1, freq2, amp, spec_batch)
+    clib.triangle_interpolation2D_batch(freq1, freq2, amp, spec_scalar, batch=False)
+    np.testing.assert_allclose(spec_batch, spec_scalar, rtol=1e-13, atol=1e-13)
+
+
+def test_octahedron_interpolation():
+    nt = 20
+    n_pts = (nt + 1) * (nt + 2) // 2
+    freq = np.random.uniform(-10, 110, (1, n_pts))
+    amp = np.random.rand(1, n_pts)
+    spec = np.zeros(100)
+    clib.octahedronInterpolation(spec, freq, nt, amp)
+
+    # reference from the up and down triangles over the rows of the octant face.
+    triangles, start = [], 0
+    for row in range(nt):
+        length = nt - row + 1
+        nxt = start + length
+        for k in range(length - 1):
+            triangles.append([start + k, start + k + 1, nxt + k])
+            if k < length - 2:
+                triangles.append([start + k + 1, nxt + k, nxt + k + 1])
+        start = nxt
+    triangles = np.asarray(triangles).T
+    spec_ref = np.zeros(100)
+    clib.triangle_interpolation_batch(
+        freq[0, triangles], amp[0, triangles].sum(axis=0), spec_ref, batch=False
+    )
+    np.testing.assert_allclose(spec, spec_ref, rtol=1e-13, atol=1e-13)